@@ -0,0 +1,26 @@
+# backend/app/api/dependencies.py
+from typing import TYPE_CHECKING
+
+from fastapi import FastAPI, Request
+
+if TYPE_CHECKING:
+    from app.services.analysis_orchestrator import AnalysisOrchestrator
+
+def get_app_orchestrator(app: FastAPI) -> "AnalysisOrchestrator":
+    """
+    The application's AnalysisOrchestrator, kept on `app.state`. The lifespan
+    creates it at startup; without a lifespan (e.g. a TestClient not used as
+    a context manager) it is created on first use. The orchestrator module
+    pulls in the OpenAI client and the linters, so it is imported only here
+    rather than when the API modules are imported.
+    """
+    orchestrator = getattr(app.state, "analysis_orchestrator", None)
+    if orchestrator is None:
+        from app.services.analysis_orchestrator import AnalysisOrchestrator
+
+        orchestrator = app.state.analysis_orchestrator = AnalysisOrchestrator()
+    return orchestrator
+
+def get_orchestrator(request: Request) -> "AnalysisOrchestrator":
+    """FastAPI dependency for the endpoints' orchestrator."""
+    return get_app_orchestrator(request.app)
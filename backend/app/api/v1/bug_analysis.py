@@ -1,27 +1,50 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Response, status
-from typing import Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.datastructures import UploadFile
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional
 import uuid
 
 from app.models.schemas import LogSubmissionRequest, AnalysisResult
-from app.services.analysis_orchestrator import AnalysisOrchestrator
+from app.core.config import settings
+from app.api.dependencies import get_orchestrator
+from app.services.analysis_scheduler import QueueFullError
+from app.utils.log_upload import (
+    InvalidUploadError,
+    UnsupportedEncodingError,
+    UploadTooLargeError,
+    spool_upload,
+)
 
-router = APIRouter()
+if TYPE_CHECKING:
+    from app.services.analysis_orchestrator import AnalysisOrchestrator
 
-analysis_orchestrator = AnalysisOrchestrator()
+router = APIRouter()
 
 @router.post("/analyze-logs", response_model=Dict[str, str], status_code=status.HTTP_202_ACCEPTED)
-async def analyze_logs(request: LogSubmissionRequest, background_tasks: BackgroundTasks, response: Response):
+async def analyze_logs(
+    request: LogSubmissionRequest,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    analysis_orchestrator: "AnalysisOrchestrator" = Depends(get_orchestrator),
+):
     if not request.logs and not request.code_snippet:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Either 'logs' or 'code_snippet' must be provided."
         )
-    analysis_id = analysis_orchestrator.start_analysis_background(
-        logs=request.logs,
-        code_snippet=request.code_snippet,
-        platform=request.platform or "",
-        language=request.language or ""
-    )
+    try:
+        analysis_id = analysis_orchestrator.start_analysis_background(
+            logs=request.logs,
+            code_snippet=request.code_snippet,
+            platform=request.platform or "",
+            language=request.language or ""
+        )
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Analysis queue is full. Please retry later.",
+            headers={"Retry-After": str(e.retry_after_seconds)},
+        )
     # Add security headers
     response.headers["X-Content-Type-Options"] = "nosniff"
     response.headers["X-Frame-Options"] = "DENY"
@@ -30,14 +53,198 @@ async def analyze_logs(request: LogSubmissionRequest, background_tasks: Backgrou
     return {"analysis_id": analysis_id, "status": "QUEUED"}
 
 
-@router.get("/status/{analysis_id}", response_model=Optional[AnalysisResult])
-async def get_analysis_status(analysis_id: str, response: Response):
-    result = analysis_orchestrator.get_analysis_results(analysis_id)
-    if not result:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Analysis ID not found or expired")
+@router.post("/analyze-logs/batch", response_model=Dict[str, Any], status_code=status.HTTP_202_ACCEPTED)
+async def analyze_logs_batch(
+    requests: List[LogSubmissionRequest],
+    response: Response,
+    analysis_orchestrator: "AnalysisOrchestrator" = Depends(get_orchestrator),
+):
+    if not requests:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="At least one submission must be provided.")
+    if len(requests) > settings.BATCH_MAX_SUBMISSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may contain at most {settings.BATCH_MAX_SUBMISSIONS} submissions."
+        )
+    for index, request in enumerate(requests):
+        if not request.logs and not request.code_snippet:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Submission {index}: either 'logs' or 'code_snippet' must be provided."
+            )
+    try:
+        analysis_ids = analysis_orchestrator.start_batch_analysis(requests)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Analysis queue is full. Please retry later.",
+            headers={"Retry-After": str(e.retry_after_seconds)},
+        )
+    # Add security headers
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    response.headers["X-Frame-Options"] = "DENY"
+    response.headers["Content-Security-Policy"] = "default-src 'none'; frame-ancestors 'none'; sandbox"
+    response.headers["Referrer-Policy"] = "no-referrer"
+    return {"analysis_ids": analysis_ids, "status": "QUEUED"}
+
+
+# Compression of a multipart file part, from its content type or file extension.
+_PART_ENCODINGS = {
+    "application/gzip": "gzip",
+    "application/x-gzip": "gzip",
+    "application/zstd": "zstd",
+    ".gz": "gzip",
+    ".zst": "zstd",
+}
+
+async def _iter_upload_file(upload_file: UploadFile, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await upload_file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+def _part_encoding(upload_file: UploadFile) -> str:
+    if upload_file.content_type in _PART_ENCODINGS:
+        return _PART_ENCODINGS[upload_file.content_type]
+    filename = (upload_file.filename or "").lower()
+    for extension in (".gz", ".zst"):
+        if filename.endswith(extension):
+            return _PART_ENCODINGS[extension]
+    return "identity"
+
+@router.post("/analyze-logs/upload", response_model=Dict[str, str], status_code=status.HTTP_202_ACCEPTED)
+async def analyze_logs_upload(
+    request: Request,
+    response: Response,
+    platform: Optional[str] = None,
+    language: Optional[str] = None,
+    analysis_orchestrator: "AnalysisOrchestrator" = Depends(get_orchestrator),
+):
+    """
+    Accepts a large log without JSON-encoding it, in one of two forms:
+    - the raw log as the request body, optionally compressed and labelled
+      with `Content-Encoding: gzip|deflate|zstd`; platform and language are
+      query parameters.
+    - multipart/form-data with a `logs` file part (compressed if its content
+      type or extension says so) and `platform`, `language` and an optional
+      `code_snippet` as form fields.
+    The log is decompressed as it arrives into a spooled temporary file.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Upload is too large.")
+
+    code_snippet = None
+    try:
+        if request.headers.get("content-type", "").startswith("multipart/form-data"):
+            form = await request.form()
+            try:
+                platform = form.get("platform") or platform
+                language = form.get("language") or language
+                code_snippet = form.get("code_snippet") or None
+                if isinstance(code_snippet, UploadFile):
+                    code_snippet = (await code_snippet.read()).decode("utf-8", errors="replace")
+                logs_part = form.get("logs")
+                if not isinstance(logs_part, UploadFile):
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A 'logs' file part must be provided.")
+                logs = await spool_upload(
+                    _iter_upload_file(logs_part), _part_encoding(logs_part),
+                    settings.UPLOAD_MAX_BYTES, settings.UPLOAD_SPOOL_MAX_MEMORY_BYTES,
+                )
+            finally:
+                await form.close()
+        else:
+            logs = await spool_upload(
+                request.stream(), request.headers.get("content-encoding"),
+                settings.UPLOAD_MAX_BYTES, settings.UPLOAD_SPOOL_MAX_MEMORY_BYTES,
+            )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except UnsupportedEncodingError as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+    except InvalidUploadError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if not platform or not language or (not logs and not code_snippet):
+        logs.close()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'platform', 'language' and either a non-empty log or 'code_snippet' must be provided."
+        )
+    if not logs:
+        logs.close()
+        logs = None
+    try:
+        analysis_id = analysis_orchestrator.start_analysis_background(
+            logs=logs,
+            code_snippet=code_snippet,
+            platform=platform,
+            language=language
+        )
+    except QueueFullError as e:
+        if logs is not None:
+            logs.close()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Analysis queue is full. Please retry later.",
+            headers={"Retry-After": str(e.retry_after_seconds)},
+        )
     # Add security headers
     response.headers["X-Content-Type-Options"] = "nosniff"
     response.headers["X-Frame-Options"] = "DENY"
     response.headers["Content-Security-Policy"] = "default-src 'none'; frame-ancestors 'none'; sandbox"
     response.headers["Referrer-Policy"] = "no-referrer"
-    return result
+    return {"analysis_id": analysis_id, "status": "QUEUED"}
+
+
+@router.get("/status/{analysis_id}", response_model=Optional[AnalysisResult])
+async def get_analysis_status(analysis_id: str, analysis_orchestrator: "AnalysisOrchestrator" = Depends(get_orchestrator)):
+    # Polled often: the stored result keeps its JSON encoding, so it is sent as is instead of being revalidated.
+    content = analysis_orchestrator.get_analysis_json(analysis_id)
+    if content is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Analysis ID not found or expired")
+    headers = {
+        # Security headers
+        "X-Content-Type-Options": "nosniff",
+        "X-Frame-Options": "DENY",
+        "Content-Security-Policy": "default-src 'none'; frame-ancestors 'none'; sandbox",
+        "Referrer-Policy": "no-referrer",
+    }
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+@router.get("/status/{analysis_id}/stream")
+async def stream_analysis_status(analysis_id: str, analysis_orchestrator: "AnalysisOrchestrator" = Depends(get_orchestrator)):
+    """
+    Server-Sent Events stream of an analysis: one `status` event with the
+    current result, then one per update (including partial findings) until
+    the analysis completes or fails. Comment lines are sent as keep-alives.
+    """
+    if not analysis_orchestrator.get_analysis_results(analysis_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Analysis ID not found or expired")
+
+    async def events():
+        async for payload in analysis_orchestrator.stream_analysis_updates(
+            analysis_id, settings.STATUS_STREAM_HEARTBEAT_SECONDS
+        ):
+            if payload is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: status\ndata: {payload}\n\n"
+
+    headers = {
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # Stop reverse proxies from buffering the stream
+        # Security headers
+        "X-Content-Type-Options": "nosniff",
+        "X-Frame-Options": "DENY",
+        "Content-Security-Policy": "default-src 'none'; frame-ancestors 'none'; sandbox",
+        "Referrer-Policy": "no-referrer",
+    }
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+
+@router.get("/stats", response_model=Dict[str, Any])
+async def get_service_stats(analysis_orchestrator: "AnalysisOrchestrator" = Depends(get_orchestrator)):
+    return analysis_orchestrator.get_stats()
@@ -1,14 +1,111 @@
 # backend/app/core/config.py
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
 class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = None # Use Optional[str] to allow it to be None if not set
+    OPENAI_BASE_URL: Optional[str] = None  # OpenAI-compatible endpoint, e.g. "http://127.0.0.1:8001/v1" for the load-test stub
+
+    # LLM client: one pooled, keep-alive HTTP client shared by all LLM calls
+    LLM_MAX_CONCURRENT_REQUESTS: int = 8  # Cap on in-flight chat completion requests
+    LLM_REQUEST_TIMEOUT_SECONDS: float = 60.0  # Per-call timeout for a single completion
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    LLM_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+
+    # Model tiers: bug predictions try the fast model first and escalate to LLM_MODEL when the input is
+    # complex or the fast answer is invalid, empty or not confident enough
+    LLM_MODEL: str = "gpt-4o"
+    LLM_FAST_MODEL: str = "gpt-4o-mini"
+    LLM_CASCADE_ENABLED: bool = True
+    LLM_CASCADE_CONFIDENCE_THRESHOLD: float = 0.7  # Escalate unless some fast-model bug is at least this confident
+    LLM_CASCADE_MAX_SIMPLE_TOKENS: int = 2000  # Larger logs + code go straight to LLM_MODEL
+    LLM_CASCADE_MAX_SIMPLE_EXCEPTION_TYPES: int = 3  # Logs with this many distinct exception types go straight to LLM_MODEL
+
+    # LLM rate limiting: requests wait for budget instead of drawing 429s. Set these to the account's quota;
+    # 0 disables a budget. Failed requests (429, connection errors, 5xx) are retried with backoff.
+    LLM_REQUESTS_PER_MINUTE: int = 0
+    LLM_TOKENS_PER_MINUTE: int = 0
+    LLM_RATE_LIMIT_HEADROOM: float = 0.95  # Fraction of the quota to actually use
+    LLM_RATE_LIMIT_BURST_SECONDS: float = 5.0  # Budget that may be spent at once, in seconds of quota
+    LLM_EXPECTED_COMPLETION_TOKENS: int = 800  # Reserved per request on top of the prompt until usage is known
+    LLM_RETRY_MAX_ATTEMPTS: int = 6
+    LLM_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    LLM_RETRY_MAX_DELAY_SECONDS: float = 30.0
+
+    # LLM response cache (in-memory LRU, optionally backed by SQLite)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    LLM_CACHE_TTL_SECONDS: float = 86400.0
+    LLM_CACHE_SQLITE_PATH: Optional[str] = None  # e.g. "./llm_cache.db" to persist across restarts
+
+    LLM_STREAMING_ENABLED: bool = True  # Stream bug predictions so findings are published as they are generated
+
+    # Token budget for the logs + code pasted into a single prompt (excludes the fixed instructions)
+    LLM_PROMPT_TOKEN_BUDGET: int = 8000
+    # Directory with tiktoken's cached o200k_base vocabulary, for hosts that cannot download it
+    LLM_TOKENIZER_CACHE_DIR: Optional[str] = None
+
+    # Batch submissions: small items are packed into shared prediction requests
+    LLM_BATCH_TOKEN_BUDGET: int = 6000  # Combined logs + code tokens per shared request
+    LLM_BATCH_MAX_ITEMS: int = 20
+    LLM_BATCH_ITEM_MAX_TOKENS: int = 1500  # Larger items are analysed on their own
+    BATCH_MAX_SUBMISSIONS: int = 500  # Maximum submissions per batch request
+
+    # Log uploads (POST /api/v1/analyze-logs/upload): gzip/deflate/zstd or multipart bodies
+    UPLOAD_MAX_BYTES: int = 512 * 1024 * 1024  # Limit on the decompressed log size; larger uploads get HTTP 413
+    UPLOAD_SPOOL_MAX_MEMORY_BYTES: int = 1024 * 1024  # Uploads above this are spooled to a temporary file
+    UPLOAD_PROMPT_MAX_BYTES: int = 1024 * 1024  # Head and tail of an upload read into memory when it is prompted as raw text
+
+    # Static analysis: linters run as asyncio subprocesses
+    STATIC_ANALYSIS_MAX_CONCURRENT_PROCESSES: int = 4  # Global cap on concurrently running linters
+    PYLINT_TIMEOUT_SECONDS: float = 30.0
+    SWIFTLINT_TIMEOUT_SECONDS: float = 30.0
+    DETEKT_TIMEOUT_SECONDS: float = 60.0
+    LINTER_WORKERS_ENABLED: bool = True  # Keep warm pylint worker processes instead of one process per snippet
+    PYLINT_WORKER_POOL_SIZE: int = 2
+    LINTER_WORKER_MAX_JOBS: int = 200  # Recycle a worker after this many snippets
+    STATIC_ANALYSIS_CACHE_ENABLED: bool = True  # Reuse findings for a snippet already linted by the same tool version and rules
+    STATIC_ANALYSIS_CACHE_MAX_ENTRIES: int = 2048
+    STARTUP_WARMUP_ENABLED: bool = False  # Start linter workers and check linter availability before serving
+
+    # Log template mining: collapse repetitive log lines before prompting the LLM
+    LOG_TEMPLATE_MINING_ENABLED: bool = True
+    LOG_TEMPLATE_MIN_LINES: int = 50  # Smaller logs are sent verbatim
+    LOG_TEMPLATE_MAX_TEMPLATES: int = 200  # Templates rendered into the prompt
+    LOG_TEMPLATE_MAX_CLUSTERS: int = 5000  # Cap on templates mined from a single submission
+
+    # Analysis result store
+    RESULT_STORE_TTL_SECONDS: float = 3600.0  # How long completed/failed results stay available
+    RESULT_STORE_MAX_ENTRIES: int = 10000
+    RESULT_STORE_MAX_BYTES: Optional[int] = None  # Optional budget for serialized finished results
+    RESULT_STORE_SWEEP_INTERVAL_SECONDS: float = 60.0
+    RESULT_STORE_BACKEND: Literal["memory", "sqlite"] = "memory"  # "sqlite" shares results between uvicorn workers
+    RESULT_STORE_SQLITE_PATH: str = "./analysis_results.db"  # Must be the same file for every worker
+
+    # Analysis scheduling and backpressure
+    ANALYSIS_QUEUE_MAX_SIZE: int = 1000  # Submissions beyond this get HTTP 429
+    ANALYSIS_WORKERS: int = 16  # Analyses processed concurrently
+    ANALYSIS_QUEUE_RETRY_AFTER_SECONDS: int = 5
+    ANALYSIS_MAX_CONCURRENT_STATIC_ANALYSIS: int = 4
+    ANALYSIS_MAX_CONCURRENT_LLM_STAGES: int = 8
+    ANALYSIS_EARLY_PATCH_ENABLED: bool = True  # Start patching before static analysis finishes when the top bug is already known
+    ANALYSIS_STREAMING_PATCH_CONFIDENCE: float = 0.85  # A streamed bug this confident starts patching before prediction finishes
+    ANALYSIS_COALESCING_ENABLED: bool = True  # Identical submissions share the analysis already in flight
+
+    # Crash similarity: reuse the results of a past analysis of the same crash
+    CRASH_SIMILARITY_ENABLED: bool = True
+    CRASH_SIMILARITY_THRESHOLD: float = 0.9  # Minimum estimated Jaccard similarity of the crash lines
+    CRASH_SIMILARITY_MAX_ENTRIES: int = 10000  # Completed analyses kept in the index
+
+    # Status streaming (GET /api/v1/status/{analysis_id}/stream)
+    STATUS_STREAM_HEARTBEAT_SECONDS: float = 15.0  # Keep-alive comment interval while an analysis is idle
 
     model_config = SettingsConfigDict(
         env_file=Path(__file__).parent.parent.parent / '.env',  # Points to BugHawkAI/.env
         extra="ignore" # Ignore other env vars not explicitly defined
     )
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -0,0 +1,217 @@
+# backend/app/core/metrics.py
+import bisect
+import logging
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from sub-millisecond parsing up to slow LLM calls.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Languages get their own label value; anything else is reported as "other" to keep cardinality bounded.
+_KNOWN_LANGUAGES = {"python", "swift", "ios", "kotlin", "android", "java"}
+
+def language_label(language: Optional[str]) -> str:
+    language = (language or "").strip().lower()
+    return language if language in _KNOWN_LANGUAGES else "other"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric(ABC):
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self._samples())
+        return lines
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """The metric's sample lines in Prometheus text format."""
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+class Gauge(_Metric):
+    """A gauge that is either set explicitly or, with set_function(), read when metrics are collected."""
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float):
+        self._value = value
+
+    def set_function(self, function: Optional[Callable[[], float]]):
+        """Reads the gauge from `function` from now on; None goes back to the value last set()."""
+        self._function = function
+
+    def value(self) -> Optional[float]:
+        """The current value, or None if the gauge's function failed (the error is logged)."""
+        if self._function is None:
+            return self._value
+        try:
+            return self._function()
+        except Exception as e:
+            logger.warning(f"Could not read gauge {self.name}: {e}")
+            return None
+
+    def _samples(self) -> List[str]:
+        value = self.value()
+        # A failing gauge is left out rather than failing the whole scrape.
+        return [f"{self.name} {_format_value(value)}"] if value is not None else []
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (non-cumulative, last one is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            snapshot = [(key, list(counts), total[0]) for key, (counts, total) in self._series.items()]
+        lines = []
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """
+    Minimal Prometheus-compatible metrics registry. Recording is a dict
+    update under an uncontended lock, so it is cheap enough for the hot
+    path; formatting happens only when /metrics is scraped.
+    """
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = REGISTRY.register(Histogram(
+    "bughawk_stage_duration_seconds", "Time spent in each analysis pipeline stage.", ("stage", "language")
+))
+ANALYSIS_DURATION = REGISTRY.register(Histogram(
+    "bughawk_analysis_duration_seconds", "Time from the start of an analysis to its result.", ("language", "status")
+))
+QUEUE_WAIT = REGISTRY.register(Histogram(
+    "bughawk_queue_wait_seconds", "Time analysis jobs spend waiting in the scheduler queue."
+))
+LLM_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "bughawk_llm_request_duration_seconds", "Duration of LLM chat completion requests.", ("purpose",)
+))
+LLM_RETRIES = REGISTRY.register(Counter(
+    "bughawk_llm_retries_total", "LLM requests retried after an API error."
+))
+LLM_RATE_LIMITED = REGISTRY.register(Counter(
+    "bughawk_llm_rate_limited_total", "LLM requests rejected by the provider with HTTP 429."
+))
+LLM_THROTTLE_WAIT = REGISTRY.register(Histogram(
+    "bughawk_llm_throttle_wait_seconds", "Time LLM requests waited for rate-limit budget before being sent."
+))
+LLM_ESCALATIONS = REGISTRY.register(Counter(
+    "bughawk_llm_escalations_total", "Bug predictions sent to the large model instead of, or after, the fast one.", ("reason",)
+))
+LLM_JSON_DECODE_FAILURES = REGISTRY.register(Counter(
+    "bughawk_llm_json_decode_failures_total", "LLM responses that were not valid JSON."
+))
+LINTER_FAILURES = REGISTRY.register(Counter(
+    "bughawk_linter_failures_total", "Static analysis runs that produced no usable report.", ("tool", "reason")
+))
+CACHE_HITS = REGISTRY.register(Counter(
+    "bughawk_cache_hits_total", "Lookups answered from a cache.", ("cache",)
+))
+CACHE_MISSES = REGISTRY.register(Counter(
+    "bughawk_cache_misses_total", "Lookups that missed a cache.", ("cache",)
+))
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "bughawk_queue_depth", "Analysis jobs waiting in the scheduler queue."
+))
+RESULT_STORE_ENTRIES = REGISTRY.register(Gauge(
+    "bughawk_result_store_entries", "Analysis results held in the result store."
+))
+RESULT_STORE_BYTES = REGISTRY.register(Gauge(
+    "bughawk_result_store_bytes", "Approximate serialized size of finished results in the result store."
+))
+STARTUP_DURATION = REGISTRY.register(Gauge(
+    "bughawk_startup_seconds", "Time the application lifespan took to create the services (and warm up) before serving."
+))
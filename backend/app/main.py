@@ -1,26 +1,42 @@
 # backend/app/main.py
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from typing import Dict, Any
+import logging
+import time
 
+from app.api.dependencies import get_app_orchestrator
 from app.api.v1 import bug_analysis
+from app.core import metrics
 from app.core.config import settings
 # from app.database.database import init_db
 
+logger = logging.getLogger(__name__)
+
 # Application lifespan events for database initialization
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    print("Starting up BugHawkAI Backend...")
+    logger.info("Starting up BugHawkAI Backend...")
     # Initialize database
     try:
         # init_db()
-        print("Database initialized successfully.")
+        logger.info("Database initialized successfully.")
     except Exception as e:
-        print(f"Error initializing database: {e}")
+        logger.error(f"Error initializing database: {e}")
         # Depending on criticality, you might want to exit or log more severely
+    started = time.perf_counter()
+    # Services are created here, not at import time, so importing the app stays cheap.
+    analysis_orchestrator = get_app_orchestrator(app)
+    await analysis_orchestrator.start()
+    analysis_orchestrator.bind_metrics()
+    if settings.STARTUP_WARMUP_ENABLED:
+        await analysis_orchestrator.warm_up()
+    metrics.STARTUP_DURATION.set(time.perf_counter() - started)
+    logger.info(f"Services ready in {time.perf_counter() - started:.2f}s.")
     yield
-    print("Shutting down BugHawkAI Backend...")
+    logger.info("Shutting down BugHawkAI Backend...")
+    await analysis_orchestrator.shutdown()
 
 app = FastAPI(
     title="BugHawkAI Backend API",
@@ -45,6 +61,11 @@ app.include_router(bug_analysis.router, prefix="/api/v1", tags=["Bug Analysis"])
 async def root():
     return {"message": "Welcome to BugHawkAI API! Check /docs for API documentation."}
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus text-format metrics: stage latencies, LLM/linter/cache counters, queue and store gauges."""
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     # This block is for local development and testing.
@@ -1,6 +1,6 @@
 # backend/app/models/schemas.py
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class LogSubmissionRequest(BaseModel):
     logs: Optional[str] = None
@@ -13,6 +13,7 @@ class BugPrediction(BaseModel):
     description: str
     severity: str  # e.g., "Low", "Medium", "High", "Critical"
     confidence: float  # 0.0 to 1.0
+    model_tier: Optional[str] = None  # "fast" or "large" for LLM predictions; None for static analysis findings
 
 class SuggestedPatch(BaseModel):
     description: str
@@ -23,4 +24,7 @@ class AnalysisResult(BaseModel):
     status: str  # e.g., "QUEUED", "IN_PROGRESS", "COMPLETED", "FAILED"
     predicted_bugs: List[BugPrediction] = []
     suggested_patches: List[SuggestedPatch] = []
-    error_message: Optional[str] = None
\ No newline at end of file
+    error_message: Optional[str] = None
+    stage_timings: Dict[str, float] = {}  # Milliseconds spent in each pipeline stage
+    similarity_score: Optional[float] = None  # Set when the result was reused from a similar past crash
+    reused_from: Optional[str] = None  # ID of the analysis the result was reused from
\ No newline at end of file
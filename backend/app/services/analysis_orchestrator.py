@@ -1,37 +1,214 @@
 # backend/app/services/analysis_orchestrator.py
 import asyncio
+import hashlib
+import time
 import uuid
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple, Union
 import logging
 
+from pydantic import ValidationError
+
 from app.models.schemas import BugPrediction, SuggestedPatch, AnalysisResult, LogSubmissionRequest
 
 from app.services.llm_service import LLMService
+from app.services.llm_cache import LLMResponseCache
+from app.services.llm_scheduler import LLMRequestScheduler
 from app.services.static_analysis_service import StaticAnalysisService
-from app.utils.log_parser import LogParser
+from app.services.result_store import AnalysisRecord, InMemoryResultStore, SQLiteResultStore, TERMINAL_STATUSES
+from app.services.status_broadcaster import StatusBroadcaster
+from app.services.analysis_scheduler import AnalysisScheduler
+from app.services.pipeline import StagePipeline
+from app.utils.crash_signature import CrashSignature, CrashSignatureBuilder, CrashSimilarityIndex
+from app.utils.log_parser import LogParser, LogSource
+from app.utils.log_upload import LogUpload
+from app.utils.log_template_miner import LogTemplateMiner
+from app.core import metrics
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Confidence assigned to every static analysis finding.
+STATIC_FINDING_CONFIDENCE = 0.7
+
+# How often a status stream re-reads a shared result store for updates made by other worker processes.
+SHARED_STORE_POLL_SECONDS = 1.0
+
+# Logs arrive either as a string or, from the upload endpoint, as a spooled file.
+AnalysisLogs = Union[str, LogUpload]
+
+def _log_source(logs: AnalysisLogs) -> LogSource:
+    """Returns something LogParser and LogTemplateMiner can stream; each call gets its own reader."""
+    return logs.open() if isinstance(logs, LogUpload) else logs
+
 class AnalysisOrchestrator:
     """
     Orchestrates the entire analysis workflow:
-    1. Parses logs.
+    1. Parses logs and collapses repetitive lines into templates.
     2. Runs static analysis (if code provided).
     3. Uses LLM for bug prediction.
     4. Uses LLM for patch suggestion.
-    5. Stores results in the database.
+    5. Stores results in a bounded, expiring result store and pushes every
+       update to status stream subscribers.
+
+    Steps 1-3 run concurrently; patch suggestion starts once the top bug is
+    known, or as soon as the streamed LLM prediction yields a confident bug.
+    Identical submissions arriving while an analysis is queued or running
+    are attached to it instead of starting another pipeline, and a crash
+    that is a near-duplicate of one analysed before reuses that result.
     """
     def __init__(self, llm_service: Optional[LLMService] = None):
         self.llm_service = llm_service if llm_service else LLMService()
         self.static_analysis_service = StaticAnalysisService()
         self.log_parser = LogParser()
-        self._in_memory_results: Dict[str, AnalysisResult] = {}
+        self._results = self._create_result_store()
+        self.status_broadcaster = StatusBroadcaster()
+        self.scheduler = AnalysisScheduler(
+            max_queue_size=settings.ANALYSIS_QUEUE_MAX_SIZE,
+            num_workers=settings.ANALYSIS_WORKERS,
+            retry_after_seconds=settings.ANALYSIS_QUEUE_RETRY_AFTER_SECONDS,
+        )
+        # Per-stage caps so a burst of jobs cannot all hit the linters or the LLM at once.
+        self._static_analysis_slots = asyncio.Semaphore(settings.ANALYSIS_MAX_CONCURRENT_STATIC_ANALYSIS)
+        self._llm_slots = asyncio.Semaphore(settings.ANALYSIS_MAX_CONCURRENT_LLM_STAGES)
+        # Single-flight registry: submission fingerprint <-> ID of the analysis computing it.
+        self._in_flight: Dict[str, str] = {}
+        self._in_flight_fingerprints: Dict[str, str] = {}
+        self.coalesced_submissions = 0
+        self.crash_signature_builder = CrashSignatureBuilder()
+        self.similarity_index = CrashSimilarityIndex(
+            threshold=settings.CRASH_SIMILARITY_THRESHOLD,
+            max_entries=settings.CRASH_SIMILARITY_MAX_ENTRIES,
+            # Reused results are as old as their LLM answers, so they expire with the LLM cache.
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+        )
+        self.similarity_hits = 0
+        self._metrics_bound = False
+
+    def _create_result_store(self) -> Union[InMemoryResultStore, SQLiteResultStore]:
+        """The backend chosen by RESULT_STORE_BACKEND; "sqlite" shares results between worker processes."""
+        limits = dict(
+            ttl_seconds=settings.RESULT_STORE_TTL_SECONDS,
+            max_entries=settings.RESULT_STORE_MAX_ENTRIES,
+            max_bytes=settings.RESULT_STORE_MAX_BYTES,
+            sweep_interval_seconds=settings.RESULT_STORE_SWEEP_INTERVAL_SECONDS,
+        )
+        if settings.RESULT_STORE_BACKEND == "sqlite":
+            # Subscribers learn of analyses failed because they could not be stored like of any other update.
+            return SQLiteResultStore(settings.RESULT_STORE_SQLITE_PATH, on_write_failed=self._publish, **limits)
+        return InMemoryResultStore(**limits)
 
     def start_analysis_background(
-        self, logs: Optional[str], code_snippet: Optional[str], platform: str, language: str
+        self, logs: Optional[AnalysisLogs], code_snippet: Optional[str], platform: str, language: str
     ) -> str:
+        """
+        Queues an analysis and returns its ID immediately. If an identical
+        submission is already queued or running, nothing new is started and
+        the returned ID is an alias that resolves to the shared result.
+        Raises QueueFullError when the scheduler's queue is full.
+        """
+        fingerprint = self._submission_fingerprint(logs, code_snippet, platform, language)
+        alias_id = self._attach_to_in_flight(fingerprint)
+        if alias_id is not None:
+            if isinstance(logs, LogUpload):
+                logs.close()
+            return alias_id
         analysis_id = str(uuid.uuid4())
+        self.scheduler.submit(self._perform_analysis, analysis_id, logs, code_snippet, platform, language)
+        self._queue_report(analysis_id)
+        self._register_in_flight(fingerprint, analysis_id)
+        return analysis_id
+
+    def start_batch_analysis(self, submissions: List[LogSubmissionRequest]) -> List[str]:
+        """
+        Queues a batch of analyses and returns their IDs in submission order.
+        Small submissions are grouped so that each group shares one LLM
+        prediction request; each group is one scheduler job. Submissions
+        identical to one in flight, or to an earlier one in the batch, get an
+        alias instead. Raises QueueFullError, without queueing anything, if
+        the groups do not fit.
+        """
+        fingerprints = [
+            self._submission_fingerprint(s.logs, s.code_snippet, s.platform or "", s.language or "") for s in submissions
+        ]
+        seen = set()
+        unique = []
+        for index, fingerprint in enumerate(fingerprints):
+            if fingerprint is not None and (fingerprint in seen or fingerprint in self._in_flight):
+                continue
+            seen.add(fingerprint)
+            unique.append(index)
+
+        items = [(submissions[index].logs, submissions[index].code_snippet) for index in unique]
+        if hasattr(self.llm_service, "plan_batches"):
+            groups = [[unique[position] for position in group] for group in self.llm_service.plan_batches(items)]
+        else:
+            groups = [[index] for index in unique]
+        self.scheduler.ensure_capacity(len(groups))
+
+        analysis_ids: List[Optional[str]] = [None] * len(submissions)
+        for index in unique:
+            analysis_ids[index] = str(uuid.uuid4())
+        for group in groups:
+            jobs = [
+                (analysis_ids[index], submissions[index].logs, submissions[index].code_snippet,
+                 submissions[index].platform or "", submissions[index].language or "")
+                for index in group
+            ]
+            if len(jobs) == 1:
+                self.scheduler.submit(self._perform_analysis, *jobs[0])
+            else:
+                self.scheduler.submit(self._perform_batch_analysis, jobs)
+            for job, index in zip(jobs, group):
+                self._queue_report(job[0])
+                self._register_in_flight(fingerprints[index], job[0])
+
+        for index, submission in enumerate(submissions):
+            if analysis_ids[index] is None:
+                analysis_ids[index] = self._attach_to_in_flight(fingerprints[index]) or self.start_analysis_background(
+                    submission.logs, submission.code_snippet, submission.platform or "", submission.language or ""
+                )
+        return analysis_ids
+
+    def _submission_fingerprint(
+        self, logs: Optional[AnalysisLogs], code_snippet: Optional[str], platform: str, language: str
+    ) -> Optional[str]:
+        """Hash identifying a submission for coalescing; None when coalescing is disabled."""
+        if not settings.ANALYSIS_COALESCING_ENABLED:
+            return None
+        log_key = f"upload:{logs.sha256}" if isinstance(logs, LogUpload) else LLMResponseCache.normalize(logs)
+        digest = hashlib.sha256()
+        for part in (log_key, LLMResponseCache.normalize(code_snippet), platform.strip().lower(), language.strip().lower()):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def _attach_to_in_flight(self, fingerprint: Optional[str]) -> Optional[str]:
+        """Returns a new alias ID for the queued or running analysis with this fingerprint, if there is one."""
+        analysis_id = self._in_flight.get(fingerprint) if fingerprint is not None else None
+        if analysis_id is None:
+            return None
+        result = self._results.get(analysis_id)
+        if result is None or result.status in TERMINAL_STATUSES:
+            return None
+        alias_id = str(uuid.uuid4())
+        self._results.add_alias(alias_id, analysis_id)
+        self.coalesced_submissions += 1
+        metrics.CACHE_HITS.inc(cache="in_flight")
+        logger.info(f"Submission {alias_id} attached to identical in-flight analysis {analysis_id}.")
+        return alias_id
+
+    def _register_in_flight(self, fingerprint: Optional[str], analysis_id: str):
+        if fingerprint is not None:
+            self._in_flight[fingerprint] = analysis_id
+            self._in_flight_fingerprints[analysis_id] = fingerprint
+
+    def _release_in_flight(self, analysis_id: str):
+        fingerprint = self._in_flight_fingerprints.pop(analysis_id, None)
+        if fingerprint is not None and self._in_flight.get(fingerprint) == analysis_id:
+            del self._in_flight[fingerprint]
+
+    def _queue_report(self, analysis_id: str):
         initial_report = AnalysisResult(
             analysis_id=analysis_id,
             status="QUEUED",
@@ -39,93 +216,411 @@ class AnalysisOrchestrator:
             suggested_patches=[],
             error_message=None
         )
-        self._in_memory_results[analysis_id] = initial_report
+        self._store_report(initial_report)
 
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(
-                self._perform_analysis(analysis_id, logs, code_snippet, platform, language)
+    async def _perform_batch_analysis(self, jobs: List[Tuple[str, Optional[str], Optional[str], str, str]]):
+        """Runs one shared LLM prediction for a group of submissions, then finishes each analysis individually."""
+        for job in jobs:
+            self._update_in_memory_report(
+                analysis_id=job[0], status="IN_PROGRESS", error_message="Predicting bugs in a shared batch request..."
             )
-        except RuntimeError:
-            asyncio.run(self._perform_analysis(analysis_id, logs, code_snippet, platform, language))
-
-        return analysis_id
+        try:
+            llm_logs = await asyncio.gather(*(self._prepare_logs_for_llm(job[1]) for job in jobs))
+            async with self._llm_slots:
+                predictions = await self.llm_service.predict_bugs_batch(
+                    [(logs, job[2]) for logs, job in zip(llm_logs, jobs)]
+                )
+        except Exception as e:
+            logger.error(f"Batch prediction failed, analysing {len(jobs)} items individually: {e}", exc_info=True)
+            predictions = [None] * len(jobs)
+        await asyncio.gather(*(
+            self._perform_analysis(*job, llm_bug_predictions=prediction) for job, prediction in zip(jobs, predictions)
+        ))
 
     async def _perform_analysis(
-        self, analysis_id: str, logs: Optional[str], code_snippet: Optional[str], platform: str, language: str
+        self,
+        analysis_id: str,
+        logs: Optional[AnalysisLogs],
+        code_snippet: Optional[str],
+        platform: str,
+        language: str,
+        llm_bug_predictions: Optional[List[Dict]] = None,
     ):
+        """
+        Runs the analysis pipeline for one submission. `llm_bug_predictions`
+        carries predictions already obtained from a shared batch request, in
+        which case the LLM prediction stage is skipped.
+        """
+        started = time.perf_counter()
+        language_label = metrics.language_label(language)
+        outcome = "FAILED"
         try:
             logger.info(f"Starting detailed analysis for ID: {analysis_id}")
             self._update_in_memory_report(analysis_id=analysis_id, status="IN_PROGRESS", error_message="Performing analysis...")
 
-            predicted_bugs: List[BugPrediction] = []
-            suggested_patches: List[SuggestedPatch] = []
-
-            parsed_log_summary = self.log_parser.parse(logs) if logs else "No logs provided."
-
-            static_analysis_findings = []
-            if code_snippet:
-                logger.info(f"Running static analysis for {language}...")
-                if language.lower() in ["python", "swift", "ios", "kotlin", "android", "java"]:
-                    static_analysis_findings = await self.static_analysis_service.run_analysis(code_snippet, language)
-                else:
-                    static_analysis_findings = []
-
-                for finding in static_analysis_findings:
-                    predicted_bugs.append(BugPrediction(
-                        type=f"StaticAnalysis_{finding.get('rule', finding.get('check', 'Generic'))}",
-                        description=finding.get('reason', finding.get('message', 'Static analysis issue.')),
-                        severity="Medium",
-                        location=f"{finding.get('file', 'N/A')}:{finding.get('line', 'N/A')}",
-                        confidence=0.7,
-                        explanation=f"Detected by static analysis tool. Rule: {finding.get('rule', finding.get('check', 'N/A'))}"
-                    ))
-
-            if logs or code_snippet:
-                logger.info("Running LLM for bug prediction...")
-                if hasattr(self.llm_service, "mock_predict_bug_from_logs"):
-                    llm_bug_predictions = await self.llm_service.mock_predict_bug_from_logs(logs, code_snippet)
-                else:
-                    llm_bug_predictions = await self.llm_service.predict_bug_from_logs(logs, code_snippet)
-                for bug in llm_bug_predictions:
-                    predicted_bugs.append(BugPrediction(**bug))
-
-            if predicted_bugs:
-                logger.info("Running LLM for patch suggestion...")
-                top_bug = sorted(predicted_bugs, key=lambda b: b.confidence, reverse=True)[0]
-                if top_bug and code_snippet:
-                    if hasattr(self.llm_service, "mock_suggest_patch_for_bug"):
-                        llm_patch_suggestions = await self.llm_service.mock_suggest_patch_for_bug(top_bug.description, code_snippet, language)
-                    else:
-                        llm_patch_suggestions = await self.llm_service.suggest_patch_for_bug(top_bug.description, code_snippet, language)
-                    for patch in llm_patch_suggestions:
-                        suggested_patches.append(SuggestedPatch(**patch))
-
-            final_report = AnalysisResult(
+            crash = await self._crash_signature(logs, code_snippet, platform, language)
+            if crash is not None and self._reuse_similar_analysis(analysis_id, crash):
+                outcome = "REUSED"
+                return
+
+            pipeline = StagePipeline(
+                on_stage_complete=lambda stage, value: self._record_partial_findings(analysis_id, stage, pipeline)
+            )
+            # Resolved with the first streamed bug confident enough to patch before prediction finishes.
+            early_patch_bug: asyncio.Future = asyncio.get_running_loop().create_future()
+            pipeline.add("parse_logs", lambda p: self._parse_logs_stage(logs))
+            pipeline.add("static_analysis", lambda p: self._static_analysis_stage(code_snippet, language))
+            if llm_bug_predictions is None:
+                pipeline.add("prepare_logs", lambda p: self._prepare_logs_for_llm(logs))
+                pipeline.add(
+                    "llm_prediction",
+                    lambda p: self._llm_prediction_stage(
+                        p, analysis_id, p.results["prepare_logs"], logs, code_snippet, early_patch_bug
+                    ),
+                    depends_on=["prepare_logs"],
+                )
+            else:
+                pipeline.add("llm_prediction", lambda p: self._precomputed_prediction_stage(analysis_id, llm_bug_predictions))
+            # Not declared as depending on llm_prediction: the stage waits for it itself unless a bug arrives early.
+            pipeline.add("patch_suggestion", lambda p: self._patch_suggestion_stage(p, code_snippet, language, early_patch_bug))
+            try:
+                results = await pipeline.run()
+            finally:
+                for stage, milliseconds in pipeline.timings.items():
+                    metrics.STAGE_DURATION.observe(milliseconds / 1000, stage=stage, language=language_label)
+
+            predicted_bugs: List[BugPrediction] = results["static_analysis"] + results["llm_prediction"]
+            suggested_patches: List[SuggestedPatch] = results["patch_suggestion"]
+
+            self._update_in_memory_report(
                 analysis_id=analysis_id,
                 status="COMPLETED",
                 error_message=None,
                 predicted_bugs=predicted_bugs,
                 suggested_patches=suggested_patches,
+                stage_timings=pipeline.timings,
             )
-            report_dict = final_report.dict()
-            if 'analysis_id' in report_dict:
-                del report_dict['analysis_id']
-            self._update_in_memory_report(analysis_id=analysis_id, **report_dict)
-            logger.info(f"Analysis {analysis_id} completed.")
+            outcome = "COMPLETED"
+            logger.info(f"Analysis {analysis_id} completed. Stage timings (ms): {pipeline.timings}")
+            # Static findings describe the code rather than the crash, and no LLM findings may just mean
+            # the LLM call failed, so only analyses with LLM findings are worth reusing.
+            if crash is not None and results["llm_prediction"]:
+                self.similarity_index.add(crash, (analysis_id, predicted_bugs, suggested_patches))
 
         except Exception as e:
             logger.error(f"Analysis {analysis_id} failed: {e}", exc_info=True)
             self._update_in_memory_report(analysis_id=analysis_id, status="FAILED", error_message=f"Analysis failed: {str(e)}")
+        finally:
+            metrics.ANALYSIS_DURATION.observe(time.perf_counter() - started, language=language_label, status=outcome)
+            self._release_in_flight(analysis_id)
+            if isinstance(logs, LogUpload):
+                logs.close()
+
+    async def _crash_signature(
+        self, logs: Optional[AnalysisLogs], code_snippet: Optional[str], platform: str, language: str
+    ) -> Optional[CrashSignature]:
+        """Signature of the crash in the logs, scoped to the same code, platform and language."""
+        if not logs or not settings.CRASH_SIMILARITY_ENABLED:
+            return None
+        context = hashlib.sha256(
+            "\x00".join((LLMResponseCache.normalize(code_snippet), platform.strip().lower(), language.strip().lower())).encode("utf-8")
+        ).hexdigest()
+        return await asyncio.to_thread(self.crash_signature_builder.build, _log_source(logs), context)
+
+    def _reuse_similar_analysis(self, analysis_id: str, crash: CrashSignature) -> bool:
+        """Completes the analysis with the results of a similar past crash, if the index has one."""
+        started = time.perf_counter()
+        match = self.similarity_index.find(crash)
+        if match is None:
+            metrics.CACHE_MISSES.inc(cache="similarity")
+            return False
+        metrics.CACHE_HITS.inc(cache="similarity")
+        (source_id, predicted_bugs, suggested_patches), score = match
+        self.similarity_hits += 1
+        self._update_in_memory_report(
+            analysis_id=analysis_id,
+            status="COMPLETED",
+            error_message=None,
+            predicted_bugs=predicted_bugs,
+            suggested_patches=suggested_patches,
+            stage_timings={"similarity_lookup": round((time.perf_counter() - started) * 1000, 3)},
+            similarity_score=round(score, 3),
+            reused_from=source_id,
+        )
+        logger.info(f"Analysis {analysis_id} reused the results of {source_id} (similarity {score:.2f}).")
+        return True
+
+    def _record_partial_findings(self, analysis_id: str, stage: str, pipeline: StagePipeline):
+        """Publishes the bugs found so far while the remaining stages are still running."""
+        if stage not in ("static_analysis", "llm_prediction"):
+            return
+        predicted_bugs = pipeline.results.get("static_analysis", []) + pipeline.results.get("llm_prediction", [])
+        if predicted_bugs:
+            self._update_in_memory_report(analysis_id=analysis_id, predicted_bugs=predicted_bugs)
+
+    async def _parse_logs_stage(self, logs: Optional[AnalysisLogs]) -> Dict[str, Any]:
+        if not logs:
+            return {}
+        return await asyncio.to_thread(self.log_parser.parse_stream, _log_source(logs))
+
+    async def _static_analysis_stage(self, code_snippet: Optional[str], language: str) -> List[BugPrediction]:
+        if not code_snippet or language.lower() not in ["python", "swift", "ios", "kotlin", "android", "java"]:
+            return []
+        logger.info(f"Running static analysis for {language}...")
+        async with self._static_analysis_slots:
+            static_analysis_findings = await self.static_analysis_service.run_analysis(code_snippet, language)
+        return [
+            BugPrediction(
+                type=f"StaticAnalysis_{finding.get('rule', finding.get('check', 'Generic'))}",
+                description=finding.get('reason', finding.get('message', 'Static analysis issue.')),
+                severity="Medium",
+                location=f"{finding.get('file', 'N/A')}:{finding.get('line', 'N/A')}",
+                confidence=STATIC_FINDING_CONFIDENCE,
+                explanation=f"Detected by static analysis tool. Rule: {finding.get('rule', finding.get('check', 'N/A'))}"
+            )
+            for finding in static_analysis_findings
+        ]
+
+    async def _llm_prediction_stage(
+        self,
+        pipeline: StagePipeline,
+        analysis_id: str,
+        llm_logs: Optional[str],
+        logs: Optional[AnalysisLogs],
+        code_snippet: Optional[str],
+        early_patch_bug: asyncio.Future,
+    ) -> List[BugPrediction]:
+        if not logs and not code_snippet:
+            return []
+        streamed_bugs: List[BugPrediction] = []
+
+        def on_bug(bug: Dict):
+            prediction = self._to_bug_prediction(analysis_id, bug)
+            if prediction is None:
+                return
+            streamed_bugs.append(prediction)
+            self._update_in_memory_report(
+                analysis_id=analysis_id,
+                predicted_bugs=pipeline.results.get("static_analysis", []) + streamed_bugs,
+            )
+            if (
+                settings.ANALYSIS_EARLY_PATCH_ENABLED
+                and not early_patch_bug.done()
+                and prediction.confidence >= settings.ANALYSIS_STREAMING_PATCH_CONFIDENCE
+            ):
+                early_patch_bug.set_result(prediction)
+
+        logger.info("Running LLM for bug prediction...")
+        async with self._llm_slots:
+            if hasattr(self.llm_service, "mock_predict_bug_from_logs"):
+                llm_bug_predictions = await self.llm_service.mock_predict_bug_from_logs(llm_logs, code_snippet)
+            else:
+                llm_bug_predictions = await self.llm_service.predict_bug_from_logs(llm_logs, code_snippet, on_bug=on_bug)
+        return self._to_bug_predictions(analysis_id, llm_bug_predictions)
+
+    async def _precomputed_prediction_stage(self, analysis_id: str, llm_bug_predictions: List[Dict]) -> List[BugPrediction]:
+        return self._to_bug_predictions(analysis_id, llm_bug_predictions)
+
+    def _to_bug_predictions(self, analysis_id: str, bugs: List[Any]) -> List[BugPrediction]:
+        predictions = (self._to_bug_prediction(analysis_id, bug) for bug in bugs)
+        return [prediction for prediction in predictions if prediction is not None]
+
+    @staticmethod
+    def _to_bug_prediction(analysis_id: str, bug: Any) -> Optional[BugPrediction]:
+        """Validates one bug from the LLM's JSON; elements that are not bug objects are logged and skipped."""
+        if not isinstance(bug, dict):
+            logger.warning(f"Ignoring non-object bug for analysis {analysis_id}: {bug!r}")
+            return None
+        try:
+            return BugPrediction(**bug)
+        except ValidationError as e:
+            logger.warning(f"Ignoring invalid bug for analysis {analysis_id}: {e}")
+            return None
+
+    async def _patch_suggestion_stage(
+        self, pipeline: StagePipeline, code_snippet: Optional[str], language: str, early_patch_bug: asyncio.Future
+    ) -> List[SuggestedPatch]:
+        if not code_snippet:
+            return []
+        prediction = asyncio.ensure_future(pipeline.result("llm_prediction"))
+        await asyncio.wait([prediction, early_patch_bug], return_when=asyncio.FIRST_COMPLETED)
+        if early_patch_bug.done():
+            prediction.cancel()  # only this waiter; the prediction stage itself keeps running
+            return await self._suggest_patches(early_patch_bug.result(), code_snippet, language)
+
+        llm_bugs: List[BugPrediction] = prediction.result()
+        top_llm_bug = max(llm_bugs, key=lambda b: b.confidence, default=None)
+        # Static findings all carry STATIC_FINDING_CONFIDENCE, so an LLM bug above it
+        # is the top bug regardless of what the linters report: start patching now.
+        if settings.ANALYSIS_EARLY_PATCH_ENABLED and top_llm_bug and top_llm_bug.confidence > STATIC_FINDING_CONFIDENCE:
+            top_bug = top_llm_bug
+        else:
+            predicted_bugs = await pipeline.result("static_analysis") + llm_bugs
+            if not predicted_bugs:
+                return []
+            top_bug = sorted(predicted_bugs, key=lambda b: b.confidence, reverse=True)[0]
+        return await self._suggest_patches(top_bug, code_snippet, language)
+
+    async def _suggest_patches(self, top_bug: BugPrediction, code_snippet: str, language: str) -> List[SuggestedPatch]:
+        logger.info("Running LLM for patch suggestion...")
+        async with self._llm_slots:
+            if hasattr(self.llm_service, "mock_suggest_patch_for_bug"):
+                llm_patch_suggestions = await self.llm_service.mock_suggest_patch_for_bug(top_bug.description, code_snippet, language)
+            else:
+                llm_patch_suggestions = await self.llm_service.suggest_patch_for_bug(top_bug.description, code_snippet, language)
+        return [SuggestedPatch(**patch) for patch in llm_patch_suggestions]
+
+    async def _prepare_logs_for_llm(self, logs: Optional[AnalysisLogs]) -> Optional[str]:
+        """
+        Returns the log text to send to the LLM: a compact template summary
+        when mining is enabled and actually shrinks a large log, else the raw
+        logs. An uploaded log is only read into a string in the latter case,
+        and then only up to UPLOAD_PROMPT_MAX_BYTES of its head and tail.
+
+        Templates are mined per submission: a miner shared across requests
+        would let earlier, unrelated logs generalize this one's templates, so
+        the same log could render differently (and miss the LLM cache).
+        """
+        if not logs or not settings.LOG_TEMPLATE_MINING_ENABLED:
+            return await self._log_text(logs)
+        miner = LogTemplateMiner(max_clusters=settings.LOG_TEMPLATE_MAX_CLUSTERS)
+        summary = await asyncio.to_thread(miner.summarize, _log_source(logs), settings.LOG_TEMPLATE_MAX_TEMPLATES)
+        if summary.line_count < settings.LOG_TEMPLATE_MIN_LINES:
+            return await self._log_text(logs)
+        rendered = summary.render()
+        if len(rendered) >= len(logs):
+            return await self._log_text(logs)
+        logger.info(
+            f"Collapsed {summary.line_count} log lines into {summary.template_count} templates "
+            f"({len(logs)} -> {len(rendered)} chars)."
+        )
+        return rendered
+
+    async def _log_text(self, logs: Optional[AnalysisLogs]) -> Optional[str]:
+        # The prompt only has room for a fraction of a large upload anyway, so only its head and tail are loaded.
+        if isinstance(logs, LogUpload):
+            return await asyncio.to_thread(logs.read_text, settings.UPLOAD_PROMPT_MAX_BYTES)
+        return logs
+
+    async def start(self):
+        """Starts the analysis workers and expired-result sweeping. Call from the application lifespan."""
+        self.scheduler.start()
+        self._results.start_sweeper()
+
+    async def warm_up(self):
+        """Optional startup work that would otherwise delay the first analyses: starts linter workers, checks linters."""
+        await self.static_analysis_service.warm_up()
+
+    def bind_metrics(self):
+        """Reports this orchestrator's queue and result store through the global gauges. Call from the application lifespan."""
+        metrics.QUEUE_DEPTH.set_function(lambda: self.scheduler.queue_depth)
+        metrics.RESULT_STORE_ENTRIES.set_function(lambda: len(self._results))
+        metrics.RESULT_STORE_BYTES.set_function(lambda: self._results.stats()["bytes"])
+        self._metrics_bound = True
+
+    def unbind_metrics(self):
+        if self._metrics_bound:
+            for gauge in (metrics.QUEUE_DEPTH, metrics.RESULT_STORE_ENTRIES, metrics.RESULT_STORE_BYTES):
+                gauge.set_function(None)
+            self._metrics_bound = False
+
+    async def shutdown(self):
+        """Releases resources held by the underlying services (LLM connection pool, linter workers)."""
+        self.unbind_metrics()
+        await self.scheduler.stop()
+        await self._results.stop_sweeper()
+        if isinstance(self._results, SQLiteResultStore):
+            # Waits for the queued writes, which may wait for another process's lock.
+            await asyncio.to_thread(self._results.close)
+        if hasattr(self.llm_service, "aclose"):
+            await self.llm_service.aclose()
+        await self.static_analysis_service.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "queue": self.scheduler.stats(),
+            "result_store": self._results.stats(),
+            "status_subscribers": self.status_broadcaster.subscriber_count,
+            "coalesced_submissions": self.coalesced_submissions,
+            "similarity_index": {"entries": len(self.similarity_index), "hits": self.similarity_hits},
+        }
+        findings_cache = getattr(self.static_analysis_service, "findings_cache", None)
+        if findings_cache is not None:
+            stats["static_analysis_cache"] = findings_cache.stats()
+        cache = getattr(self.llm_service, "cache", None)
+        if cache is not None:
+            stats["llm_cache"] = cache.stats()
+        llm_scheduler = getattr(self.llm_service, "scheduler", None)
+        if isinstance(llm_scheduler, LLMRequestScheduler):
+            stats["llm_rate_limit"] = llm_scheduler.stats()
+        return stats
 
     def get_analysis_results(self, analysis_id: str) -> Optional[AnalysisResult]:
-        return self._in_memory_results.get(analysis_id)
+        return self._results.get(analysis_id)
+
+    def get_analysis_json(self, analysis_id: str) -> Optional[bytes]:
+        """The analysis result already serialized as JSON, for responses that need no model."""
+        return self._results.get_json(analysis_id)
+
+    async def stream_analysis_updates(self, analysis_id: str, heartbeat_seconds: float) -> AsyncIterator[Optional[str]]:
+        """
+        Yields the analysis as serialized JSON: the current snapshot first,
+        then every update until it completes or fails. Yields None after
+        `heartbeat_seconds` without an update so callers can keep the
+        connection alive. Yields nothing if the analysis is unknown.
+
+        With a shared result store the analysis may be running in another
+        worker process, whose updates are not published here; the store is
+        then also polled every SHARED_STORE_POLL_SECONDS.
+        """
+        # Updates are published under the ID of the analysis doing the work, which differs for an alias.
+        target_id = self._results.resolve(analysis_id)
+        # Subscribe before reading the snapshot so no update can slip in between.
+        subscription = self.status_broadcaster.subscribe(target_id)
+        try:
+            record = self._results.get_record(analysis_id)
+            if record is None:
+                return
+            last_payload = self._results.get_json(analysis_id).decode("utf-8")
+            yield last_payload
+            if record.status in TERMINAL_STATUSES:
+                return
+            poll_seconds = min(heartbeat_seconds, SHARED_STORE_POLL_SECONDS) if self._results.shared else heartbeat_seconds
+            last_sent = time.monotonic()
+            while not subscription.finished:
+                payload = await subscription.next(poll_seconds)
+                if payload is not None and target_id != analysis_id:
+                    payload = payload.replace(target_id, analysis_id, 1)  # analysis_id is the first field
+                if payload is None and self._results.shared:
+                    stored = self._results.get_json(analysis_id)
+                    if stored is None:
+                        return
+                    if stored.decode("utf-8") != last_payload:
+                        payload = stored.decode("utf-8")
+                        record = self._results.get_record(analysis_id)
+                        if record is None or record.status in TERMINAL_STATUSES:
+                            yield payload
+                            return
+                if payload is None and time.monotonic() - last_sent < heartbeat_seconds:
+                    continue
+                if payload is not None:
+                    last_payload = payload
+                last_sent = time.monotonic()
+                yield payload
+        finally:
+            self.status_broadcaster.unsubscribe(subscription)
+
+    def _store_report(self, report: AnalysisResult):
+        self._publish(self._results.put(report))
 
     def _update_in_memory_report(self, analysis_id: str, **kwargs):
-        if analysis_id in self._in_memory_results:
-            existing_report = self._in_memory_results[analysis_id]
-            updated_data = existing_report.dict(exclude_unset=True)
-            updated_data.update(kwargs)
-            if 'analysis_id' in updated_data:
-                del updated_data['analysis_id']
-            self._in_memory_results[analysis_id] = AnalysisResult(analysis_id=analysis_id, **updated_data)
+        """Updates the stored result in place; values must already have the AnalysisResult field types."""
+        record = self._results.update(analysis_id, **kwargs)
+        if record is not None:
+            self._publish(record)
+
+    def _publish(self, record: AnalysisRecord):
+        if self.status_broadcaster.has_subscribers(record.analysis_id):
+            self.status_broadcaster.publish(
+                record.analysis_id, record.to_json().decode("utf-8"), final=record.status in TERMINAL_STATUSES
+            )
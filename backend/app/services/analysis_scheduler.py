@@ -0,0 +1,117 @@
+# backend/app/services/analysis_scheduler.py
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+class QueueFullError(Exception):
+    """Raised when the analysis queue cannot accept another job."""
+    def __init__(self, retry_after_seconds: int):
+        super().__init__("Analysis queue is full")
+        self.retry_after_seconds = retry_after_seconds
+
+class AnalysisScheduler:
+    """
+    Bounded job queue drained by a fixed number of worker tasks.
+
+    A job is a coroutine function plus its arguments. submit() never blocks:
+    it either enqueues the job or raises QueueFullError so the API can shed
+    load with HTTP 429 instead of starting an unbounded number of pipelines.
+    Workers are started on the running event loop the first time a job is
+    submitted from inside one (or by start()), so jobs submitted outside a
+    loop simply wait in the queue.
+    """
+    def __init__(self, max_queue_size: int, num_workers: int, retry_after_seconds: int = 5):
+        self.max_queue_size = max_queue_size
+        self.num_workers = num_workers
+        self.retry_after_seconds = retry_after_seconds
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._workers: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.active_jobs = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def free_slots(self) -> int:
+        return self.max_queue_size - self._queue.qsize()
+
+    def ensure_capacity(self, jobs: int):
+        """Raises QueueFullError unless `jobs` more jobs fit in the queue right now."""
+        if jobs > self.free_slots:
+            self.rejected += 1
+            raise QueueFullError(self.retry_after_seconds)
+
+    def submit(self, fn: Callable[..., Awaitable[Any]], *args: Any):
+        try:
+            self._queue.put_nowait((fn, args, time.monotonic()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFullError(self.retry_after_seconds)
+        self.submitted += 1
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self.start()
+
+    def start(self):
+        """Starts the worker tasks on the running loop if they are not already running there."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and any(not worker.done() for worker in self._workers):
+            return
+        if self._loop is not None and self._loop is not loop:
+            # The previous loop is gone (e.g. a test client); carry queued jobs over to a queue bound to this one.
+            pending: List[Tuple] = []
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            for job in pending:
+                self._queue.put_nowait(job)
+            self.active_jobs = 0
+        self._loop = loop
+        self._workers = [loop.create_task(self._worker()) for _ in range(self.num_workers)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        if self._loop is asyncio.get_running_loop():
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self):
+        while True:
+            fn, args, enqueued_at = await self._queue.get()
+            metrics.QUEUE_WAIT.observe(time.monotonic() - enqueued_at)
+            self.active_jobs += 1
+            try:
+                await fn(*args)
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Scheduled analysis job failed: {e}", exc_info=True)
+            finally:
+                self.active_jobs -= 1
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_size": self.max_queue_size,
+            "workers": self.num_workers,
+            "active_jobs": self.active_jobs,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
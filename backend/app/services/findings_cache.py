@@ -0,0 +1,71 @@
+# backend/app/services/findings_cache.py
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class FindingsCache:
+    """
+    LRU cache of static analysis findings, so a snippet already linted with
+    the same tool, tool version and rules is not linted again.
+
+    Keys are built by make_key() from the snippet's content hash, its
+    language, the linter's fingerprint (binary, its stat and its version)
+    and the rule configuration. An upgraded linter therefore misses on
+    every old key; invalidate_tool() also drops the old entries right away
+    instead of leaving them to age out.
+
+    Findings are stored as JSON text so that callers always receive a fresh
+    copy they are free to mutate.
+    """
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(language: str, tool_fingerprint: str, rule_config: str, code_snippet: str) -> str:
+        digest = hashlib.sha256()
+        for field in (language, tool_fingerprint, rule_config, code_snippet):
+            digest.update(field.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return json.loads(entry[1])
+
+    def put(self, key: str, tool: str, findings: List[Dict[str, Any]]):
+        self._entries[key] = (tool, json.dumps(findings))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_tool(self, tool: str) -> int:
+        """Drops every entry produced by `tool`, e.g. after it was upgraded. Returns how many were dropped."""
+        stale = [key for key, (entry_tool, _) in self._entries.items() if entry_tool == tool]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
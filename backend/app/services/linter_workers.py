@@ -0,0 +1,126 @@
+# backend/app/services/linter_workers.py
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class LinterWorker:
+    """
+    A single long-lived linter process speaking a JSON-lines protocol over
+    stdin/stdout (see pylint_worker.py). The worker is recycled after
+    `max_jobs` requests, and restarted on the next request if it crashed.
+    """
+    def __init__(self, command: List[str], max_jobs: int, startup_timeout: float):
+        self.command = command
+        self.max_jobs = max_jobs
+        self.startup_timeout = startup_timeout
+        self.jobs_done = 0
+        self.restarts = 0
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def is_alive(self) -> bool:
+        return (
+            self._process is not None
+            and self._process.returncode is None
+            and self._loop is asyncio.get_running_loop()
+        )
+
+    async def start(self):
+        if self._loop is not None:
+            self.restarts += 1
+        self._process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=16 * 1024 * 1024,  # single-line JSON replies can be large
+        )
+        self._loop = asyncio.get_running_loop()
+        self.jobs_done = 0
+        try:
+            ready = await asyncio.wait_for(self._read_reply(), timeout=self.startup_timeout)
+        except asyncio.TimeoutError:
+            ready = {"error": "worker did not become ready in time"}
+        except (RuntimeError, ValueError) as e:
+            ready = {"error": str(e)}
+        if not ready.get("ready"):
+            await self.stop()
+            raise RuntimeError(f"Linter worker failed to start: {ready.get('error', 'unknown error')}")
+
+    async def stop(self):
+        process, self._process = self._process, None
+        if process is None or process.returncode is not None:
+            return
+        if self._loop is not asyncio.get_running_loop():
+            # Pipes belong to a loop that is gone; just make sure the process dies.
+            process.kill()
+            return
+        process.kill()
+        await process.wait()
+
+    async def _read_reply(self) -> Dict[str, Any]:
+        line = await self._process.stdout.readline()
+        if not line:
+            raise RuntimeError("worker exited")
+        return json.loads(line)
+
+    async def request(self, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        if not self.is_alive or self.jobs_done >= self.max_jobs:
+            await self.stop()
+            await self.start()
+        self.jobs_done += 1
+        self._process.stdin.write((json.dumps(payload) + "\n").encode())
+        await self._process.stdin.drain()
+        return await asyncio.wait_for(self._read_reply(), timeout=timeout)
+
+
+class LinterWorkerPool:
+    """
+    Fixed-size pool of warm LinterWorkers. Workers are started lazily on first
+    use, so the interpreter/JVM startup cost is paid once per worker instead
+    of once per snippet.
+    """
+    def __init__(self, command: List[str], size: int, max_jobs: int, timeout: float, startup_timeout: float = 30.0):
+        self.timeout = timeout
+        self._workers = [LinterWorker(command, max_jobs, startup_timeout) for _ in range(size)]
+        self._idle = list(self._workers)
+        self._available = asyncio.Semaphore(size)
+
+    async def run(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Sends one request to an idle worker. Returns the worker's reply, or
+        None if the worker could not be started, crashed or timed out (the
+        worker is killed and will be restarted on its next job).
+        """
+        async with self._available:
+            worker = self._idle.pop()
+            try:
+                return await worker.request(payload, self.timeout)
+            except (asyncio.TimeoutError, RuntimeError, OSError, ValueError) as e:
+                logger.error(f"Linter worker failed ({type(e).__name__}: {e}); it will be restarted.")
+                await worker.stop()
+                return None
+            except asyncio.CancelledError:
+                await worker.stop()
+                raise
+            finally:
+                self._idle.append(worker)
+
+    async def warm_up(self):
+        """Starts every worker ahead of the first request."""
+        await asyncio.gather(*(worker.start() for worker in self._workers if not worker.is_alive))
+
+    async def close(self):
+        for worker in self._workers:
+            await worker.stop()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": len(self._workers),
+            "idle": len(self._idle),
+            "restarts": sum(worker.restarts for worker in self._workers),
+        }
@@ -0,0 +1,159 @@
+# backend/app/services/llm_cache.py
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class LLMResponseCache:
+    """
+    Content-addressed cache for parsed LLM responses.
+
+    Two tiers:
+    1. An in-memory LRU with a per-entry TTL.
+    2. An optional SQLite file that survives restarts. Disk hits are promoted
+       back into memory. From async code (aget/aset) the disk is only
+       touched from one dedicated thread, so a slow commit does not stall
+       the event loop and writes are never interleaved.
+
+    Values are stored as JSON text so that callers always receive a fresh copy
+    they are free to mutate.
+    """
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 86400.0, sqlite_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_executor: Optional[ThreadPoolExecutor] = None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            self._db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+            self._db.commit()
+            self._disk_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-cache-disk")
+
+    @staticmethod
+    def normalize(text: Optional[str]) -> str:
+        """Normalizes line endings and surrounding whitespace so trivially different inputs share a key."""
+        if not text:
+            return ""
+        return "\n".join(line.rstrip() for line in text.strip().splitlines())
+
+    @classmethod
+    def make_key(cls, kind: str, model: str, prompt_version: str, *parts: Optional[str]) -> str:
+        digest = hashlib.sha256()
+        for field in (kind, model, prompt_version, *(cls.normalize(part) for part in parts)):
+            digest.update(field.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Looks the key up in memory, then on disk. Blocks on disk I/O; async code uses aget()."""
+        value = self._get_memory(key)
+        if value is None and self._db is not None:
+            value = self._promote(key, self._read_disk(key))
+        return self._counted(value)
+
+    async def aget(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """As get(), with the disk lookup run in the cache's disk thread instead of on the event loop."""
+        value = self._get_memory(key)
+        if value is None and self._db is not None:
+            row = await asyncio.get_running_loop().run_in_executor(self._disk_executor, self._read_disk, key)
+            value = self._promote(key, row)
+        return self._counted(value)
+
+    def set(self, key: str, value: List[Dict[str, Any]]):
+        """Stores the value in memory and on disk. Blocks on disk I/O; async code uses aset()."""
+        expires_at, serialized = self._set_memory(key, value)
+        if self._db is not None:
+            self._set_disk(key, expires_at, serialized)
+
+    async def aset(self, key: str, value: List[Dict[str, Any]]):
+        """As set(), with the disk write run in the cache's disk thread instead of on the event loop."""
+        expires_at, serialized = self._set_memory(key, value)
+        if self._db is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                self._disk_executor, self._set_disk, key, expires_at, serialized
+            )
+
+    def _counted(self, value: Optional[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def _get_memory(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return json.loads(value)
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, str]]:
+        try:
+            return self._db.execute("SELECT expires_at, value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache disk lookup failed: {e}")
+            return None
+
+    def _promote(self, key: str, row: Optional[Tuple[float, str]]) -> Optional[List[Dict[str, Any]]]:
+        """Copies a live disk entry into memory and returns its value."""
+        if not row or row[0] <= time.time():
+            return None
+        self._remember(key, row[0], row[1])
+        self.disk_hits += 1
+        return json.loads(row[1])
+
+    def _set_memory(self, key: str, value: List[Dict[str, Any]]) -> Tuple[float, str]:
+        expires_at = time.time() + self.ttl_seconds
+        serialized = json.dumps(value)
+        self._remember(key, expires_at, serialized)
+        return expires_at, serialized
+
+    def _set_disk(self, key: str, expires_at: float, serialized: str):
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, expires_at, value) VALUES (?, ?, ?)",
+                (key, expires_at, serialized),
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache disk write failed: {e}")
+
+    def _remember(self, key: str, expires_at: float, serialized: str):
+        self._memory[key] = (expires_at, serialized)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "memory_entries": len(self._memory),
+        }
+
+    def close(self):
+        if self._disk_executor is not None:
+            self._disk_executor.shutdown(wait=True)
+            self._disk_executor = None
+        if self._db is not None:
+            self._db.close()
+            self._db = None
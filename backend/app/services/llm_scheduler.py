@@ -0,0 +1,202 @@
+# backend/app/services/llm_scheduler.py
+import asyncio
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from openai import APIConnectionError, APIStatusError, RateLimitError
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Status codes worth retrying besides 429: request timeout, conflict/lock, and server errors.
+_RETRYABLE_STATUS_CODES = {408, 409}
+
+class TokenBucket:
+    """
+    Refills at `rate_per_second` up to `capacity`. take() always succeeds
+    and may leave the bucket in debt; the returned delay is how long the
+    caller must wait for that debt to be repaid. Callers that take in turn
+    are therefore spaced out in arrival order without any lock.
+    """
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        self._refill(time.monotonic())
+        return self._tokens
+
+    def take(self, amount: float) -> float:
+        """Removes `amount` tokens and returns the seconds until the bucket is out of debt."""
+        self._refill(time.monotonic())
+        self._tokens -= amount
+        return max(0.0, -self._tokens / self.rate_per_second)
+
+    def give(self, amount: float):
+        """Returns tokens, e.g. for a request that was cancelled or used less than it reserved."""
+        self._refill(time.monotonic())
+        self._tokens = min(self.capacity, self._tokens + amount)
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Reads retry-after-ms or Retry-After (seconds or an HTTP date) from an API error response."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (RateLimitError, APIConnectionError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in _RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+class LLMRequestScheduler:
+    """
+    Paces LLM requests under a requests-per-minute and a tokens-per-minute
+    budget, and retries failed ones. Requests over budget wait their turn
+    (in arrival order) instead of being sent and rejected. A 429 pauses
+    every request until its Retry-After has passed, so one rate limit does
+    not turn into a burst of further 429s; other transient errors back off
+    exponentially with full jitter. A budget of 0 is unlimited.
+    """
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_attempts: int = 6,
+        base_delay_seconds: float = 0.5,
+        max_delay_seconds: float = 30.0,
+        burst_seconds: float = 5.0,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.request_bucket = self._bucket(requests_per_minute, burst_seconds)
+        self.token_bucket = self._bucket(tokens_per_minute, burst_seconds)
+        self._paused_until = 0.0
+        self.waiting = 0
+        self.throttled_seconds = 0.0
+        self.rate_limited = 0
+        self.retries = 0
+        self.failures = 0
+
+    @staticmethod
+    def _bucket(per_minute: int, burst_seconds: float) -> Optional[TokenBucket]:
+        if per_minute <= 0:
+            return None
+        rate = per_minute / 60
+        # A small burst allowance keeps throughput smooth; at least one whole unit must fit.
+        return TokenBucket(rate, max(1.0, rate * burst_seconds))
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (0-based) retry attempt."""
+        return random.uniform(0, min(self.max_delay_seconds, self.base_delay_seconds * (2 ** attempt)))
+
+    async def acquire(self, tokens: int):
+        """Waits until one request of `tokens` tokens fits the budgets and no rate-limit pause is in effect."""
+        delay = self.request_bucket.take(1) if self.request_bucket else 0.0
+        if self.token_bucket:
+            delay = max(delay, self.token_bucket.take(tokens))
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            delay = max(delay, self._paused_until - started)
+            while delay > 0:
+                await asyncio.sleep(delay)
+                delay = self._paused_until - time.monotonic()
+        except asyncio.CancelledError:
+            # The reservation was never used; hand it to the requests queued behind.
+            if self.request_bucket:
+                self.request_bucket.give(1)
+            if self.token_bucket:
+                self.token_bucket.give(tokens)
+            raise
+        finally:
+            self.waiting -= 1
+        waited = time.monotonic() - started
+        if waited > 0:
+            self.throttled_seconds += waited
+            metrics.LLM_THROTTLE_WAIT.observe(waited)
+
+    def record_usage(self, reserved_tokens: int, used_tokens: Optional[int]):
+        """Corrects the token budget once the response reports how many tokens the request really used."""
+        if self.token_bucket is None or not isinstance(used_tokens, int):
+            return
+        if used_tokens < reserved_tokens:
+            self.token_bucket.give(reserved_tokens - used_tokens)
+        elif used_tokens > reserved_tokens:
+            self.token_bucket.take(used_tokens - reserved_tokens)
+
+    async def call(self, request: Callable[[], Awaitable[T]], tokens: int, purpose: str = "completion") -> T:
+        """
+        Sends `request` once the budgets allow it, retrying rate limits,
+        connection errors and 5xx responses up to `max_attempts` times in
+        total. Other errors, and the last failure, are raised to the caller.
+        """
+        for attempt in range(self.max_attempts):
+            await self.acquire(tokens)
+            try:
+                return await request()
+            except Exception as e:
+                if not _is_retryable(e) or attempt == self.max_attempts - 1:
+                    self.failures += 1
+                    raise
+                retry_after = _retry_after_seconds(e)
+                if isinstance(e, RateLimitError):
+                    self.rate_limited += 1
+                    metrics.LLM_RATE_LIMITED.inc()
+                    # Pause everyone, not just this request; a little jitter spreads out the resumption.
+                    delay = retry_after if retry_after is not None else self.backoff_delay(attempt)
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay + random.uniform(0, 0.1 * delay + 0.05))
+                else:
+                    delay = retry_after if retry_after is not None else self.backoff_delay(attempt)
+                    await asyncio.sleep(delay)
+                self.retries += 1
+                metrics.LLM_RETRIES.inc()
+                logger.warning(
+                    f"LLM {purpose} request failed on attempt {attempt + 1}/{self.max_attempts} ({e}); retrying in {delay:.2f}s."
+                )
+        raise AssertionError("unreachable")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "waiting": self.waiting,
+            "paused_for_seconds": max(0.0, self._paused_until - time.monotonic()),
+            "throttled_seconds": round(self.throttled_seconds, 3),
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "failures": self.failures,
+            "request_budget": round(self.request_bucket.tokens, 2) if self.request_bucket else None,
+            "token_budget": round(self.token_bucket.tokens, 2) if self.token_bucket else None,
+        }
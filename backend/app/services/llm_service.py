@@ -1,24 +1,307 @@
 # backend/app/services/llm_service.py
+import asyncio
 import logging
-from typing import Optional, List, Dict
+import time
+from typing import Any, Callable, Optional, List, Dict, Tuple
 import json
-from openai import OpenAI, APIConnectionError, RateLimitError, APIStatusError
+import httpx
+from openai import AsyncOpenAI, APIConnectionError, RateLimitError, APIStatusError
+from app.core import metrics
 from app.core.config import settings
+from app.services.llm_cache import LLMResponseCache
+from app.services.llm_scheduler import LLMRequestScheduler
+from app.services.model_cascade import TIER_FAST, TIER_LARGE, ComplexityClassifier, fast_answer_problem
+from app.services.prompt_builder import PromptBuilder
+from app.utils.json_stream import JSONArrayStreamParser
 
 logger = logging.getLogger(__name__)
 
+# Bump these whenever the corresponding prompt template changes so that
+# cached responses produced by the old template are no longer served.
+PREDICTION_PROMPT_VERSION = "1"
+PATCH_PROMPT_VERSION = "1"
+
+async def _close_stream(stream: Any):
+    """Releases the HTTP response behind a completion stream (AsyncStream.close(), or aclose() on a plain async generator)."""
+    close = getattr(stream, "close", None) or getattr(stream, "aclose", None)
+    if close is None:
+        return
+    try:
+        await close()
+    except Exception as e:
+        logger.debug(f"Closing an LLM response stream failed: {e}")
+
 class LLMService:
-    def __init__(self):
+    """
+    Async wrapper around the OpenAI chat completions API.
+    All calls share one pooled keep-alive HTTP client, and the number of
+    in-flight requests is capped by a semaphore so that a burst of analyses
+    cannot open an unbounded number of connections.
+
+    Without a `cache`, a response cache is built from the LLM_CACHE_*
+    settings; `cache_enabled=False` runs without one.
+    """
+    def __init__(
+        self,
+        max_concurrent_requests: Optional[int] = None,
+        request_timeout: Optional[float] = None,
+        cache: Optional[LLMResponseCache] = None,
+        scheduler: Optional[LLMRequestScheduler] = None,
+        cache_enabled: bool = True,
+    ):
         if not settings.OPENAI_API_KEY:
             logger.warning("OPENAI_API_KEY not found in environment or .env file. LLM operations will likely fail.")
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        self.model = "gpt-4o"  # Confirm this model name is correct; consider "gpt-4-turbo" or "gpt-3.5-turbo"
+        self.request_timeout = request_timeout or settings.LLM_REQUEST_TIMEOUT_SECONDS
+        self._http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(self.request_timeout, connect=settings.LLM_CONNECT_TIMEOUT_SECONDS),
+        )
+        # Retries are handled by the scheduler, which can see the quota across all requests.
+        self.client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL, http_client=self._http_client, max_retries=0
+        )
+        self.model = settings.LLM_MODEL
+        self.fast_model = settings.LLM_FAST_MODEL
+        self.complexity_classifier = ComplexityClassifier(
+            max_simple_tokens=settings.LLM_CASCADE_MAX_SIMPLE_TOKENS,
+            max_simple_exception_types=settings.LLM_CASCADE_MAX_SIMPLE_EXCEPTION_TYPES,
+        )
+        self._request_semaphore = asyncio.Semaphore(max_concurrent_requests or settings.LLM_MAX_CONCURRENT_REQUESTS)
+        if cache is None and cache_enabled and settings.LLM_CACHE_ENABLED:
+            cache = LLMResponseCache(
+                max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+                sqlite_path=settings.LLM_CACHE_SQLITE_PATH,
+            )
+        self.cache = cache
+        self.prompt_builder = PromptBuilder(
+            token_budget=settings.LLM_PROMPT_TOKEN_BUDGET,
+            tokenizer_cache_dir=settings.LLM_TOKENIZER_CACHE_DIR,
+        )
+        self.scheduler = scheduler or LLMRequestScheduler(
+            requests_per_minute=int(settings.LLM_REQUESTS_PER_MINUTE * settings.LLM_RATE_LIMIT_HEADROOM),
+            tokens_per_minute=int(settings.LLM_TOKENS_PER_MINUTE * settings.LLM_RATE_LIMIT_HEADROOM),
+            max_attempts=settings.LLM_RETRY_MAX_ATTEMPTS,
+            base_delay_seconds=settings.LLM_RETRY_BASE_DELAY_SECONDS,
+            max_delay_seconds=settings.LLM_RETRY_MAX_DELAY_SECONDS,
+            burst_seconds=settings.LLM_RATE_LIMIT_BURST_SECONDS,
+        )
+
+    async def aclose(self):
+        """Closes the shared HTTP connection pool and the response cache."""
+        await self.client.close()
+        if self.cache:
+            self.cache.close()
+
+    async def _cache_get(self, key: str) -> Optional[List[Dict]]:
+        if not self.cache:
+            return None
+        value = await self.cache.aget(key)
+        (metrics.CACHE_MISSES if value is None else metrics.CACHE_HITS).inc(cache="llm")
+        return value
+
+    async def _cache_set(self, key: str, value: List[Dict]):
+        if self.cache:
+            await self.cache.aset(key, value)
+
+    def _estimate_tokens(self, messages: List[Dict[str, str]]) -> int:
+        """Tokens to reserve against the rate limit: the prompt plus the expected completion."""
+        prompt = "\n".join(message["content"] for message in messages)
+        return self.prompt_builder.count_tokens(prompt) + settings.LLM_EXPECTED_COMPLETION_TOKENS
+
+    async def _create_chat_completion(
+        self, messages: List[Dict[str, str]], purpose: str = "completion", model: Optional[str] = None
+    ):
+        """
+        Sends a chat completion request through the rate-limit scheduler,
+        which queues it until the quota allows and retries it on 429s and
+        transient errors. Each attempt waits for a free slot under the
+        in-flight request cap and is bound by the per-call timeout.
+        """
+        async def send():
+            async with self._request_semaphore:
+                started = time.perf_counter()
+                try:
+                    return await self.client.chat.completions.create(
+                        model=model or self.model,
+                        messages=messages,
+                        response_format={"type": "json_object"},
+                        timeout=self.request_timeout,
+                    )
+                finally:
+                    metrics.LLM_REQUEST_DURATION.observe(time.perf_counter() - started, purpose=purpose)
+
+        tokens = self._estimate_tokens(messages)
+        chat_completion = await self.scheduler.call(send, tokens, purpose)
+        usage = getattr(chat_completion, "usage", None)
+        self.scheduler.record_usage(tokens, getattr(usage, "total_tokens", None))
+        return chat_completion
+
+    async def _stream_json_array(
+        self, messages: List[Dict[str, str]], purpose: str, on_item: Callable[[Any], None], model: Optional[str] = None
+    ) -> Tuple[Optional[Any], List[Any]]:
+        """
+        Streams a chat completion and calls `on_item` with every element of
+        the first JSON array in the response as soon as that element is
+        complete. Returns the fully decoded response (None if the stream or
+        the final decoding failed) and the elements already passed to `on_item`.
+        A stream that fails before producing any element is retried by the
+        scheduler; one that breaks later is not, since its elements are out.
+        """
+        chunks: List[str] = []
+        items: List[Any] = []
+        interrupted = False
+
+        async def send():
+            nonlocal interrupted
+            parser = JSONArrayStreamParser()
+            chunks.clear()
+            async with self._request_semaphore:
+                started = time.perf_counter()
+                stream = None
+                try:
+                    stream = await self.client.chat.completions.create(
+                        model=model or self.model,
+                        messages=messages,
+                        response_format={"type": "json_object"},
+                        timeout=self.request_timeout,
+                        stream=True,
+                    )
+                    async for chunk in stream:
+                        if not chunk.choices or not chunk.choices[0].delta.content:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        chunks.append(delta)
+                        for item in parser.feed(delta):
+                            items.append(item)
+                            on_item(item)
+                except Exception as e:
+                    # Includes transport errors raised mid-stream and failures in on_item.
+                    if not items:
+                        raise
+                    logger.warning(f"OpenAI stream for {purpose} broke after {len(items)} items: {e}")
+                    interrupted = True
+                finally:
+                    if stream is not None:
+                        await _close_stream(stream)
+                    metrics.LLM_REQUEST_DURATION.observe(time.perf_counter() - started, purpose=purpose)
+
+        try:
+            await self.scheduler.call(send, self._estimate_tokens(messages), purpose)
+        except (APIConnectionError, RateLimitError, APIStatusError) as e:
+            logger.warning(f"OpenAI API error while streaming {purpose}: {e}")
+            return None, items
+        except Exception as e:
+            logger.error(f"An unexpected error occurred while streaming {purpose}: {e}")
+            return None, items
+        if interrupted:
+            return None, items
+        response_content = "".join(chunks)
+        try:
+            return json.loads(response_content), items
+        except json.JSONDecodeError as e:
+            metrics.LLM_JSON_DECODE_FAILURES.inc()
+            logger.error(f"Failed to decode JSON from streamed LLM response: {e}\nRaw response: {response_content}")
+            return None, items
+
+    async def _request_json(self, messages: List[Dict[str, str]], purpose: str, model: Optional[str] = None) -> Optional[Any]:
+        """
+        Sends a chat completion (queued and retried by the scheduler) and
+        returns the decoded JSON response, or None if the call or the
+        decoding failed.
+        """
+        response_content = None
+        try:
+            chat_completion = await self._create_chat_completion(messages, purpose, model)
+            response_content = chat_completion.choices[0].message.content
+            return json.loads(response_content)
+        except (APIConnectionError, RateLimitError, APIStatusError) as e:
+            logger.error(f"OpenAI API call for {purpose} failed after retries: {e}")
+            return None
+        except json.JSONDecodeError as e:
+            metrics.LLM_JSON_DECODE_FAILURES.inc()
+            logger.error(f"Failed to decode JSON from LLM response: {e}\nRaw response: {response_content}")
+            return None
+        except Exception as e:
+            logger.error(f"An unexpected error occurred during {purpose}: {e}")
+            return None
+
+    @staticmethod
+    def _extract_list(parsed_json: Any, key: str) -> Optional[List[Dict]]:
+        """Accepts either a bare JSON array or an object wrapping it under `key`; anything else is None."""
+        if isinstance(parsed_json, dict):
+            parsed_json = parsed_json.get(key)
+        return parsed_json if isinstance(parsed_json, list) else None
+
+    async def predict_bug_from_logs(
+        self, logs: str, code_snippet: Optional[str] = None, on_bug: Optional[Callable[[Dict], None]] = None
+    ) -> List[Dict]:
+        """
+        Returns the bugs the LLM finds in the logs and code. When `on_bug` is
+        given (and LLM_STREAMING_ENABLED), the completion is streamed and
+        `on_bug` is called with each bug as soon as the model has finished
+        writing it; the complete list is still returned at the end.
 
-    async def predict_bug_from_logs(self, logs: str, code_snippet: Optional[str] = None) -> List[Dict]:
+        With LLM_CASCADE_ENABLED, simple inputs are first answered by the fast
+        model, and only escalated to the large one when that answer is not
+        usable. Each bug records the tier that produced it in "model_tier".
+        """
         if not logs:
             logger.error("Empty logs provided to predict_bug_from_logs; skipping API call.")
             return []
 
+        cache_key = self._prediction_cache_key(logs, code_snippet)
+        cached = await self._cache_get(cache_key)
+        if cached is not None:
+            logger.info("Serving bug prediction from cache.")
+            return cached
+        return await self._predict_bugs_uncached(logs, code_snippet, cache_key, on_bug)
+
+    def _prediction_cache_key(self, logs: str, code_snippet: Optional[str]) -> str:
+        models = f"{self.fast_model}>{self.model}" if settings.LLM_CASCADE_ENABLED else self.model
+        return LLMResponseCache.make_key("predict", models, PREDICTION_PROMPT_VERSION, logs, code_snippet)
+
+    @staticmethod
+    def _tag_tier(bugs: List[Any], tier: str) -> List[Any]:
+        for bug in bugs:
+            if isinstance(bug, dict):
+                bug["model_tier"] = tier
+        return bugs
+
+    async def _predict_bugs_uncached(
+        self,
+        logs: str,
+        code_snippet: Optional[str],
+        cache_key: str,
+        on_bug: Optional[Callable[[Dict], None]] = None,
+        try_fast_model: bool = True,
+    ) -> List[Dict]:
+        logs, code_snippet = await asyncio.to_thread(self.prompt_builder.fit_logs_and_code, logs, code_snippet)
+        messages = self._prediction_messages(logs, code_snippet)
+
+        if settings.LLM_CASCADE_ENABLED and try_fast_model:
+            reason = self.complexity_classifier.classify(logs, code_snippet, self.prompt_builder.count_tokens)
+            if reason is None:
+                # The fast answer is not streamed: its bugs are only published once it is known to be good enough.
+                parsed_json = await self._request_json(messages, "bug prediction", self.fast_model)
+                bugs = self._extract_list(parsed_json, "bugs") if parsed_json is not None else None
+                reason = fast_answer_problem(bugs, settings.LLM_CASCADE_CONFIDENCE_THRESHOLD)
+                if reason is None:
+                    self._tag_tier(bugs, TIER_FAST)
+                    if on_bug is not None:
+                        for bug in bugs:
+                            on_bug(bug)
+                    await self._cache_set(cache_key, bugs)
+                    return bugs
+            metrics.LLM_ESCALATIONS.inc(reason=reason)
+            logger.info(f"Escalating bug prediction to {self.model}: {reason}")
+        return await self._predict_bugs_large(messages, cache_key, on_bug)
+
+    def _prediction_messages(self, logs: str, code_snippet: Optional[str]) -> List[Dict[str, str]]:
         user_content = f"Analyze the following logs and code for potential software bugs.\n\nLogs:\n```\n{logs}\n```\n"
         if code_snippet:
             user_content += f"\nCode Snippet:\n```\n{code_snippet}\n```\n"
@@ -46,43 +329,163 @@ class LLMService:
             "]\n\n" + user_content
         )
 
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                chat_completion = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": "You are a software bug analysis AI. Respond only in JSON format."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    response_format={"type": "json_object"}
-                )
-                response_content = chat_completion.choices[0].message.content
-                parsed_json = json.loads(response_content)
-                if isinstance(parsed_json, dict) and 'bugs' in parsed_json:
-                    return parsed_json['bugs']
-                elif isinstance(parsed_json, list):
-                    return parsed_json
+        return [
+            {"role": "system", "content": "You are a software bug analysis AI. Respond only in JSON format."},
+            {"role": "user", "content": prompt}
+        ]
+
+    async def _predict_bugs_large(
+        self, messages: List[Dict[str, str]], cache_key: str, on_bug: Optional[Callable[[Dict], None]] = None
+    ) -> List[Dict]:
+        if on_bug is not None and settings.LLM_STREAMING_ENABLED:
+            parsed_json, streamed_bugs = await self._stream_json_array(
+                messages, "bug prediction", lambda bug: on_bug(self._tag_tier([bug], TIER_LARGE)[0])
+            )
+            if parsed_json is None and streamed_bugs:
+                # The stream broke after some bugs were already published: keep them, but do not cache a partial answer.
+                return streamed_bugs
+            if parsed_json is None:
+                parsed_json = await self._request_json(messages, "bug prediction")
+        else:
+            parsed_json = await self._request_json(messages, "bug prediction")
+        if parsed_json is None:
+            return []
+        bugs = self._extract_list(parsed_json, "bugs")
+        if bugs is None:
+            logger.error(f"LLM returned unexpected JSON structure: {parsed_json}")
+            return []
+        self._tag_tier(bugs, TIER_LARGE)
+        await self._cache_set(cache_key, bugs)
+        return bugs
+
+    def plan_batches(self, items: List[Tuple[Optional[str], Optional[str]]]) -> List[List[int]]:
+        """
+        Groups (logs, code_snippet) items into combined prediction requests.
+        Items are packed in order until the next one would exceed
+        LLM_BATCH_TOKEN_BUDGET or LLM_BATCH_MAX_ITEMS; items larger than
+        LLM_BATCH_ITEM_MAX_TOKENS (or without logs) get a group of their own.
+        Returns lists of item indexes.
+        """
+        groups: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for index, (logs, code_snippet) in enumerate(items):
+            tokens = self.prompt_builder.count_tokens(logs or "") + self.prompt_builder.count_tokens(code_snippet or "")
+            if not logs or tokens > settings.LLM_BATCH_ITEM_MAX_TOKENS:
+                groups.append([index])
+                continue
+            if current and (
+                current_tokens + tokens > settings.LLM_BATCH_TOKEN_BUDGET or len(current) >= settings.LLM_BATCH_MAX_ITEMS
+            ):
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+
+    async def predict_bugs_batch(self, items: List[Tuple[Optional[str], Optional[str]]]) -> List[List[Dict]]:
+        """
+        Predicts bugs for several independent (logs, code_snippet) items with a
+        single completion. Cached items are answered from the cache; items the
+        model leaves out of its answer fall back to individual requests.
+        With the model cascade, the shared completion uses the fast model;
+        complex items and items whose fast answer is not usable get their
+        own large-model request. Results are returned in item order.
+        """
+        results: List[Optional[List[Dict]]] = [None] * len(items)
+        cache_keys: List[Optional[str]] = [None] * len(items)
+        pending: List[int] = []
+        for index, (logs, code_snippet) in enumerate(items):
+            if not logs:
+                results[index] = []
+                continue
+            cache_keys[index] = self._prediction_cache_key(logs, code_snippet)
+            cached = await self._cache_get(cache_keys[index])
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.append(index)
+
+        escalated: List[int] = []
+        if settings.LLM_CASCADE_ENABLED:
+            simple = []
+            for index in pending:
+                reason = self.complexity_classifier.classify(items[index][0], items[index][1], self.prompt_builder.count_tokens)
+                if reason is None:
+                    simple.append(index)
                 else:
-                    logger.error(f"LLM returned unexpected JSON structure: {response_content}")
-                    return []
-            except (APIConnectionError, RateLimitError, APIStatusError) as e:
-                logger.warning(f"OpenAI API error on attempt {attempt + 1}/{max_retries}: {e}")
-                if attempt == max_retries - 1:
-                    logger.error("Max retries reached for OpenAI API call.")
-                    return []
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to decode JSON from LLM response: {e}\nRaw response: {response_content}")
-                return []
-            except Exception as e:
-                logger.error(f"An unexpected error occurred during bug prediction: {e}")
-                return []
+                    metrics.LLM_ESCALATIONS.inc(reason=reason)
+                    escalated.append(index)
+            pending = simple
+
+        if len(pending) > 1:
+            submissions = []
+            for position, index in enumerate(pending):
+                logs, code_snippet = items[index]
+                submission = f"### Submission {position}\nLogs:\n```\n{logs}\n```\n"
+                if code_snippet:
+                    submission += f"Code Snippet:\n```\n{code_snippet}\n```\n"
+                submissions.append(submission)
+            prompt = (
+                "You are an AI assistant specialized in identifying software bugs from logs and code. "
+                f"Below are {len(pending)} independent submissions. Analyze each one separately for potential bugs. "
+                "For each bug, provide its type (e.g., 'LogicError', 'Performance', 'Security', 'Crash', 'MemoryLeak', 'Concurrency'), "
+                "a concise description, its severity ('Low', 'Medium', 'High', 'Critical'), and a confidence score (0.0 to 1.0). "
+                "Respond ONLY with a JSON object of the form "
+                "{\"results\": [{\"item\": <submission number>, \"bugs\": [<bug objects>]}, ...]} "
+                "containing one entry for every submission, using an empty bug list when none are found. "
+                "Bug objects have the keys \"type\", \"description\", \"severity\" and \"confidence\".\n\n"
+                + "\n".join(submissions)
+            )
+            tier = TIER_FAST if settings.LLM_CASCADE_ENABLED else TIER_LARGE
+            parsed_json = await self._request_json([
+                {"role": "system", "content": "You are a software bug analysis AI. Respond only in JSON format."},
+                {"role": "user", "content": prompt}
+            ], "batch bug prediction", self.fast_model if tier == TIER_FAST else self.model)
+            entries = parsed_json.get("results") if isinstance(parsed_json, dict) else None
+            for entry in entries if isinstance(entries, list) else []:
+                position = entry.get("item") if isinstance(entry, dict) else None
+                bugs = self._extract_list(entry, "bugs") if isinstance(entry, dict) else None
+                if isinstance(position, int) and 0 <= position < len(pending) and bugs is not None:
+                    index = pending[position]
+                    if tier == TIER_FAST:
+                        reason = fast_answer_problem(bugs, settings.LLM_CASCADE_CONFIDENCE_THRESHOLD)
+                        if reason is not None:
+                            metrics.LLM_ESCALATIONS.inc(reason=reason)
+                            escalated.append(index)
+                            continue
+                    results[index] = self._tag_tier(bugs, tier)
+                    await self._cache_set(cache_keys[index], bugs)
+
+        missing = [index for index in pending if results[index] is None and index not in escalated]
+        if missing and len(pending) > 1:
+            logger.warning(f"Batch prediction missed {len(missing)} of {len(pending)} items; retrying them individually.")
+        fallbacks = await asyncio.gather(
+            *(self._predict_bugs_uncached(items[index][0], items[index][1], cache_keys[index]) for index in missing),
+            *(
+                self._predict_bugs_uncached(items[index][0], items[index][1], cache_keys[index], try_fast_model=False)
+                for index in escalated
+            ),
+        )
+        for index, bugs in zip(missing + escalated, fallbacks):
+            results[index] = bugs
+        return results
 
     async def suggest_patch_for_bug(self, bug_description: str, code_snippet: str, language: str) -> List[Dict]:
         if not bug_description or not code_snippet or not language:
             logger.error("Invalid inputs provided to suggest_patch_for_bug; skipping API call.")
             return []
 
+        cache_key = LLMResponseCache.make_key("patch", self.model, PATCH_PROMPT_VERSION, bug_description, code_snippet, language)
+        cached = await self._cache_get(cache_key)
+        if cached is not None:
+            logger.info("Serving patch suggestion from cache.")
+            return cached
+
+        code_snippet = await asyncio.to_thread(self.prompt_builder.fit_code, code_snippet, bug_description)
+
         prompt = (
             f"You are an AI assistant specialized in fixing software bugs. "
             f"Given the following bug description and a relevant code snippet in {language}, "
@@ -101,34 +504,15 @@ class LLMService:
             "]"
         )
 
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                chat_completion = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": f"You are a code patching AI for {language}. Respond only in JSON format."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    response_format={"type": "json_object"}
-                )
-                response_content = chat_completion.choices[0].message.content
-                parsed_json = json.loads(response_content)
-                if isinstance(parsed_json, dict) and 'patches' in parsed_json:
-                    return parsed_json['patches']
-                elif isinstance(parsed_json, list):
-                    return parsed_json
-                else:
-                    logger.error(f"LLM returned unexpected JSON structure for patches: {response_content}")
-                    return []
-            except (APIConnectionError, RateLimitError, APIStatusError) as e:
-                logger.warning(f"OpenAI API error on attempt {attempt + 1}/{max_retries}: {e}")
-                if attempt == max_retries - 1:
-                    logger.error("Max retries reached for OpenAI API call.")
-                    return []
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to decode JSON from LLM response: {e}\nRaw response: {response_content}")
-                return []
-            except Exception as e:
-                logger.error(f"An unexpected error occurred during patch suggestion: {e}")
-                return []
+        parsed_json = await self._request_json([
+            {"role": "system", "content": f"You are a code patching AI for {language}. Respond only in JSON format."},
+            {"role": "user", "content": prompt}
+        ], "patch suggestion")
+        if parsed_json is None:
+            return []
+        patches = self._extract_list(parsed_json, "patches")
+        if patches is None:
+            logger.error(f"LLM returned unexpected JSON structure for patches: {parsed_json}")
+            return []
+        await self._cache_set(cache_key, patches)
+        return patches
@@ -0,0 +1,53 @@
+# backend/app/services/model_cascade.py
+import re
+from typing import Any, Callable, List, Optional
+
+# Recorded on each LLM bug prediction as BugPrediction.model_tier.
+TIER_FAST = "fast"
+TIER_LARGE = "large"
+
+_EXCEPTION_TYPE = re.compile(r"\b([A-Z]\w*(?:Exception|Error))\b")
+# Crashes the fast model tends to misdiagnose: memory corruption, native signals and concurrency failures.
+_HARD_CRASH = re.compile(
+    r"deadlock|race condition|data race|ConcurrentModificationException|EXC_BAD_ACCESS|SIGSEGV|SIGBUS"
+    r"|heap corruption|use-after-free|double free|Application Not Responding|\bANR in\b",
+    re.IGNORECASE,
+)
+
+class ComplexityClassifier:
+    """
+    Decides, before any model is called, whether an input should skip the
+    fast model: large inputs, logs with several distinct exception types
+    (chained or concurrent failures), and native or concurrency crashes.
+    """
+    def __init__(self, max_simple_tokens: int, max_simple_exception_types: int):
+        self.max_simple_tokens = max_simple_tokens
+        self.max_simple_exception_types = max_simple_exception_types
+
+    def classify(self, logs: Optional[str], code_snippet: Optional[str], count_tokens: Callable[[str], int]) -> Optional[str]:
+        """Returns why the input is complex, or None if the fast model may try it first."""
+        logs = logs or ""
+        if count_tokens(logs) + count_tokens(code_snippet or "") > self.max_simple_tokens:
+            return "large_input"
+        if len(set(_EXCEPTION_TYPE.findall(logs))) >= self.max_simple_exception_types:
+            return "multiple_exceptions"
+        if _HARD_CRASH.search(logs):
+            return "hard_crash"
+        return None
+
+def fast_answer_problem(bugs: Optional[List[Any]], confidence_threshold: float) -> Optional[str]:
+    """
+    Returns why a fast-model prediction must be escalated to the large
+    model (unusable JSON, no findings, or no finding as confident as
+    `confidence_threshold`), or None if it can be used as is.
+    """
+    if bugs is None:
+        return "invalid_json"
+    if not bugs:
+        return "no_findings"
+    confidences = [bug.get("confidence") if isinstance(bug, dict) else None for bug in bugs]
+    if not all(isinstance(confidence, (int, float)) and not isinstance(confidence, bool) for confidence in confidences):
+        return "invalid_json"
+    if max(confidences) < confidence_threshold:
+        return "low_confidence"
+    return None
@@ -0,0 +1,62 @@
+# backend/app/services/pipeline.py
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+StageFunction = Callable[["StagePipeline"], Awaitable[Any]]
+StageCallback = Callable[[str, Any], None]
+
+class StagePipeline:
+    """
+    Runs named async stages as a small dependency graph.
+
+    Each stage starts as soon as the stages it depends on have finished, so
+    independent stages overlap and the total latency is the longest path
+    rather than the sum. A stage can read finished dependencies through
+    `results`, and can also `await pipeline.result(name)` on a stage it did
+    not declare, which lets it decide at runtime whether it needs to wait.
+    The wall-clock duration of every stage body (excluding the wait for
+    declared dependencies) is recorded in `timings`, in milliseconds.
+    `on_stage_complete`, if given, is called with each stage's name and
+    result as soon as that stage finishes.
+    """
+    def __init__(self, on_stage_complete: Optional[StageCallback] = None):
+        self.on_stage_complete = on_stage_complete
+        self._stages: Dict[str, Tuple[StageFunction, Tuple[str, ...]]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, float] = {}
+
+    def add(self, name: str, fn: StageFunction, depends_on: Iterable[str] = ()):
+        depends_on = tuple(depends_on)
+        for dependency in depends_on:
+            if dependency not in self._stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dependency}'")
+        self._stages[name] = (fn, depends_on)
+
+    async def result(self, name: str) -> Any:
+        return await asyncio.shield(self._tasks[name])
+
+    async def run(self) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        self._tasks = {name: loop.create_task(self._run_stage(name)) for name in self._stages}
+        try:
+            await asyncio.gather(*self._tasks.values())
+        except BaseException:
+            for task in self._tasks.values():
+                task.cancel()
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+            raise
+        return self.results
+
+    async def _run_stage(self, name: str) -> Any:
+        fn, depends_on = self._stages[name]
+        for dependency in depends_on:
+            await self.result(dependency)
+        started = time.perf_counter()
+        value = await fn(self)
+        self.timings[name] = round((time.perf_counter() - started) * 1000, 3)
+        self.results[name] = value
+        if self.on_stage_complete is not None:
+            self.on_stage_complete(name, value)
+        return value
@@ -0,0 +1,158 @@
+# backend/app/services/prompt_builder.py
+import logging
+import math
+import os
+import re
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.utils.log_parser import LogParser
+
+logger = logging.getLogger(__name__)
+
+# Matches code locations in stack traces and error messages:
+#   Login.java:45   File "app.py", line 12   ViewController.swift:88:13   at line 7
+_CODE_LINE_REFERENCE = re.compile(r"(?:\.\w+:|line\s+)(\d+)", re.IGNORECASE)
+_APPROX_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+@contextmanager
+def _tiktoken_cache_dir(cache_dir: Optional[str]) -> Iterator[Optional[str]]:
+    """
+    tiktoken only reads its cache location from the TIKTOKEN_CACHE_DIR
+    environment variable. It is set just while the encoding loads (tiktoken
+    keeps loaded encodings) and restored afterwards, so neither the process
+    nor its subprocesses keep it; a value the operator set takes precedence.
+    """
+    configured = os.environ.get("TIKTOKEN_CACHE_DIR")
+    if configured or not cache_dir:
+        yield configured
+        return
+    os.environ["TIKTOKEN_CACHE_DIR"] = cache_dir
+    try:
+        yield cache_dir
+    finally:
+        os.environ.pop("TIKTOKEN_CACHE_DIR", None)
+
+def _load_token_counter(cache_dir: Optional[str] = None) -> Tuple[Callable[[str], int], str]:
+    """
+    Prefers tiktoken's o200k_base encoding (used by gpt-4o). tiktoken is an
+    optional dependency and downloads its vocabulary from the network on first
+    use; `cache_dir` points it at a directory holding a copy of that vocabulary
+    instead (see LLM_TOKENIZER_CACHE_DIR), so hosts without network access
+    still get exact counts. When tiktoken is missing or cannot load the
+    encoding we fall back to a local approximation: one token per punctuation
+    mark and roughly one per four characters of each word.
+    """
+    try:
+        import tiktoken
+        with _tiktoken_cache_dir(cache_dir) as active_cache_dir:
+            encoding = tiktoken.get_encoding("o200k_base")
+        cache_note = f" (vocabulary cache: {active_cache_dir})" if active_cache_dir else ""
+        logger.info(f"Counting prompt tokens with tiktoken:o200k_base{cache_note}.")
+        return (lambda text: len(encoding.encode(text, disallowed_special=()))), "tiktoken:o200k_base"
+    except Exception as e:
+        logger.info(f"tiktoken unavailable ({e}); counting prompt tokens approximately.")
+
+    def approximate(text: str) -> int:
+        return sum(math.ceil(len(token) / 4) for token in _APPROX_TOKEN.findall(text))
+    return approximate, "approximate"
+
+class PromptBuilder:
+    """
+    Fits logs and code into a per-request token budget before they are pasted
+    into an LLM prompt. Inputs that already fit are returned unchanged. Larger
+    inputs keep windows of context around the error lines found by LogParser
+    and around the code lines those errors reference; everything else is
+    replaced by an omission marker.
+    """
+    def __init__(self, token_budget: int, log_context_lines: int = 5, code_context_lines: int = 10, code_share: float = 0.4, tokenizer_cache_dir: Optional[str] = None):
+        self.token_budget = token_budget
+        self.log_context_lines = log_context_lines
+        self.code_context_lines = code_context_lines
+        self.code_share = code_share
+        self.log_parser = LogParser()
+        self.count_tokens, self.tokenizer_name = _load_token_counter(tokenizer_cache_dir)
+
+    def fit_logs_and_code(self, logs: str, code_snippet: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        log_tokens = self.count_tokens(logs)
+        code_tokens = self.count_tokens(code_snippet) if code_snippet else 0
+        if log_tokens + code_tokens <= self.token_budget:
+            return logs, code_snippet
+
+        parsed = self.log_parser.parse_stream(logs)
+        error_line_nums = [error["line_num"] for error in parsed["error_lines"]]
+
+        if code_snippet:
+            code_budget = max(self.token_budget - log_tokens, int(self.token_budget * self.code_share))
+            if code_tokens > code_budget:
+                referenced = _referenced_code_lines(error["content"] for error in parsed["error_lines"])
+                code_snippet = self._fit_lines(code_snippet.splitlines(), referenced, self.code_context_lines, code_budget)
+            code_tokens = self.count_tokens(code_snippet)
+
+        log_budget = self.token_budget - code_tokens
+        if log_tokens > log_budget:
+            log_lines = logs.splitlines()
+            # Without any error lines, the most recent lines are the most relevant.
+            centers = error_line_nums or [len(log_lines)]
+            logs = self._fit_lines(log_lines, centers, self.log_context_lines, log_budget)
+        logger.info(f"Prompt input trimmed to fit a {self.token_budget}-token budget ({self.tokenizer_name}).")
+        return logs, code_snippet
+
+    def fit_code(self, code_snippet: str, context: str) -> str:
+        """Fits a code snippet alone, keeping the lines referenced in `context` (e.g. a bug description)."""
+        if self.count_tokens(code_snippet) <= self.token_budget:
+            return code_snippet
+        referenced = _referenced_code_lines([context])
+        return self._fit_lines(code_snippet.splitlines(), referenced, self.code_context_lines, self.token_budget)
+
+    def _fit_lines(self, lines: List[str], centers: Iterable[int], context: int, budget: int) -> str:
+        """
+        Keeps windows of `context` lines around each 1-based line number in
+        `centers`, halving the window until the excerpt fits `budget`. If even
+        the bare center lines do not fit, lines are kept in priority order
+        (first center first) until the budget runs out.
+        """
+        centers = [center for center in centers if 1 <= center <= len(lines)] or [1]
+        while True:
+            keep = _window_line_numbers(centers, context, len(lines))
+            excerpt = _render_excerpt(lines, keep)
+            if self.count_tokens(excerpt) <= budget:
+                return excerpt
+            if context == 0:
+                break
+            context //= 2
+
+        keep, used = set(), 0
+        for center in centers:
+            cost = self.count_tokens(lines[center - 1]) + 1
+            if used + cost > budget:
+                break
+            keep.add(center)
+            used += cost
+        return _render_excerpt(lines, keep)
+
+def _referenced_code_lines(texts: Iterable[str]) -> List[int]:
+    referenced = []
+    for text in texts:
+        referenced.extend(int(match) for match in _CODE_LINE_REFERENCE.findall(text))
+    return referenced
+
+def _window_line_numbers(centers: List[int], context: int, total: int) -> Set[int]:
+    keep = set()
+    for center in centers:
+        keep.update(range(max(1, center - context), min(total, center + context) + 1))
+    return keep
+
+def _render_excerpt(lines: List[str], keep: Set[int]) -> str:
+    rendered, omitted = [], 0
+    for line_num, line in enumerate(lines, start=1):
+        if line_num in keep:
+            if omitted:
+                rendered.append(f"... [{omitted} lines omitted] ...")
+                omitted = 0
+            rendered.append(line)
+        else:
+            omitted += 1
+    if omitted:
+        rendered.append(f"... [{omitted} lines omitted] ...")
+    return "\n".join(rendered)
@@ -0,0 +1,71 @@
+# backend/app/services/pylint_worker.py
+"""
+Long-lived pylint worker process used by LinterWorkerPool.
+
+The worker imports pylint once and then lints snippets sent to it over
+stdin, one JSON request per line:
+
+    {"code": "<python source>"}
+
+and answers each with one JSON line on stdout:
+
+    {"messages": [<pylint JSON messages>]}   or   {"error": "<reason>"}
+
+A {"ready": true} line is written once pylint has been imported. This script
+only depends on pylint and the standard library so it can be started
+directly with the interpreter, without the backend package on sys.path.
+"""
+import io
+import json
+import os
+import sys
+import tempfile
+
+
+def _lint(code: str, args: list) -> list:
+    from astroid import MANAGER
+    from pylint.lint import Run
+    from pylint.reporters import JSONReporter
+
+    with tempfile.NamedTemporaryFile(suffix=".py", mode="w", delete=False) as temp_file:
+        temp_file.write(code)
+        temp_path = temp_file.name
+    try:
+        output = io.StringIO()
+        Run([temp_path, *args], reporter=JSONReporter(output), exit=False)
+        return json.loads(output.getvalue() or "[]")
+    finally:
+        os.remove(temp_path)
+        # Drop the snippet's module from astroid's cache so it does not grow with every job.
+        for name, module in list(MANAGER.astroid_cache.items()):
+            if getattr(module, "file", None) == temp_path:
+                del MANAGER.astroid_cache[name]
+
+
+def main():
+    # Keep the protocol stream private: anything pylint prints goes to stderr.
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    sys.stdout = sys.stderr
+    args = sys.argv[1:]
+
+    def reply(payload: dict):
+        protocol_out.write(json.dumps(payload) + "\n")
+        protocol_out.flush()
+
+    try:
+        import pylint.lint  # noqa: F401  (warm the import)
+    except ImportError as e:
+        reply({"error": f"pylint unavailable: {e}"})
+        return
+    reply({"ready": True})
+
+    for line in sys.stdin:
+        try:
+            request = json.loads(line)
+            reply({"messages": _lint(request.get("code", ""), args)})
+        except Exception as e:  # keep serving; a crash would cost a cold restart
+            reply({"error": str(e)})
+
+
+if __name__ == "__main__":
+    main()
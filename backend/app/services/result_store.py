@@ -0,0 +1,644 @@
+# backend/app/services/result_store.py
+import asyncio
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.models.schemas import AnalysisResult, BugPrediction, SuggestedPatch
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("COMPLETED", "FAILED")
+
+# Attempts to store a result in SQLiteResultStore before it is only kept in memory.
+_MAX_WRITE_ATTEMPTS = 3
+
+class AnalysisRecord:
+    """
+    Mutable, compact form of an AnalysisResult, updated in place as the
+    analysis progresses. Every update bumps `version`; the JSON encoding
+    is produced at most once per version and then reused, so serving a
+    status poll does not touch pydantic at all.
+    """
+    __slots__ = (
+        "analysis_id", "status", "predicted_bugs", "suggested_patches", "error_message",
+        "stage_timings", "similarity_score", "reused_from", "version", "_json", "_json_version",
+    )
+
+    def __init__(self, result: AnalysisResult):
+        self.analysis_id = result.analysis_id
+        self.status = result.status
+        self.predicted_bugs: List[BugPrediction] = result.predicted_bugs
+        self.suggested_patches: List[SuggestedPatch] = result.suggested_patches
+        self.error_message = result.error_message
+        self.stage_timings: Dict[str, float] = result.stage_timings
+        self.similarity_score = result.similarity_score
+        self.reused_from = result.reused_from
+        self.version = 0
+        self._json: Optional[bytes] = None
+        self._json_version = -1
+
+    def update(self, **fields: Any):
+        """Sets the given AnalysisResult fields. Values are trusted to have the schema's types, as built by the orchestrator."""
+        for name, value in fields.items():
+            if name in ("analysis_id", "version") or name.startswith("_"):
+                raise AttributeError(f"{name} cannot be updated")
+            setattr(self, name, value)
+        self.version += 1
+
+    def to_result(self, analysis_id: Optional[str] = None) -> AnalysisResult:
+        return AnalysisResult.model_construct(
+            analysis_id=analysis_id or self.analysis_id,
+            status=self.status,
+            predicted_bugs=list(self.predicted_bugs),
+            suggested_patches=list(self.suggested_patches),
+            error_message=self.error_message,
+            stage_timings=dict(self.stage_timings),
+            similarity_score=self.similarity_score,
+            reused_from=self.reused_from,
+        )
+
+    def to_json(self) -> bytes:
+        """The AnalysisResult JSON for the current version, encoded on first use."""
+        if self._json_version != self.version:
+            self._json = self.to_result().model_dump_json().encode("utf-8")
+            self._json_version = self.version
+        return self._json
+
+class _Entry:
+    __slots__ = ("record", "expires_at", "size")
+
+    def __init__(self, record: AnalysisRecord, expires_at: Optional[float], size: int):
+        self.record = record
+        self.expires_at = expires_at
+        self.size = size
+
+class InMemoryResultStore:
+    """
+    Bounded store for analysis results.
+
+    - Completed and failed results expire `ttl_seconds` after they finish.
+      Queued and in-progress results never expire.
+    - The store holds at most `max_entries` results and, optionally, about
+      `max_bytes` of serialized results. Over either limit, the least recently
+      used finished result is evicted first. An active one is evicted only
+      when nothing else is left.
+    - Expired entries are dropped lazily on lookup and by a background sweeper.
+    - An alias is a second ID for an existing result. Looking it up returns
+      the target's result under the alias ID. Aliases are dropped together
+      with their target and do not count towards the limits.
+    - Results are held as AnalysisRecords: update() changes one in place and
+      get_json() returns its cached JSON encoding.
+    """
+    # Results are visible to this process only.
+    shared = False
+
+    def __init__(self, ttl_seconds: float, max_entries: int, max_bytes: Optional[int] = None, sweep_interval_seconds: float = 60.0):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval_seconds = sweep_interval_seconds
+        # Finished and active results are kept apart, each in least recently
+        # used order, so that eviction takes the head of one of them.
+        self._finished: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._active: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._total_bytes = 0
+        self._aliases: Dict[str, str] = {}
+        self._aliases_by_target: Dict[str, List[str]] = {}
+        self._sweeper_task: Optional[asyncio.Task] = None
+        self.expired_evictions = 0
+        self.capacity_evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._finished) + len(self._active)
+
+    def __contains__(self, analysis_id: str) -> bool:
+        return self.get(analysis_id) is not None
+
+    def get(self, analysis_id: str) -> Optional[AnalysisResult]:
+        record = self._get(self.resolve(analysis_id))
+        return record.to_result(analysis_id) if record is not None else None
+
+    def get_record(self, analysis_id: str) -> Optional[AnalysisRecord]:
+        """The record `analysis_id` refers to; for an alias, that of its target."""
+        return self._get(self.resolve(analysis_id))
+
+    def get_json(self, analysis_id: str) -> Optional[bytes]:
+        """The result as JSON bytes, under `analysis_id` even when it is an alias."""
+        target_id = self.resolve(analysis_id)
+        record = self._get(target_id)
+        if record is None:
+            return None
+        if target_id == analysis_id:
+            return record.to_json()
+        # analysis_id is the first field of the encoding.
+        return record.to_json().replace(target_id.encode("utf-8"), analysis_id.encode("utf-8"), 1)
+
+    def resolve(self, analysis_id: str) -> str:
+        """Returns the ID whose result `analysis_id` refers to (itself unless it is an alias)."""
+        return self._aliases.get(analysis_id, analysis_id)
+
+    def add_alias(self, alias_id: str, analysis_id: str) -> bool:
+        """Makes `alias_id` refer to the result of `analysis_id`. Returns False if there is no such result."""
+        if self._get(analysis_id) is None:
+            return False
+        self._aliases[alias_id] = analysis_id
+        self._aliases_by_target.setdefault(analysis_id, []).append(alias_id)
+        return True
+
+    def _get(self, analysis_id: str) -> Optional[AnalysisRecord]:
+        entries = self._finished if analysis_id in self._finished else self._active
+        entry = entries.get(analysis_id)
+        if entry is None:
+            return None
+        if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            self._remove(analysis_id)
+            self.expired_evictions += 1
+            return None
+        entries.move_to_end(analysis_id)
+        return entry.record
+
+    def put(self, result: AnalysisResult) -> AnalysisRecord:
+        record = AnalysisRecord(result)
+        self._discard_entry(record.analysis_id)
+        entry = self._active[record.analysis_id] = _Entry(record, None, 0)
+        self._on_changed(entry)
+        return record
+
+    def update(self, analysis_id: str, **fields: Any) -> Optional[AnalysisRecord]:
+        """Updates a stored result in place. Returns its record, or None if it is unknown or expired."""
+        record = self._get(analysis_id)
+        if record is None:
+            return None
+        record.update(**fields)
+        self._on_changed(self._finished.get(analysis_id) or self._active[analysis_id])
+        return record
+
+    def _on_changed(self, entry: _Entry):
+        terminal = entry.record.status in TERMINAL_STATUSES
+        analysis_id = entry.record.analysis_id
+        if terminal and analysis_id in self._active:
+            self._finished[analysis_id] = self._active.pop(analysis_id)
+        elif not terminal and analysis_id in self._finished:
+            self._active[analysis_id] = self._finished.pop(analysis_id)
+        entry.expires_at = time.monotonic() + self.ttl_seconds if terminal else None
+        # Only finished results are measured: they are the large ones, and they do not change afterwards.
+        size = len(entry.record.to_json()) if self.max_bytes and terminal else 0
+        self._total_bytes += size - entry.size
+        entry.size = size
+        self._evict_over_capacity()
+
+    def sweep(self) -> int:
+        """Drops every expired entry and returns how many were removed."""
+        now = time.monotonic()
+        expired = [key for key, entry in self._finished.items() if entry.expires_at <= now]
+        for key in expired:
+            self._remove(key)
+        self.expired_evictions += len(expired)
+        return len(expired)
+
+    def start_sweeper(self):
+        if self._sweeper_task is None or self._sweeper_task.done():
+            self._sweeper_task = asyncio.get_running_loop().create_task(self._sweep_periodically())
+
+    async def stop_sweeper(self):
+        if self._sweeper_task is not None:
+            self._sweeper_task.cancel()
+            try:
+                await self._sweeper_task
+            except asyncio.CancelledError:
+                pass
+            self._sweeper_task = None
+
+    async def _sweep_periodically(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            removed = self.sweep()
+            if removed:
+                logger.info(f"Result store sweeper removed {removed} expired analyses.")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self),
+            "bytes": self._total_bytes,
+            "expired_evictions": self.expired_evictions,
+            "capacity_evictions": self.capacity_evictions,
+            "aliases": len(self._aliases),
+        }
+
+    def _discard_entry(self, analysis_id: str):
+        entry = self._finished.pop(analysis_id, None) or self._active.pop(analysis_id, None)
+        if entry is not None:
+            self._total_bytes -= entry.size
+
+    def _remove(self, analysis_id: str):
+        self._discard_entry(analysis_id)
+        for alias_id in self._aliases_by_target.pop(analysis_id, ()):
+            self._aliases.pop(alias_id, None)
+
+    def _over_capacity(self) -> bool:
+        return len(self) > self.max_entries or bool(self.max_bytes and self._total_bytes > self.max_bytes)
+
+    def _evict_over_capacity(self):
+        while self._over_capacity() and (self._finished or self._active):
+            victim = next(iter(self._finished or self._active))
+            self._remove(victim)
+            self.capacity_evictions += 1
+
+class SQLiteResultStore:
+    """
+    Result store in a SQLite database in WAL mode, shared by every process
+    that opens the same file. Use it when the API runs in several worker
+    processes (`uvicorn --workers N`): any worker can answer /status for an
+    analysis started by another, without sticky sessions or an external
+    service.
+
+    - The process running an analysis keeps its AnalysisRecord in memory
+      until it finishes and has been stored, so progress updates are applied
+      in place and this process answers for it without reading the database.
+    - Writes go through a queue to a single writer thread, so waiting for
+      another process's write lock never blocks the event loop. Queued
+      updates to the same result are coalesced; each stored state is one
+      upsert, which WAL with synchronous=NORMAL makes a page write without
+      an fsync. If a running analysis cannot be stored it is marked FAILED,
+      as other processes would otherwise see it running forever, and the
+      write is retried a few times.
+    - Lookups are one primary-key read (aliases resolved in the same query)
+      on a separate connection; WAL readers do not wait for writers. The
+      stored JSON is returned as is.
+    - Expiry is as in InMemoryResultStore, on wall-clock time so that all
+      processes agree. Over `max_entries` or `max_bytes`, the results that
+      finished first are evicted first: tracking recency of use would turn
+      every read into a write. Results still running, in this process or
+      another, are never evicted; the limit may be exceeded until they finish.
+    """
+    # Results are visible to every process using the same database file.
+    shared = True
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float,
+        max_entries: int,
+        max_bytes: Optional[int] = None,
+        sweep_interval_seconds: float = 60.0,
+        lock_timeout_seconds: float = 5.0,
+        on_write_failed: Optional[Callable[[AnalysisRecord], None]] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.lock_timeout_seconds = lock_timeout_seconds
+        # Called on the event loop with a running analysis just marked FAILED because it could not be stored.
+        self.on_write_failed = on_write_failed
+        # Autocommit: every statement is its own short transaction. The timeout covers waits for other writers.
+        self._db = sqlite3.connect(path, timeout=lock_timeout_seconds, isolation_level=None, check_same_thread=False)
+        self._closed = False
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_results ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, expires_at REAL, size INTEGER NOT NULL, json BLOB NOT NULL"
+            ")"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_aliases (alias_id TEXT PRIMARY KEY, target_id TEXT NOT NULL) WITHOUT ROWID"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS analysis_results_expiry ON analysis_results (expires_at)")
+        # Running totals kept by triggers, so checking the limits on every write does not scan the table.
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_results_totals ("
+            "id INTEGER PRIMARY KEY CHECK (id = 0), entries INTEGER NOT NULL, finished_bytes INTEGER NOT NULL)"
+        )
+        self._db.execute("INSERT OR IGNORE INTO analysis_results_totals VALUES (0, 0, 0)")
+        self._db.executescript(
+            """
+            CREATE TRIGGER IF NOT EXISTS analysis_results_inserted AFTER INSERT ON analysis_results BEGIN
+                UPDATE analysis_results_totals SET entries = entries + 1,
+                    finished_bytes = finished_bytes + CASE WHEN NEW.expires_at IS NULL THEN 0 ELSE NEW.size END;
+            END;
+            CREATE TRIGGER IF NOT EXISTS analysis_results_updated AFTER UPDATE ON analysis_results BEGIN
+                UPDATE analysis_results_totals SET finished_bytes = finished_bytes
+                    - CASE WHEN OLD.expires_at IS NULL THEN 0 ELSE OLD.size END + CASE WHEN NEW.expires_at IS NULL THEN 0 ELSE NEW.size END;
+            END;
+            CREATE TRIGGER IF NOT EXISTS analysis_results_deleted AFTER DELETE ON analysis_results BEGIN
+                UPDATE analysis_results_totals SET entries = entries - 1,
+                    finished_bytes = finished_bytes - CASE WHEN OLD.expires_at IS NULL THEN 0 ELSE OLD.size END;
+            END;
+            """
+        )
+        # The writer connection is used by the writer thread, and by sweep(), under this lock.
+        self._db_lock = threading.Lock()
+        self._reader = sqlite3.connect(path, timeout=lock_timeout_seconds, isolation_level=None, check_same_thread=False)
+        # Analyses of this process that are running, or finished but not stored yet.
+        self._active: Dict[str, AnalysisRecord] = {}
+        # Aliases added by this process and not stored yet.
+        self._aliases: Dict[str, str] = {}
+        # Latest unstored state per result, as (status, expires_at, json, record version); shared with the writer thread.
+        self._pending: Dict[str, Tuple[str, Optional[float], bytes, int]] = {}
+        self._pending_lock = threading.Lock()
+        self._failed_writes: Dict[str, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: "queue.Queue[Optional[Tuple[Any, ...]]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._run_writer, name="result-store-writer", daemon=True)
+        self._writer.start()
+        self._sweeper_task: Optional[asyncio.Task] = None
+        self.expired_evictions = 0
+        self.capacity_evictions = 0
+
+    def __len__(self) -> int:
+        return self._totals(self._reader)[0] if not self._closed else 0
+
+    def __contains__(self, analysis_id: str) -> bool:
+        return self.get_json(analysis_id) is not None
+
+    def flush(self):
+        """Blocks until every queued write has been attempted. Call it off the event loop."""
+        if not self._closed:
+            self._queue.join()
+
+    def close(self):
+        """
+        Stores the queued writes and closes the database. Afterwards the store
+        is empty as far as len() and stats() are concerned. Blocks; call it
+        off the event loop.
+        """
+        if self._closed:
+            return
+        self._queue.put(None)
+        self._writer.join()
+        self._closed = True
+        self._db.close()
+        self._reader.close()
+
+    def get(self, analysis_id: str) -> Optional[AnalysisResult]:
+        record = self.get_record(analysis_id)
+        return record.to_result(analysis_id) if record is not None else None
+
+    def get_record(self, analysis_id: str) -> Optional[AnalysisRecord]:
+        """The record `analysis_id` refers to; for an alias, that of its target."""
+        target_id = self._aliases.get(analysis_id, analysis_id)
+        record = self._active.get(target_id)
+        if record is not None:
+            return record
+        found = self._lookup(target_id)
+        if found is None:
+            return None
+        target_id, data = found
+        return self._active.get(target_id) or AnalysisRecord(AnalysisResult.model_validate_json(data))
+
+    def get_json(self, analysis_id: str) -> Optional[bytes]:
+        """The result as JSON bytes, under `analysis_id` even when it is an alias."""
+        target_id = self._aliases.get(analysis_id, analysis_id)
+        record = self._active.get(target_id)
+        if record is not None:
+            data = record.to_json()
+        else:
+            found = self._lookup(target_id)
+            if found is None:
+                return None
+            target_id, data = found
+        if target_id == analysis_id:
+            return data
+        # analysis_id is the first field of the encoding.
+        return data.replace(target_id.encode("utf-8"), analysis_id.encode("utf-8"), 1)
+
+    def _lookup(self, analysis_id: str) -> Optional[Tuple[str, bytes]]:
+        """(ID of the result, its stored JSON) for an unexpired result or alias."""
+        return self._reader.execute(
+            "SELECT id, json FROM analysis_results"
+            " WHERE id = COALESCE((SELECT target_id FROM analysis_aliases WHERE alias_id = ?1), ?1)"
+            " AND (expires_at IS NULL OR expires_at > ?2)",
+            (analysis_id, time.time()),
+        ).fetchone()
+
+    def resolve(self, analysis_id: str) -> str:
+        """Returns the ID whose result `analysis_id` refers to (itself unless it is an alias)."""
+        if analysis_id in self._aliases:
+            return self._aliases[analysis_id]
+        row = self._reader.execute("SELECT target_id FROM analysis_aliases WHERE alias_id = ?", (analysis_id,)).fetchone()
+        return row[0] if row is not None else analysis_id
+
+    def add_alias(self, alias_id: str, analysis_id: str) -> bool:
+        """Makes `alias_id` refer to the result of `analysis_id`. Returns False if there is no such result."""
+        if analysis_id not in self._active and self._lookup(analysis_id) is None:
+            return False
+        self._aliases[alias_id] = analysis_id
+        self._queue.put((self._store_alias, alias_id, analysis_id))
+        return True
+
+    def put(self, result: AnalysisResult) -> AnalysisRecord:
+        record = AnalysisRecord(result)
+        self._write(record)
+        return record
+
+    def update(self, analysis_id: str, **fields: Any) -> Optional[AnalysisRecord]:
+        """Updates a stored result and queues its write. Returns its record, or None if it is unknown or expired."""
+        record = self._active.get(analysis_id)
+        if record is None:
+            # Started by another process, or before a restart.
+            try:
+                found = self._lookup(analysis_id)
+            except sqlite3.Error as e:
+                logger.error(f"Could not read analysis {analysis_id} from the result store: {e}")
+                return None
+            if found is None or found[0] != analysis_id:
+                return None
+            record = AnalysisRecord(AnalysisResult.model_validate_json(found[1]))
+        record.update(**fields)
+        self._write(record)
+        return record
+
+    def _write(self, record: AnalysisRecord):
+        """Queues a write of the record's current state; runs on the event loop."""
+        if self._loop is None:
+            try:
+                self._loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass  # Used without an event loop; the writer thread then applies its results itself.
+        self._active[record.analysis_id] = record
+        terminal = record.status in TERMINAL_STATUSES
+        state = (record.status, time.time() + self.ttl_seconds if terminal else None, record.to_json(), record.version)
+        with self._pending_lock:
+            queued = record.analysis_id in self._pending
+            self._pending[record.analysis_id] = state
+        if not queued:
+            self._queue.put((self._store_record, record.analysis_id))
+
+    def _run_writer(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                job[0](*job[1:])
+            except Exception:
+                logger.exception("Result store writer failed")
+            finally:
+                self._queue.task_done()
+
+    def _store_record(self, analysis_id: str):
+        """Stores the latest queued state of a result; runs on the writer thread."""
+        with self._pending_lock:
+            state = self._pending.pop(analysis_id, None)
+        if state is None:
+            return
+        status, expires_at, data, version = state
+        try:
+            with self._db_lock:
+                # An upsert rather than INSERT OR REPLACE: the replaced row's delete would not reach the totals triggers.
+                self._db.execute(
+                    "INSERT INTO analysis_results (id, status, expires_at, size, json) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (id) DO UPDATE SET"
+                    " status = excluded.status, expires_at = excluded.expires_at, size = excluded.size, json = excluded.json",
+                    (analysis_id, status, expires_at, len(data), data),
+                )
+        except sqlite3.Error as e:
+            self._call_on_loop(self._write_failed, analysis_id, version, e)
+            return
+        self._call_on_loop(self._stored, analysis_id, version)
+        if expires_at is not None:
+            try:
+                with self._db_lock:
+                    self._evict_over_capacity()
+            except sqlite3.Error as e:
+                logger.warning(f"Result store eviction failed: {e}")
+
+    def _store_alias(self, alias_id: str, analysis_id: str):
+        """Stores an alias; runs on the writer thread."""
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO analysis_aliases (alias_id, target_id) VALUES (?, ?)", (alias_id, analysis_id)
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Could not store alias {alias_id} of analysis {analysis_id}: {e}")
+        self._call_on_loop(self._alias_stored, alias_id, analysis_id)
+
+    def _call_on_loop(self, callback: Callable[..., None], *args: Any):
+        loop = self._loop
+        if loop is None:
+            callback(*args)
+            return
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            pass  # The loop is closed; nothing is left to serve these results.
+
+    def _stored(self, analysis_id: str, version: int):
+        self._failed_writes.pop(analysis_id, None)
+        record = self._active.get(analysis_id)
+        # Finished results are served from the database from now on, unless they changed again meanwhile.
+        if record is not None and record.version == version and record.status in TERMINAL_STATUSES:
+            del self._active[analysis_id]
+
+    def _alias_stored(self, alias_id: str, analysis_id: str):
+        if self._aliases.get(alias_id) == analysis_id:
+            del self._aliases[alias_id]
+
+    def _write_failed(self, analysis_id: str, version: int, error: sqlite3.Error):
+        record = self._active.get(analysis_id)
+        if record is None or record.version != version:
+            return  # A newer state is queued already.
+        attempts = self._failed_writes.get(analysis_id, 0) + 1
+        if attempts >= _MAX_WRITE_ATTEMPTS:
+            # Kept in memory, so this process can still answer for it.
+            self._failed_writes.pop(analysis_id, None)
+            logger.error(f"Giving up storing analysis {analysis_id} after {attempts} attempts: {error}")
+            return
+        self._failed_writes[analysis_id] = attempts
+        logger.error(f"Could not store analysis {analysis_id}, retrying: {error}")
+        if record.status not in TERMINAL_STATUSES:
+            record.update(status="FAILED", error_message=f"The analysis could not be saved: {error}")
+            if self.on_write_failed is not None:
+                self.on_write_failed(record)
+        if self._loop is not None:
+            self._loop.call_later(attempts * self.lock_timeout_seconds, self._write, record)
+        else:
+            self._write(record)
+
+    def sweep(self) -> int:
+        """Drops every expired entry and returns how many were removed. Blocks while another process writes."""
+        with self._db_lock:
+            removed = self._db.execute("DELETE FROM analysis_results WHERE expires_at <= ?", (time.time(),)).rowcount
+            if removed:
+                self._delete_orphaned_aliases()
+        self.expired_evictions += removed
+        return removed
+
+    def start_sweeper(self):
+        if self._sweeper_task is None or self._sweeper_task.done():
+            self._sweeper_task = asyncio.get_running_loop().create_task(self._sweep_periodically())
+
+    async def stop_sweeper(self):
+        if self._sweeper_task is not None:
+            self._sweeper_task.cancel()
+            try:
+                await self._sweeper_task
+            except asyncio.CancelledError:
+                pass
+            self._sweeper_task = None
+
+    async def _sweep_periodically(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            try:
+                removed = await asyncio.to_thread(self.sweep)
+            except sqlite3.Error as e:
+                logger.warning(f"Result store sweep failed: {e}")
+                continue
+            if removed:
+                logger.info(f"Result store sweeper removed {removed} expired analyses.")
+
+    def stats(self) -> Dict[str, int]:
+        entries, finished_bytes = self._totals(self._reader) if not self._closed else (0, 0)
+        return {
+            "entries": entries,
+            "bytes": finished_bytes,
+            "expired_evictions": self.expired_evictions,
+            "capacity_evictions": self.capacity_evictions,
+            "aliases": self._reader.execute("SELECT COUNT(*) FROM analysis_aliases").fetchone()[0] if not self._closed else 0,
+        }
+
+    @staticmethod
+    def _totals(db: sqlite3.Connection) -> Tuple[int, int]:
+        """(results, bytes of finished results); as in InMemoryResultStore only finished results are measured."""
+        return db.execute("SELECT entries, finished_bytes FROM analysis_results_totals").fetchone()
+
+    def _evict_over_capacity(self):
+        entries, finished_bytes = self._totals(self._db)
+        if entries <= self.max_entries and not (self.max_bytes and finished_bytes > self.max_bytes):
+            return
+        evicted = 0
+        if entries > self.max_entries:
+            # Finished results only, in the order they finished. Active ones may belong to another process,
+            # which would keep updating them, so they stay even if that leaves the store over the limit.
+            evicted += self._db.execute(
+                "DELETE FROM analysis_results WHERE rowid IN ("
+                "SELECT rowid FROM analysis_results WHERE expires_at IS NOT NULL ORDER BY expires_at LIMIT ?)",
+                (entries - self.max_entries,),
+            ).rowcount
+            entries, finished_bytes = self._totals(self._db)
+        if self.max_bytes and finished_bytes > self.max_bytes:
+            victims = []
+            for rowid, size in self._db.execute(
+                "SELECT rowid, size FROM analysis_results WHERE expires_at IS NOT NULL ORDER BY expires_at"
+            ):
+                if finished_bytes <= self.max_bytes:
+                    break
+                victims.append((rowid,))
+                finished_bytes -= size
+            self._db.executemany("DELETE FROM analysis_results WHERE rowid = ?", victims)
+            evicted += len(victims)
+        if evicted:
+            self.capacity_evictions += evicted
+            self._delete_orphaned_aliases()
+
+    def _delete_orphaned_aliases(self):
+        """Aliases go together with their target."""
+        self._db.execute("DELETE FROM analysis_aliases WHERE target_id NOT IN (SELECT id FROM analysis_results)")
@@ -1,76 +1,275 @@
-import subprocess
+import asyncio
+import importlib.util
 import json
+import shutil
+import sys
 import tempfile
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import os
 import logging
 
+from app.core import metrics
+from app.core.config import settings
+from app.services.findings_cache import FindingsCache
+from app.services.linter_workers import LinterWorkerPool
+
 logger = logging.getLogger(__name__)
 
+# "--disable=all --enable=all" is rejected by current pylint releases; "--enable=all" alone is equivalent.
+PYLINT_CHECK_ARGS = ["--enable=all"]
+
+_LANGUAGE_TOOLS = {
+    "python": "pylint",
+    "swift": "swiftlint",
+    "ios": "swiftlint",
+    "kotlin": "detekt",
+    "android": "detekt",
+    "java": "detekt",
+}
+# The language each tool's findings cache entries are keyed under.
+_TOOL_LANGUAGES = {"pylint": "python", "swiftlint": "swift", "detekt": "kotlin"}
+_VERSION_ARGS = {"pylint": ["--version"], "swiftlint": ["version"], "detekt": ["--version"]}
+# Rule-affecting arguments each tool is run with.
+_TOOL_ARGS = {"pylint": PYLINT_CHECK_ARGS, "swiftlint": [], "detekt": []}
+# Config files each tool reads from the working directory; editing one changes the rules applied.
+_RULE_CONFIG_FILES = {
+    "pylint": ("pylintrc", ".pylintrc", "pyproject.toml", "setup.cfg", "tox.ini"),
+    "swiftlint": (".swiftlint.yml",),
+    "detekt": (),
+}
+
 class StaticAnalysisService:
     """
     Orchestrates external static analysis tools based on language.
     This service runs tools like Clang-Tidy, SwiftLint, Detekt, ESLint, Pylint.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, max_concurrent_processes: Optional[int] = None):
+        self.timeouts = {
+            "pylint": settings.PYLINT_TIMEOUT_SECONDS,
+            "swiftlint": settings.SWIFTLINT_TIMEOUT_SECONDS,
+            "detekt": settings.DETEKT_TIMEOUT_SECONDS,
+        }
+        self._process_semaphore = asyncio.Semaphore(
+            max_concurrent_processes or settings.STATIC_ANALYSIS_MAX_CONCURRENT_PROCESSES
+        )
+        # Warm pylint workers keep the interpreter and pylint imported between
+        # snippets. SwiftLint and detekt have no resident/server mode, so they
+        # keep using one process per snippet.
+        self._pylint_pool: Optional[LinterWorkerPool] = None
+        if settings.LINTER_WORKERS_ENABLED and importlib.util.find_spec("pylint") is not None:
+            self._pylint_pool = LinterWorkerPool(
+                command=[
+                    sys.executable,
+                    os.path.join(os.path.dirname(__file__), "pylint_worker.py"),
+                    *PYLINT_CHECK_ARGS,
+                ],
+                size=settings.PYLINT_WORKER_POOL_SIZE,
+                max_jobs=settings.LINTER_WORKER_MAX_JOBS,
+                timeout=settings.PYLINT_TIMEOUT_SECONDS,
+            )
+        self.findings_cache: Optional[FindingsCache] = (
+            FindingsCache(max_entries=settings.STATIC_ANALYSIS_CACHE_MAX_ENTRIES)
+            if settings.STATIC_ANALYSIS_CACHE_ENABLED else None
+        )
+        # tool -> (location and stat, fingerprint), to notice upgrades without asking for the version every time.
+        self._tool_identities: Dict[str, Tuple[str, str]] = {}
+
+    async def warm_up(self) -> Dict[str, bool]:
+        """
+        Starts the warm linter workers and reports which linters are
+        installed, so a missing one is logged at startup rather than on the
+        first snippet that needs it. The installed ones are fingerprinted for
+        the findings cache now rather than on their first snippet.
+        """
+        if self._pylint_pool:
+            await self._pylint_pool.warm_up()
+        available = {tool: self._tool_location(tool) is not None for tool in _TOOL_LANGUAGES}
+        for tool, installed in available.items():
+            if not installed:
+                logger.warning(f"{tool} is not installed or not on PATH; its findings will be skipped.")
+            elif self.findings_cache is not None:
+                await self._tool_fingerprint(tool)
+        return available
+
+    async def aclose(self):
+        """Stops any warm linter workers."""
+        if self._pylint_pool:
+            await self._pylint_pool.close()
+
+    async def _run_tool(self, tool: str, args: List[str]) -> Optional[Tuple[int, str, str]]:
+        """
+        Runs a linter as an asyncio subprocess so the event loop keeps serving
+        other requests while it works. At most STATIC_ANALYSIS_MAX_CONCURRENT_PROCESSES
+        linters run at once, and a linter exceeding its timeout is killed.
+        Returns (returncode, stdout, stderr), or None if the tool is missing or timed out.
+        """
+        async with self._process_semaphore:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *args,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+            except FileNotFoundError:
+                metrics.LINTER_FAILURES.inc(tool=tool, reason="missing")
+                logger.warning(f"{tool} is not installed or not on PATH; skipping.")
+                return None
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=self.timeouts[tool])
+            except asyncio.TimeoutError:
+                metrics.LINTER_FAILURES.inc(tool=tool, reason="timeout")
+                logger.error(f"{tool} timed out after {self.timeouts[tool]}s; reporting no findings.")
+                process.kill()
+                await process.wait()
+                return None
+            except asyncio.CancelledError:
+                process.kill()
+                await process.wait()
+                raise
+        return process.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
 
     async def run_analysis(self, code_snippet: str, language: str) -> List[Dict[str, Any]]:
         """
         Runs static analysis on the provided code snippet.
-        Currently returns mock data or calls real tool integration methods.
+        A snippet already linted by the same tool version with the same rules
+        is answered from the findings cache without running the tool.
         """
-        findings = []
+        tool = _LANGUAGE_TOOLS.get(language.lower())
+        if tool is None:
+            logger.warning(f"No specific static analysis tool configured for language: {language}")
+            return []
+        findings = None
         try:
-            if language.lower() in ["python"]:
-                findings = await self._run_pylint(code_snippet)
-            elif language.lower() in ["swift", "ios"]:
-                findings = await self._run_swiftlint(code_snippet)
-            elif language.lower() in ["kotlin", "android", "java"]:
-                findings = await self._run_detekt(code_snippet)
-            else:
-                logger.warning(f"No specific static analysis tool configured for language: {language}")
+            key = await self._cache_key(tool, code_snippet)
+            if key is not None:
+                findings = self.findings_cache.get(key)
+                if findings is not None:
+                    metrics.CACHE_HITS.inc(cache="static_analysis")
+                    return findings
+                metrics.CACHE_MISSES.inc(cache="static_analysis")
+            findings = await getattr(self, f"_run_{tool}")(code_snippet)
+            # Failures are not cached: the next submission of the snippet tries again.
+            if key is not None and findings is not None:
+                self.findings_cache.put(key, tool, findings)
         except Exception as e:
             logger.error(f"Error during static analysis: {e}", exc_info=True)
-        return findings
+        return findings or []
+
+    async def _cache_key(self, tool: str, code_snippet: str) -> Optional[str]:
+        """Findings cache key for the snippet, or None if caching is off or the tool is not installed."""
+        if self.findings_cache is None:
+            return None
+        fingerprint = await self._tool_fingerprint(tool)
+        if fingerprint is None:
+            return None
+        return FindingsCache.make_key(_TOOL_LANGUAGES[tool], fingerprint, self._rule_config(tool), code_snippet)
+
+    def _tool_location(self, tool: str) -> Optional[str]:
+        """The file whose replacement means the tool was upgraded: the pylint package the workers import, or the binary."""
+        if tool == "pylint" and self._pylint_pool:
+            spec = importlib.util.find_spec("pylint")
+            return spec.origin if spec is not None else None
+        path = shutil.which(tool)
+        return os.path.realpath(path) if path else None
+
+    async def _tool_fingerprint(self, tool: str) -> Optional[str]:
+        """
+        Identifies the installed tool by its location, the stat of that file
+        and its reported version. The version is asked for again only when
+        the stat changes; the cache's entries for the previous version are
+        then dropped.
+        """
+        location = self._tool_location(tool)
+        if location is None:
+            return None
+        try:
+            stat = os.stat(location)
+        except OSError:
+            return None
+        identity = f"{location}|{stat.st_size}|{stat.st_mtime_ns}"
+        known = self._tool_identities.get(tool)
+        if known is not None and known[0] == identity:
+            return known[1]
+        version = await self._tool_version(tool)
+        fingerprint = f"{identity}|{version}"
+        if known is not None and self.findings_cache is not None:
+            dropped = self.findings_cache.invalidate_tool(tool)
+            logger.info(f"{tool} changed ({version}); dropped {dropped} cached findings.")
+        self._tool_identities[tool] = (identity, fingerprint)
+        return fingerprint
+
+    async def _tool_version(self, tool: str) -> str:
+        if tool == "pylint" and self._pylint_pool:
+            args = [sys.executable, "-m", "pylint", "--version"]
+        else:
+            args = [tool, *_VERSION_ARGS[tool]]
+        result = await self._run_tool(tool, args)
+        if result is None:
+            return "unknown"
+        return result[1].strip()
 
-    async def _run_pylint(self, code_snippet: str) -> List[Dict[str, Any]]:
+    def _rule_config(self, tool: str) -> str:
+        """The linter arguments plus the stat of any config file it picks up from the working directory."""
+        parts = list(_TOOL_ARGS[tool])
+        for name in _RULE_CONFIG_FILES[tool]:
+            try:
+                stat = os.stat(name)
+            except OSError:
+                continue
+            parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+        return "|".join(parts)
+
+    async def _run_pylint(self, code_snippet: str) -> Optional[List[Dict[str, Any]]]:
         """
         Runs Pylint on Python code snippet by:
         1. Saving code to a temporary file.
         2. Running pylint CLI with JSON output.
         3. Parsing JSON output into internal findings format.
+        Returns None if pylint could not be run or failed.
         """
         logger.info("Running Pylint analysis")
         findings = []
+        if self._pylint_pool:
+            reply = await self._pylint_pool.run({"code": code_snippet})
+            if reply is None or "error" in reply:
+                metrics.LINTER_FAILURES.inc(tool="pylint", reason="worker_error")
+                logger.error(f"Pylint worker failed: {reply.get('error') if reply else 'no reply'}")
+                return None
+            return [self._pylint_issue_to_finding(issue) for issue in reply.get("messages", [])]
+
         with tempfile.NamedTemporaryFile(suffix=".py", mode="w", delete=True) as temp_file:
             temp_file.write(code_snippet)
             temp_file.flush()
+            # Pylint exits non-zero whenever it reports messages, so the exit
+            # code alone does not indicate failure; only fatal/usage errors do.
+            result = await self._run_tool("pylint", ["pylint", temp_file.name, "-f", "json", *PYLINT_CHECK_ARGS])
+            if result is None:
+                return None
+            returncode, pylint_output, stderr = result
+            if returncode & 1 or returncode & 32:
+                metrics.LINTER_FAILURES.inc(tool="pylint", reason="error")
+                logger.error(f"Pylint failed: {stderr}")
+                return None
             try:
-                # Run pylint with JSON output format
-                result = subprocess.run(
-                    ["pylint", temp_file.name, "-f", "json", "--disable=all", "--enable=all"],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                pylint_output = result.stdout
                 parsed = json.loads(pylint_output)
                 for issue in parsed:
-                    findings.append({
-                        "type": issue.get("type"),
-                        "message": issue.get("message"),
-                        "file": issue.get("path"),
-                        "line": issue.get("line"),
-                        "severity": self._map_pylint_type_to_severity(issue.get("type"))
-                    })
-            except subprocess.CalledProcessError as e:
-                logger.error(f"Pylint failed: {e.stderr}")
+                    findings.append(self._pylint_issue_to_finding(issue))
             except json.JSONDecodeError as e:
+                metrics.LINTER_FAILURES.inc(tool="pylint", reason="invalid_output")
                 logger.error(f"Failed to parse pylint output: {e}")
+                return None
         return findings
 
+    def _pylint_issue_to_finding(self, issue: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "type": issue.get("type"),
+            "message": issue.get("message"),
+            "file": issue.get("path"),
+            "line": issue.get("line"),
+            "severity": self._map_pylint_type_to_severity(issue.get("type"))
+        }
+
     def _map_pylint_type_to_severity(self, pylint_type: Optional[str]) -> str:
         """
         Maps pylint message types to severity levels.
@@ -86,12 +285,13 @@ class StaticAnalysisService:
             return mapping.get(pylint_type.lower(), "Info")
         return "Info"
 
-    async def _run_swiftlint(self, code_snippet: str) -> List[Dict[str, Any]]:
+    async def _run_swiftlint(self, code_snippet: str) -> Optional[List[Dict[str, Any]]]:
         """
         Runs SwiftLint on Swift code snippet by:
         1. Saving code to a temporary .swift file.
         2. Running SwiftLint CLI with JSON output.
         3. Parsing JSON output into internal findings format.
+        Returns None if SwiftLint could not be run or failed.
         """
         logger.info("Running SwiftLint analysis")
         findings = []
@@ -100,14 +300,16 @@ class StaticAnalysisService:
             temp_file.flush()
             temp_file_path = temp_file.name
         try:
-            # Run swiftlint with JSON output format
-            result = subprocess.run(
-                ["swiftlint", "lint", "--path", temp_file_path, "--reporter", "json"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            swiftlint_output = result.stdout
+            # SwiftLint exits non-zero when it finds serious violations but
+            # still writes the JSON report to stdout.
+            result = await self._run_tool("swiftlint", ["swiftlint", "lint", "--path", temp_file_path, "--reporter", "json"])
+            if result is None:
+                return None
+            returncode, swiftlint_output, stderr = result
+            if not swiftlint_output.strip():
+                metrics.LINTER_FAILURES.inc(tool="swiftlint", reason="error")
+                logger.error(f"SwiftLint failed: {stderr}")
+                return None
             parsed = json.loads(swiftlint_output)
             for issue in parsed:
                 findings.append({
@@ -117,10 +319,10 @@ class StaticAnalysisService:
                     "line": issue.get("line"),
                     "severity": issue.get("severity").capitalize() if issue.get("severity") else "Info"
                 })
-        except subprocess.CalledProcessError as e:
-            logger.error(f"SwiftLint failed: {e.stderr}")
         except json.JSONDecodeError as e:
+            metrics.LINTER_FAILURES.inc(tool="swiftlint", reason="invalid_output")
             logger.error(f"Failed to parse swiftlint output: {e}")
+            return None
         finally:
             try:
                 os.remove(temp_file_path)
@@ -128,12 +330,13 @@ class StaticAnalysisService:
                 pass
         return findings
 
-    async def _run_detekt(self, code_snippet: str) -> List[Dict[str, Any]]:
+    async def _run_detekt(self, code_snippet: str) -> Optional[List[Dict[str, Any]]]:
         """
         Runs Detekt on Kotlin code snippet by:
         1. Saving code to a temporary .kt file.
         2. Running Detekt CLI with JSON output.
         3. Parsing JSON output into internal findings format.
+        Returns None if Detekt could not be run or failed.
         """
         logger.info("Running Detekt analysis")
         findings = []
@@ -143,13 +346,10 @@ class StaticAnalysisService:
             temp_file_path = temp_file.name
         report_path = temp_file_path + "-detekt-report.json"
         try:
-            # Run detekt with JSON output format
-            result = subprocess.run(
-                ["detekt", "--input", temp_file_path, "--report", f"json:{report_path}"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            # Detekt exits non-zero when issues exceed its threshold but still writes the report.
+            result = await self._run_tool("detekt", ["detekt", "--input", temp_file_path, "--report", f"json:{report_path}"])
+            if result is None:
+                return None
             # Read the generated report file
             with open(report_path, "r") as report_file:
                 detekt_output = json.load(report_file)
@@ -163,10 +363,10 @@ class StaticAnalysisService:
                     "line": issue.get("location", {}).get("line"),
                     "severity": issue.get("severity").capitalize() if issue.get("severity") else "Info"
                 })
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Detekt failed: {e.stderr}")
         except (json.JSONDecodeError, FileNotFoundError) as e:
+            metrics.LINTER_FAILURES.inc(tool="detekt", reason="invalid_output")
             logger.error(f"Failed to parse detekt output: {e}")
+            return None
         finally:
             try:
                 os.remove(temp_file_path)
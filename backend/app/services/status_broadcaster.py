@@ -0,0 +1,88 @@
+# backend/app/services/status_broadcaster.py
+import asyncio
+import logging
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+class StatusSubscription:
+    """
+    One subscriber's view of an analysis. Only the latest snapshot is kept:
+    a slow subscriber skips intermediate updates instead of queueing them, so
+    its memory use stays constant no matter how often the analysis changes.
+    """
+    __slots__ = ("analysis_id", "loop", "_event", "_payload", "_final")
+
+    def __init__(self, analysis_id: str, loop: asyncio.AbstractEventLoop):
+        self.analysis_id = analysis_id
+        self.loop = loop
+        self._event = asyncio.Event()
+        self._payload: Optional[str] = None
+        self._final = False
+
+    def _deliver(self, payload: str, final: bool):
+        self._payload = payload
+        self._final = final
+        self._event.set()
+
+    async def next(self, timeout: float) -> Optional[str]:
+        """Waits for the next snapshot; returns None if none arrived within `timeout` seconds."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._event.clear()
+        return self._payload
+
+    @property
+    def finished(self) -> bool:
+        """True once the last delivered snapshot was a terminal one."""
+        return self._final and not self._event.is_set()
+
+class StatusBroadcaster:
+    """
+    Fans analysis status snapshots out to subscribers.
+
+    The publisher serializes a snapshot once and every subscriber receives the
+    same string, so the cost of an update does not grow with the number of
+    watchers beyond a wake-up each. Subscribers on another event loop (or
+    thread) are woken with call_soon_threadsafe.
+    """
+    def __init__(self):
+        self._subscriptions: Dict[str, Set[StatusSubscription]] = {}
+
+    def has_subscribers(self, analysis_id: str) -> bool:
+        return analysis_id in self._subscriptions
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def subscribe(self, analysis_id: str) -> StatusSubscription:
+        subscription = StatusSubscription(analysis_id, asyncio.get_running_loop())
+        self._subscriptions.setdefault(analysis_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: StatusSubscription):
+        subscriptions = self._subscriptions.get(subscription.analysis_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.analysis_id]
+
+    def publish(self, analysis_id: str, payload: str, final: bool = False):
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        for subscription in list(self._subscriptions.get(analysis_id, ())):
+            if subscription.loop is current_loop:
+                subscription._deliver(payload, final)
+                continue
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, payload, final)
+            except RuntimeError:
+                # The subscriber's loop is closed; nobody is listening any more.
+                logger.debug(f"Dropping status subscription for {analysis_id} on a closed event loop.")
+                self.unsubscribe(subscription)
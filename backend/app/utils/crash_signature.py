@@ -0,0 +1,188 @@
+# backend/app/utils/crash_signature.py
+import hashlib
+import random
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.utils.log_parser import LogSource, iter_log_lines
+from app.utils.log_template_miner import LogTemplateMiner
+
+# Lines that describe a crash: error messages and stack frames from the JVM,
+# Python, native/iOS crash reports and Android tombstones.
+_ERROR_LINE = re.compile(r"error|exception|fatal|crash|signal|abort|assert", re.IGNORECASE)
+_STACK_FRAME = re.compile(
+    r"^\s*(?:at\s|Caused by:|File \"|#\d+\s|\d+\s+\S+\s+0x[0-9a-fA-F]+|Thread \d+)"
+)
+# Applied after LogTemplateMiner.mask(): shorter memory addresses written without 0x.
+_ADDRESS = re.compile(r"\b(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{8,}\b")
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+def normalize_crash_line(line: str) -> str:
+    line = _ADDRESS.sub("<HEX>", LogTemplateMiner.mask(line.strip()))
+    return " ".join(line.split())
+
+def extract_crash_lines(source: LogSource, max_lines: int = 200) -> List[str]:
+    """Returns the normalized error and stack-frame lines of a log, in order, without repeats."""
+    seen: Set[str] = set()
+    lines: List[str] = []
+    for line in iter_log_lines(source):
+        if not (_STACK_FRAME.match(line) or _ERROR_LINE.search(line)):
+            continue
+        normalized = normalize_crash_line(line)
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            lines.append(normalized)
+            if len(lines) >= max_lines:
+                break
+    return lines
+
+class CrashSignature:
+    """
+    Identity of a crash: `signature` is a hash of the normalized crash lines
+    (equal for the same crash with different addresses, timestamps, thread
+    numbers or line offsets) and `sketch` is a MinHash of their shingles for
+    near-duplicate lookups. `context` scopes matches, e.g. to the same code.
+    """
+    __slots__ = ("signature", "sketch", "context")
+
+    def __init__(self, signature: str, sketch: Tuple[int, ...], context: str):
+        self.signature = signature
+        self.sketch = sketch
+        self.context = context
+
+    def similarity(self, other: "CrashSignature") -> float:
+        """Estimated Jaccard similarity of the two crashes' shingle sets."""
+        if self.signature == other.signature:
+            return 1.0
+        matches = sum(1 for mine, theirs in zip(self.sketch, other.sketch) if mine == theirs)
+        return matches / len(self.sketch)
+
+class CrashSignatureBuilder:
+    """Builds CrashSignatures with a fixed family of MinHash permutations (seeded, so stable across processes)."""
+    def __init__(self, num_perm: int = 64, max_lines: int = 200, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.max_lines = max_lines
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        self._permutations = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)]
+
+    def build(self, source: LogSource, context: str = "") -> Optional[CrashSignature]:
+        """Returns None when the log contains no error or stack-frame lines."""
+        lines = extract_crash_lines(source, self.max_lines)
+        if not lines:
+            return None
+        signature = hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+        return CrashSignature(signature, self._sketch(self._shingles(lines)), context)
+
+    def _shingles(self, lines: List[str]) -> Set[str]:
+        shingles = set()
+        for line in lines:
+            tokens = line.split()
+            if len(tokens) <= self.shingle_size:
+                shingles.add(line)
+                continue
+            for start in range(len(tokens) - self.shingle_size + 1):
+                shingles.add(" ".join(tokens[start:start + self.shingle_size]))
+        return shingles
+
+    def _sketch(self, shingles: Set[str]) -> Tuple[int, ...]:
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+            for shingle in shingles
+        ]
+        return tuple(
+            min((a * value + b) % _MERSENNE_PRIME for value in hashes)
+            for a, b in self._permutations
+        )
+
+class _IndexedCrash:
+    __slots__ = ("crash", "payload", "bucket_keys", "expires_at")
+
+    def __init__(self, crash: CrashSignature, payload: Any, bucket_keys: List[Tuple], expires_at: Optional[float]):
+        self.crash = crash
+        self.payload = payload
+        self.bucket_keys = bucket_keys
+        self.expires_at = expires_at
+
+class CrashSimilarityIndex:
+    """
+    In-process index of analysed crashes, searched by locality-sensitive
+    hashing: sketches are split into `bands`, and only crashes sharing a
+    whole band (within the same context) are compared. Exact signature
+    matches are found with one dict lookup. The index holds at most
+    `max_entries` crashes; the least recently matched are evicted first.
+    With `ttl_seconds`, a crash is no longer matched that long after it was
+    added, so reused results do not outlive the LLM answers they came from.
+    """
+    def __init__(self, threshold: float = 0.9, bands: int = 16, max_entries: int = 10000, ttl_seconds: Optional[float] = None):
+        self.threshold = threshold
+        self.bands = bands
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], _IndexedCrash]" = OrderedDict()
+        self._buckets: Dict[Tuple, Set[Tuple[str, str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, crash: CrashSignature, payload: Any):
+        key = (crash.context, crash.signature)
+        self._remove(key)
+        bucket_keys = self._bucket_keys(crash)
+        for bucket_key in bucket_keys:
+            self._buckets.setdefault(bucket_key, set()).add(key)
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+        self._entries[key] = _IndexedCrash(crash, payload, bucket_keys, expires_at)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def find(self, crash: CrashSignature) -> Optional[Tuple[Any, float]]:
+        """Returns the payload of the most similar indexed crash and its similarity, if above the threshold."""
+        key = (crash.context, crash.signature)
+        now = time.monotonic()
+        if key in self._entries and not self._expired(key, now):
+            self._entries.move_to_end(key)
+            return self._entries[key].payload, 1.0
+        candidates: Set[Tuple[str, str]] = set()
+        for bucket_key in self._bucket_keys(crash):
+            candidates.update(self._buckets.get(bucket_key, ()))
+        best_key, best_score = None, 0.0
+        for candidate in candidates:
+            if self._expired(candidate, now):
+                continue
+            score = crash.similarity(self._entries[candidate].crash)
+            if score > best_score:
+                best_key, best_score = candidate, score
+        if best_key is None or best_score < self.threshold:
+            return None
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key].payload, best_score
+
+    def _bucket_keys(self, crash: CrashSignature) -> List[Tuple]:
+        rows = max(1, len(crash.sketch) // self.bands)
+        return [
+            (crash.context, band, crash.sketch[band * rows:(band + 1) * rows])
+            for band in range(len(crash.sketch) // rows)
+        ]
+
+    def _expired(self, key: Tuple[str, str], now: float) -> bool:
+        """Drops the entry if it has expired; expired entries are otherwise only evicted by capacity."""
+        expires_at = self._entries[key].expires_at
+        if expires_at is None or expires_at > now:
+            return False
+        self._remove(key)
+        return True
+
+    def _remove(self, key: Tuple[str, str]):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for bucket_key in entry.bucket_keys:
+            bucket = self._buckets.get(bucket_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[bucket_key]
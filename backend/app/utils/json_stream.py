@@ -0,0 +1,72 @@
+# backend/app/utils/json_stream.py
+import json
+import logging
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class JSONArrayStreamParser:
+    """
+    Incrementally extracts the elements of the first JSON array in a stream
+    of text, e.g. the "bugs" list of `{"bugs": [{...}, {...}]}` or a bare
+    top-level array. feed() returns each object or array element as soon as
+    its closing bracket arrives, without waiting for the rest of the
+    document. Scalar elements are ignored. Only the element being read is
+    buffered; everything else is scanned once and dropped.
+    """
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._array_depth: Optional[int] = None  # depth inside the first array, once found
+        self._element_parts: Optional[List[str]] = None
+        self.finished = False  # True once the first array has closed
+
+    def feed(self, chunk: str) -> List[Any]:
+        elements: List[Any] = []
+        if self.finished:
+            return elements
+        start = 0 if self._element_parts is not None else None
+        for index, char in enumerate(chunk):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if self._array_depth is None:
+                    if char == "[":
+                        self._array_depth = self._depth
+                elif self._depth == self._array_depth + 1:
+                    self._element_parts = []
+                    start = index
+            elif char in "}]":
+                if self._element_parts is not None and self._depth == self._array_depth + 1:
+                    self._element_parts.append(chunk[start:index + 1])
+                    element = self._decode("".join(self._element_parts))
+                    if element is not None:
+                        elements.append(element)
+                    self._element_parts = None
+                    start = None
+                elif self._depth == self._array_depth:
+                    self._depth -= 1
+                    self.finished = True
+                    return elements
+                self._depth -= 1
+        if self._element_parts is not None and start is not None:
+            self._element_parts.append(chunk[start:])
+        return elements
+
+    @staticmethod
+    def _decode(text: str) -> Optional[Any]:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping malformed element in streamed JSON array: {e}")
+            return None
@@ -1,12 +1,71 @@
 # backend/app/utils/log_parser.py
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, Optional, Union
+import codecs
+import io
+import mmap
 import re
 
+# Line boundaries recognised by str.splitlines(); a chunk ending in any of these
+# (except a lone "\r", which may be the first half of "\r\n") ends a complete line.
+_LINE_BREAKS = "\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029"
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+LogSource = Union[str, bytes, mmap.mmap, io.IOBase, Iterable[Union[str, bytes]]]
+
+def iter_log_lines(source: LogSource, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Yields the lines of a log without their line endings, splitting exactly like
+    str.splitlines(). File objects (text or binary) and memory-mapped files are
+    read in fixed-size chunks, so only one chunk plus one partial line is held
+    in memory at a time. Any other iterable is treated as already split into lines.
+    """
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    elif isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    if isinstance(source, mmap.mmap) or hasattr(source, "read"):
+        yield from _iter_chunked_lines(source, chunk_size)
+        return
+
+    for line in source:
+        if isinstance(line, (bytes, bytearray)):
+            line = line.decode("utf-8", errors="replace")
+        yield line.rstrip("\r\n")
+
+def _iter_chunked_lines(source, chunk_size: int) -> Iterator[str]:
+    decoder = None
+    if isinstance(source, mmap.mmap):
+        source.seek(0)
+    carry = ""
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, (bytes, bytearray)):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            chunk = decoder.decode(chunk)
+        pieces = (carry + chunk).splitlines(keepends=True)
+        carry = ""
+        if pieces and (pieces[-1][-1] not in _LINE_BREAKS or pieces[-1].endswith("\r")):
+            carry = pieces.pop()
+        for piece in pieces:
+            yield piece.splitlines()[0]
+    if decoder is not None:
+        carry += decoder.decode(b"", final=True)
+    if carry:
+        yield from carry.splitlines()
+
 class LogParser:
     """
     A utility to parse various log formats and extract key information.
     This can be greatly expanded with regex, machine learning for anomaly detection, etc.
     """
+    # parse_stream() keeps at most this many error/warning lines each; counts stay exact.
+    DEFAULT_MAX_COLLECTED_LINES = 1000
+
     def __init__(self):
         # Define common error patterns
         self.error_patterns = {
@@ -14,8 +73,25 @@ class LogParser:
             "swift": r"(Fatal error|Thread \\d+: Fatal error): (?P<error_description>.*)",
             "generic": r"(ERROR|CRITICAL|FATAL|FAILURE|EXCEPTION|ASSERTION FAILED):.*"
         }
+        self._compiled_error_patterns = [re.compile(pattern) for pattern in self.error_patterns.values()]
+        self._error_keyword = re.compile(r"error|exception|fatal", re.IGNORECASE)
+        self._warning_keyword = re.compile(r"warn", re.IGNORECASE)
 
     def parse(self, logs: str) -> Dict[str, Any]:
+        return self.parse_stream(logs, max_collected_lines=None)
+
+    def parse_stream(
+        self,
+        source: LogSource,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_collected_lines: Optional[int] = DEFAULT_MAX_COLLECTED_LINES,
+    ) -> Dict[str, Any]:
+        """
+        Parses a log from a string, file object, memory-mapped file or iterable
+        of lines without materialising it. Peak memory is bounded by the chunk
+        size plus `max_collected_lines` stored error and warning lines
+        (None keeps every line, as parse() does).
+        """
         parsed_data = {
             "summary": "No critical events found.",
             "error_lines": [],
@@ -23,27 +99,29 @@ class LogParser:
             "error_count": 0,
             "first_error_type": None
         }
+        warning_count = 0
 
-        lines = logs.splitlines()
-        for line_num, line in enumerate(lines):
-            line_lower = line.lower()
-            if "error" in line_lower or "exception" in line_lower or "fatal" in line_lower:
-                parsed_data["error_lines"].append({"line_num": line_num + 1, "content": line.strip()})
+        for line_num, line in enumerate(iter_log_lines(source, chunk_size)):
+            if self._error_keyword.search(line):
+                if max_collected_lines is None or len(parsed_data["error_lines"]) < max_collected_lines:
+                    parsed_data["error_lines"].append({"line_num": line_num + 1, "content": line.strip()})
                 parsed_data["error_count"] += 1
                 if not parsed_data["first_error_type"]:
-                    for lang, pattern in self.error_patterns.items():
-                        match = re.search(pattern, line)
+                    for pattern in self._compiled_error_patterns:
+                        match = pattern.search(line)
                         if match:
                             parsed_data["first_error_type"] = match.groupdict().get("error_type") or match.groupdict().get("error_description")
                             break
                     if not parsed_data["first_error_type"]:
                         parsed_data["first_error_type"] = "Generic Error"
-            elif "warn" in line_lower:
-                parsed_data["warnings"].append({"line_num": line_num + 1, "content": line.strip()})
-        
+            elif self._warning_keyword.search(line):
+                warning_count += 1
+                if max_collected_lines is None or len(parsed_data["warnings"]) < max_collected_lines:
+                    parsed_data["warnings"].append({"line_num": line_num + 1, "content": line.strip()})
+
         if parsed_data["error_count"] > 0:
             parsed_data["summary"] = f"Detected {parsed_data['error_count']} errors. First identified type: {parsed_data['first_error_type']}"
-        elif parsed_data["warnings"]:
-            parsed_data["summary"] = f"Detected {len(parsed_data['warnings'])} warnings."
+        elif warning_count:
+            parsed_data["summary"] = f"Detected {warning_count} warnings."
 
         return parsed_data
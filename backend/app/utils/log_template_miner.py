@@ -0,0 +1,183 @@
+# backend/app/utils/log_template_miner.py
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import re
+import threading
+
+from app.utils.log_parser import LogSource, iter_log_lines
+
+WILDCARD = "<*>"
+_LEAF_KEY = ("clusters",)  # cannot collide with a token, which is always a str
+
+# Applied in order before tokenizing, so volatile values never reach the tree.
+_MASKS = [
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"), "<TS>"),
+    (re.compile(r"\b\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)?"), "<TS>"),
+    (re.compile(r"\b\d{2}:\d{2}:\d{2}(?:[.,]\d+)?\b"), "<TS>"),
+    (re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"), "<UUID>"),
+    (re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"), "<IP>"),
+    (re.compile(r"\b0x[0-9a-fA-F]+\b"), "<HEX>"),
+    (re.compile(r"\b[0-9a-fA-F]{16,}\b"), "<HEX>"),
+    (re.compile(r"(?<![\w.])[-+]?\d+(?:\.\d+)?(?![\w.])"), "<NUM>"),
+]
+
+class LogCluster:
+    __slots__ = ("cluster_id", "template_tokens", "size")
+
+    def __init__(self, cluster_id: int, template_tokens: List[str]):
+        self.cluster_id = cluster_id
+        self.template_tokens = template_tokens
+        self.size = 1
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.template_tokens)
+
+class LogTemplateMiner:
+    """
+    Incremental log template miner based on the Drain algorithm
+    (He et al., "Drain: An Online Log Parsing Approach with Fixed Depth Tree").
+
+    Lines are masked (timestamps, ids, numbers...), tokenized and routed
+    through a fixed-depth tree keyed by token count and leading tokens. Within
+    a leaf, a line joins the most similar cluster if enough tokens match;
+    positions that differ become wildcards. Learned clusters persist across
+    calls, so a long-lived miner gets cheaper and more stable over time. The
+    number of clusters is bounded; the least recently matched ones are evicted.
+    """
+    def __init__(self, depth: int = 4, similarity_threshold: float = 0.4, max_children: int = 100, max_clusters: int = 5000):
+        self.depth = max(depth, 3)
+        self.similarity_threshold = similarity_threshold
+        self.max_children = max_children
+        self.max_clusters = max_clusters
+        self._root: Dict = {}
+        self._clusters: "OrderedDict[int, LogCluster]" = OrderedDict()
+        self._next_cluster_id = 1
+        self._lock = threading.Lock()
+
+    @property
+    def cluster_count(self) -> int:
+        return len(self._clusters)
+
+    @staticmethod
+    def mask(line: str) -> str:
+        for pattern, replacement in _MASKS:
+            line = pattern.sub(replacement, line)
+        return line
+
+    def add_line(self, line: str) -> LogCluster:
+        tokens = self.mask(line.strip()).split()
+        with self._lock:
+            leaf = self._leaf_for(tokens)
+            cluster = self._best_match(leaf, tokens)
+            if cluster is None:
+                cluster = LogCluster(self._next_cluster_id, tokens)
+                self._next_cluster_id += 1
+                leaf.append(cluster.cluster_id)
+                self._clusters[cluster.cluster_id] = cluster
+                self._evict_if_needed()
+            else:
+                cluster.size += 1
+                cluster.template_tokens = [
+                    token if token == template_token else WILDCARD
+                    for token, template_token in zip(tokens, cluster.template_tokens)
+                ]
+                self._clusters.move_to_end(cluster.cluster_id)
+            return cluster
+
+    def summarize(self, source: LogSource, max_templates: int = 200) -> "LogTemplateSummary":
+        summary = LogTemplateSummary(max_templates)
+        for line_num, line in enumerate(iter_log_lines(source), start=1):
+            if line.strip():
+                summary.record(self.add_line(line), line_num, line)
+            summary.line_count = line_num
+        return summary
+
+    def _leaf_for(self, tokens: List[str]) -> List[int]:
+        node = self._root.setdefault(len(tokens), {})
+        for token in tokens[:self.depth - 2]:
+            key = WILDCARD if any(char.isdigit() for char in token) else token
+            if key not in node:
+                key = key if len(node) < self.max_children else WILDCARD
+            node = node.setdefault(key, {})
+        return node.setdefault(_LEAF_KEY, [])
+
+    def _best_match(self, leaf: List[int], tokens: List[str]) -> Optional[LogCluster]:
+        best, best_score = None, -1.0
+        for cluster_id in list(leaf):
+            cluster = self._clusters.get(cluster_id)
+            if cluster is None:  # evicted
+                leaf.remove(cluster_id)
+                continue
+            if not tokens:
+                return cluster
+            matches = sum(1 for token, template_token in zip(tokens, cluster.template_tokens) if token == template_token)
+            score = matches / len(tokens)
+            if score > best_score:
+                best, best_score = cluster, score
+        return best if best_score >= self.similarity_threshold else None
+
+    def _evict_if_needed(self):
+        while len(self._clusters) > self.max_clusters:
+            self._clusters.popitem(last=False)
+
+class LogTemplateSummary:
+    """Per-request occurrence counts for the templates a log matched."""
+    MAX_SAMPLE_CHARS = 300
+
+    def __init__(self, max_templates: int):
+        self.max_templates = max_templates
+        self.line_count = 0
+        self.occurrences: Dict[int, Dict] = {}
+
+    def record(self, cluster: LogCluster, line_num: int, line: str):
+        occurrence = self.occurrences.get(cluster.cluster_id)
+        if occurrence is None:
+            self.occurrences[cluster.cluster_id] = {
+                "cluster": cluster,
+                "count": 1,
+                "first_line": line_num,
+                "last_line": line_num,
+                "sample": line.strip()[:self.MAX_SAMPLE_CHARS],
+            }
+        else:
+            occurrence["count"] += 1
+            occurrence["last_line"] = line_num
+
+    @property
+    def template_count(self) -> int:
+        return len(self.occurrences)
+
+    def render(self) -> str:
+        """
+        Renders the summary as compact text for an LLM prompt, one template per
+        line in order of first appearance. Error-like templates also show their
+        first raw line, since exact exception text matters for diagnosis. If
+        there are more templates than max_templates, error-like and frequent
+        templates are kept.
+        """
+        occurrences = list(self.occurrences.values())
+        omitted = 0
+        if len(occurrences) > self.max_templates:
+            ranked = sorted(occurrences, key=lambda o: (not _looks_like_error(o["cluster"].template), -o["count"]))
+            kept = ranked[:self.max_templates]
+            omitted = len(occurrences) - len(kept)
+            occurrences = sorted(kept, key=lambda o: o["first_line"])
+
+        lines = [f"Log template summary: {self.line_count} lines collapsed into {self.template_count} templates."]
+        for occurrence in occurrences:
+            span = (
+                f"line {occurrence['first_line']}" if occurrence["count"] == 1
+                else f"lines {occurrence['first_line']}-{occurrence['last_line']}"
+            )
+            template = occurrence["cluster"].template
+            lines.append(f"[{occurrence['count']}x, {span}] {template}")
+            if _looks_like_error(template):
+                lines.append(f"    first occurrence: {occurrence['sample']}")
+        if omitted:
+            lines.append(f"... {omitted} less frequent templates omitted.")
+        return "\n".join(lines)
+
+def _looks_like_error(template: str) -> bool:
+    lowered = template.lower()
+    return "error" in lowered or "exception" in lowered or "fatal" in lowered
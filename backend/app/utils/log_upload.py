@@ -0,0 +1,192 @@
+# backend/app/utils/log_upload.py
+import hashlib
+import tempfile
+import threading
+import zlib
+from typing import AsyncIterable, Iterator, Optional
+
+# Upper bound on the output of a single decompression step, so a small but
+# highly compressed chunk cannot expand into one huge bytes object.
+_DECOMPRESS_STEP = 256 * 1024
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload decompresses to more than the allowed size."""
+
+class UnsupportedEncodingError(Exception):
+    """Raised for a Content-Encoding this server cannot decode."""
+
+class InvalidUploadError(Exception):
+    """Raised when an upload's compressed data is corrupt or truncated."""
+
+class LogUpload:
+    """
+    A decompressed log upload, held in a spooled temporary file: small logs
+    stay in memory, larger ones roll over to disk. The text is never loaded
+    as one string; consumers read it through independent readers from
+    open(), which several threads can use at the same time. A SHA-256
+    digest of the content is kept up to date as it is written.
+    """
+    def __init__(self, max_bytes: int, spool_max_memory_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._file = tempfile.SpooledTemporaryFile(max_size=spool_max_memory_bytes, mode="w+b")
+        self._lock = threading.Lock()
+        self._digest = hashlib.sha256()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def write(self, data: bytes):
+        if self.size + len(data) > self.max_bytes:
+            raise UploadTooLargeError(f"Upload exceeds {self.max_bytes} bytes once decompressed")
+        with self._lock:
+            self._file.seek(0, 2)
+            self._file.write(data)
+        self._digest.update(data)
+        self.size += len(data)
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    def open(self) -> "_UploadReader":
+        return _UploadReader(self)
+
+    def read_text(self, max_bytes: Optional[int] = None) -> str:
+        """
+        Returns the log as a string. Beyond `max_bytes`, only its first and
+        last lines within that many bytes are read, around an omission marker.
+        """
+        if max_bytes is None or self.size <= max_bytes:
+            with self._lock:
+                self._file.seek(0)
+                return self._file.read().decode("utf-8", errors="replace")
+        head = self._read_at(0, max_bytes // 2)
+        tail = self._read_at(self.size - max_bytes // 2, max_bytes // 2)
+        # Cut at line boundaries so no partial line (or split UTF-8 character) is kept.
+        head = head[:head.rfind(b"\n") + 1]
+        tail = tail[tail.find(b"\n") + 1:]
+        omitted = self.size - len(head) - len(tail)
+        return (
+            head.decode("utf-8", errors="replace")
+            + f"... [{omitted} bytes omitted] ...\n"
+            + tail.decode("utf-8", errors="replace")
+        )
+
+    def _read_at(self, offset: int, size: int) -> bytes:
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(size)
+
+    def close(self):
+        self._file.close()
+
+class _UploadReader:
+    """Minimal binary file interface over a LogUpload with its own read position."""
+    def __init__(self, upload: LogUpload):
+        self._upload = upload
+        self._offset = 0
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._upload.size - self._offset
+        data = self._upload._read_at(self._offset, size)
+        self._offset += len(data)
+        return data
+
+class _ZlibDecompressor:
+    """gzip (including multi-member files) and zlib/HTTP deflate streams."""
+    def __init__(self):
+        self._decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32)  # auto-detect the gzip or zlib header
+
+    def decompress(self, data: bytes) -> Iterator[bytes]:
+        while data:
+            try:
+                yield self._decompressor.decompress(data, _DECOMPRESS_STEP)
+            except zlib.error as e:
+                raise InvalidUploadError(f"Compressed upload is corrupt: {e}")
+            data = self._decompressor.unconsumed_tail
+            if self._decompressor.eof and self._decompressor.unused_data:
+                # Concatenated gzip members, as produced by `cat a.gz b.gz` or rotated logs.
+                data = self._decompressor.unused_data
+                self._decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32)
+
+    def finish(self) -> bytes:
+        if not self._decompressor.eof:
+            raise InvalidUploadError("Compressed upload is truncated")
+        return self._decompressor.flush()
+
+class _ZstdDecompressor:
+    """zstd streams, including concatenated frames (as written by `zstd` for rotated logs)."""
+    def __init__(self):
+        try:
+            from compression import zstd  # Python 3.14+
+        except ImportError:
+            try:
+                from backports import zstd
+            except ImportError:
+                raise UnsupportedEncodingError("zstd uploads require Python 3.14 or the optional 'backports.zstd' package")
+        self._zstd = zstd
+        self._decompressor = zstd.ZstdDecompressor()
+
+    def decompress(self, data: bytes) -> Iterator[bytes]:
+        if self._decompressor.eof and data:
+            self._decompressor = self._zstd.ZstdDecompressor()
+        while True:
+            try:
+                yield self._decompressor.decompress(data, _DECOMPRESS_STEP)
+            except self._zstd.ZstdError as e:
+                raise InvalidUploadError(f"Compressed upload is corrupt: {e}")
+            if self._decompressor.eof:
+                if not self._decompressor.unused_data:
+                    return
+                data = self._decompressor.unused_data
+                self._decompressor = self._zstd.ZstdDecompressor()
+            elif self._decompressor.needs_input:
+                return
+            else:
+                # Output was capped at _DECOMPRESS_STEP; the rest of the input is buffered by the decompressor.
+                data = b""
+
+    def finish(self) -> bytes:
+        if not self._decompressor.eof:
+            raise InvalidUploadError("Compressed upload is truncated")
+        return b""
+
+class _IdentityDecompressor:
+    def decompress(self, data: bytes) -> Iterator[bytes]:
+        yield data
+
+    def finish(self) -> bytes:
+        return b""
+
+def get_decompressor(encoding: Optional[str]):
+    """Returns a streaming decompressor for an HTTP Content-Encoding value (or a file's compression type)."""
+    encoding = (encoding or "identity").strip().lower()
+    if encoding in ("identity", ""):
+        return _IdentityDecompressor()
+    if encoding in ("gzip", "x-gzip", "deflate"):
+        return _ZlibDecompressor()
+    if encoding == "zstd":
+        return _ZstdDecompressor()
+    raise UnsupportedEncodingError(f"Unsupported encoding '{encoding}'; use gzip, deflate, zstd or identity")
+
+async def spool_upload(
+    chunks: AsyncIterable[bytes], encoding: Optional[str], max_bytes: int, spool_max_memory_bytes: int
+) -> LogUpload:
+    """
+    Decompresses a stream of body chunks into a LogUpload as they arrive.
+    Raises UnsupportedEncodingError, InvalidUploadError, or
+    UploadTooLargeError as soon as the decompressed size passes `max_bytes`.
+    """
+    decompressor = get_decompressor(encoding)
+    upload = LogUpload(max_bytes, spool_max_memory_bytes)
+    try:
+        async for chunk in chunks:
+            for data in decompressor.decompress(chunk):
+                upload.write(data)
+        upload.write(decompressor.finish())
+    except BaseException:
+        upload.close()
+        raise
+    return upload
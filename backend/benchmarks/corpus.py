@@ -0,0 +1,195 @@
+# backend/benchmarks/corpus.py
+"""
+Deterministic synthetic corpora for benchmarks: Android logcat, iOS crash
+reports and backend service logs of any size, plus a code snippet per
+language. The same (kind, size, seed) always produces the same bytes.
+"""
+import os
+import random
+import re
+from typing import Callable, Dict, Iterator, List
+
+UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+def parse_size(text: str) -> int:
+    """Parses sizes like "1KB", "10MB" or "1GB" (binary units)."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMG]?B)\s*", text.upper())
+    if not match:
+        raise ValueError(f"Invalid size: {text!r}")
+    return int(float(match.group(1)) * UNITS[match.group(2)])
+
+def format_size(size: int) -> str:
+    for unit in ("GB", "MB", "KB"):
+        if size >= UNITS[unit] and size % UNITS[unit] == 0:
+            return f"{size // UNITS[unit]}{unit}"
+    return f"{size}B"
+
+_ANDROID_TAGS = ["ActivityManager", "OkHttp", "Choreographer", "ViewRootImpl", "SQLiteDatabase", "FirebaseMessaging"]
+_ANDROID_MESSAGES = [
+    "Displayed com.example.shop/.ui.{screen}Activity: +{ms}ms",
+    "--> GET https://api.example.com/v2/{screen}/{id} h2",
+    "<-- 200 https://api.example.com/v2/{screen}/{id} ({ms}ms, {size}-byte body)",
+    "Skipped {count} frames!  The application may be doing too much work on its main thread.",
+    "Relayout returned: old=(0,0,1080,2340) new=(0,0,1080,2340) req=(1080,2340)0 dur={ms}",
+]
+_SCREENS = ["Login", "Cart", "Checkout", "Profile", "Search", "ProductDetail"]
+_JAVA_EXCEPTIONS = [
+    ("java.lang.NullPointerException", "Attempt to invoke virtual method 'java.lang.String com.example.shop.model.User.getName()' on a null object reference"),
+    ("java.lang.IllegalStateException", "Fragment CartFragment{{{hex}}} not attached to a context."),
+    ("java.lang.IndexOutOfBoundsException", "Index: {count}, Size: {count}"),
+]
+
+def _android_lines(rng: random.Random) -> Iterator[str]:
+    pid = rng.randint(1000, 30000)
+    clock = rng.randint(0, 80000)
+    while True:
+        clock += rng.randint(1, 400)
+        prefix = f"03-14 {clock // 3600000 % 24:02d}:{clock // 60000 % 60:02d}:{clock // 1000 % 60:02d}.{clock % 1000:03d}  {pid}  {pid + rng.randint(0, 40)}"
+        values = dict(
+            screen=rng.choice(_SCREENS), ms=rng.randint(1, 900), id=rng.randint(1, 99999),
+            size=rng.randint(100, 90000), count=rng.randint(1, 120), hex=f"{rng.getrandbits(32):x}",
+        )
+        roll = rng.random()
+        if roll < 0.002:
+            exception, message = rng.choice(_JAVA_EXCEPTIONS)
+            yield f"{prefix} E AndroidRuntime: FATAL EXCEPTION: main"
+            yield f"{prefix} E AndroidRuntime: Process: com.example.shop, PID: {pid}"
+            yield f"{prefix} E AndroidRuntime: {exception}: {message.format(**values)}"
+            screen = values["screen"]
+            for frame in (
+                f"com.example.shop.ui.{screen}Fragment.onViewCreated({screen}Fragment.kt:{rng.randint(20, 400)})",
+                "androidx.fragment.app.Fragment.performViewCreated(Fragment.java:3128)",
+                "android.os.Handler.dispatchMessage(Handler.java:106)",
+                "android.os.Looper.loop(Looper.java:223)",
+            ):
+                yield f"{prefix} E AndroidRuntime: \tat {frame}"
+        elif roll < 0.03:
+            yield f"{prefix} W {rng.choice(_ANDROID_TAGS)}: Slow operation: took {values['ms']}ms"
+        else:
+            yield f"{prefix} I {rng.choice(_ANDROID_TAGS)}: {rng.choice(_ANDROID_MESSAGES).format(**values)}"
+
+def _ios_lines(rng: random.Random) -> Iterator[str]:
+    report = 0
+    while True:
+        report += 1
+        base = 0x104000000 + rng.getrandbits(20) * 0x1000
+        yield f"Incident Identifier: {rng.getrandbits(128):032X}"
+        yield "Hardware Model:      iPhone14,2"
+        yield f"Process:             Shop [{rng.randint(100, 9999)}]"
+        yield "Version:             4.12.0 (4120)"
+        yield f"Date/Time:           2024-03-14 10:{report % 60:02d}:{rng.randint(0, 59):02d}.{rng.randint(0, 999):03d} +0100"
+        yield "Exception Type:  EXC_BREAKPOINT (SIGTRAP)"
+        yield "Termination Reason: Namespace SIGNAL, Code 5 Trace/BPT trap: 5"
+        yield f"Fatal error: Index out of range in CartViewController.swift line {rng.randint(10, 500)}"
+        yield ""
+        yield "Thread 0 Crashed:"
+        for depth, symbol in enumerate((
+            "Swift._assertionFailure(_:_:file:line:flags:)",
+            "CartViewController.tableView(_:cellForRowAt:)",
+            "UITableView._createPreparedCellForGlobalRow",
+            "UIApplicationMain",
+            "main",
+        )):
+            library = "libswiftCore.dylib" if depth == 0 else "Shop" if depth in (1, 4) else "UIKitCore"
+            yield f"{depth:<3} {library:<30} 0x{base + rng.getrandbits(16):016x} {symbol} + {rng.randint(4, 900)}"
+        for thread in range(1, rng.randint(3, 8)):
+            yield ""
+            yield f"Thread {thread}:"
+            for depth in range(rng.randint(2, 6)):
+                yield f"{depth:<3} {'libsystem_kernel.dylib':<30} 0x{base + rng.getrandbits(16):016x} __workq_kernreturn + {rng.randint(4, 64)}"
+        yield ""
+
+def _backend_lines(rng: random.Random) -> Iterator[str]:
+    clock = rng.randint(0, 80000)
+    paths = ["/api/v1/orders", "/api/v1/users/{id}", "/api/v1/cart", "/healthz", "/api/v1/search?q=shoes"]
+    while True:
+        clock += rng.randint(1, 50)
+        timestamp = f"2024-03-14T{clock // 3600000 % 24:02d}:{clock // 60000 % 60:02d}:{clock // 1000 % 60:02d}.{clock % 1000:03d}Z"
+        request_id = f"{rng.getrandbits(64):016x}"
+        roll = rng.random()
+        if roll < 0.002:
+            yield f"{timestamp} ERROR [{request_id}] Unhandled exception in POST /api/v1/orders"
+            yield "Traceback (most recent call last):"
+            yield '  File "/srv/app/api/orders.py", line 88, in create_order'
+            yield "    total = sum(item.price * item.quantity for item in cart.items)"
+            yield '  File "/srv/app/models/cart.py", line 41, in items'
+            yield "    return self._items[self.user_id]"
+            yield f"KeyError: {rng.randint(1, 99999)}"
+        elif roll < 0.02:
+            yield f"{timestamp} WARNING [{request_id}] Slow query took {rng.randint(500, 9000)}ms: SELECT * FROM orders WHERE user_id = %s"
+        else:
+            path = rng.choice(paths).format(id=rng.randint(1, 99999))
+            yield f"{timestamp} INFO [{request_id}] {rng.choice(['GET', 'POST'])} {path} {rng.choice([200, 200, 200, 201, 404])} {rng.randint(1, 300)}ms"
+
+GENERATORS: Dict[str, Callable[[random.Random], Iterator[str]]] = {
+    "logcat": _android_lines,
+    "ios": _ios_lines,
+    "backend": _backend_lines,
+}
+
+# The language each corpus would be submitted with, and a representative snippet for it.
+LANGUAGES = {"logcat": "Kotlin", "ios": "Swift", "backend": "Python"}
+PLATFORMS = {"logcat": "Android", "ios": "iOS", "backend": "Backend"}
+
+CODE_SNIPPETS = {
+    "Python": '''import json
+
+def create_order(cart, user_id):
+    items = cart._items[user_id]
+    total = 0
+    for item in items:
+        total = total + item.price * item.quantity
+    unused = json.dumps(items)
+    return {"total": total}
+''',
+    "Kotlin": '''class CartFragment : Fragment() {
+    private var adapter: CartAdapter? = null
+
+    override fun onViewCreated(view: View, savedInstanceState: Bundle?) {
+        val user = viewModel.user!!
+        adapter = CartAdapter(requireContext(), user.cart.items)
+        recyclerView.adapter = adapter
+    }
+}
+''',
+    "Swift": '''final class CartViewController: UITableViewController {
+    var items: [CartItem] = []
+
+    override func tableView(_ tableView: UITableView, cellForRowAt indexPath: IndexPath) -> UITableViewCell {
+        let cell = tableView.dequeueReusableCell(withIdentifier: "cell", for: indexPath)
+        cell.textLabel?.text = items[indexPath.row + 1].name
+        return cell
+    }
+}
+''',
+}
+
+def iter_corpus_lines(kind: str, size_bytes: int, seed: int = 0) -> Iterator[str]:
+    """Yields lines (with newlines) until they add up to at least `size_bytes` UTF-8 bytes."""
+    rng = random.Random(f"{kind}:{seed}")
+    written = 0
+    for line in GENERATORS[kind](rng):
+        line += "\n"
+        yield line
+        written += len(line.encode("utf-8"))
+        if written >= size_bytes:
+            return
+
+def generate_corpus(kind: str, size_bytes: int, seed: int = 0) -> str:
+    """Returns a corpus as one string. For large sizes prefer write_corpus()."""
+    return "".join(iter_corpus_lines(kind, size_bytes, seed))
+
+def write_corpus(kind: str, size_bytes: int, path: str, seed: int = 0) -> str:
+    """Writes a corpus to `path` in buffered batches, reusing an existing file of the expected name."""
+    if not os.path.exists(path):
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as corpus_file:
+            batch: List[str] = []
+            for line in iter_corpus_lines(kind, size_bytes, seed):
+                batch.append(line)
+                if len(batch) >= 10000:
+                    corpus_file.writelines(batch)
+                    batch.clear()
+            corpus_file.writelines(batch)
+        os.replace(temp_path, path)
+    return path
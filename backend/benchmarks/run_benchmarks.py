@@ -0,0 +1,385 @@
+# backend/benchmarks/run_benchmarks.py
+"""
+Benchmarks for the log parser, the full analysis pipeline (against a
+deterministic fake LLM), the static analysis service and the backend's
+cold start (import, lifespan startup and first request).
+
+    python benchmarks/run_benchmarks.py run --sizes 1KB,1MB,100MB --output results.json
+    python benchmarks/run_benchmarks.py compare baseline.json results.json --threshold 0.1
+
+`compare` exits with status 1 when any benchmark's median got slower than
+the threshold allows, so it can gate CI between two commits.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(BENCHMARKS_DIR, '..')))
+sys.path.insert(0, BENCHMARKS_DIR)
+# Settings require no real key here: the LLM is always the fake below.
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from corpus import CODE_SNIPPETS, GENERATORS, LANGUAGES, PLATFORMS, format_size, generate_corpus, parse_size, write_corpus
+
+SUITES = ("parser", "orchestrator", "static_analysis", "startup")
+DEFAULT_SIZES = "1KB,100KB,1MB,10MB"
+# Corpora above this size are benchmarked from a file on disk instead of an in-memory string.
+DEFAULT_MAX_IN_MEMORY = "64MB"
+
+class FakeLLMService:
+    """
+    Stands in for LLMService with fixed answers and an optional fixed delay,
+    so orchestrator timings measure our own code rather than the network.
+    """
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+
+    async def predict_bug_from_logs(self, logs: Optional[str], code_snippet: Optional[str] = None, on_bug=None) -> List[Dict]:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        bugs = [
+            {"type": "Crash", "description": f"Crash found in {len(logs or '')} chars of logs.", "severity": "High", "confidence": 0.9},
+            {"type": "Performance", "description": "Slow operations on the main thread.", "severity": "Medium", "confidence": 0.6},
+        ]
+        if on_bug is not None:
+            for bug in bugs:
+                on_bug(bug)
+        return bugs
+
+    async def suggest_patch_for_bug(self, bug_description: str, code_snippet: str, language: str) -> List[Dict]:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return [{"description": f"Guard against: {bug_description}", "code_diff": "--- a\n+++ b\n@@ -1 +1 @@\n-old\n+new"}]
+
+    async def aclose(self):
+        pass
+
+def _measure(fn: Callable[[], Any], repeat: int) -> List[float]:
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+def _result(name: str, suite: str, durations: List[float], size_bytes: Optional[int] = None, **extra: Any) -> Dict[str, Any]:
+    median = statistics.median(durations)
+    result = {
+        "name": name,
+        "suite": suite,
+        "size_bytes": size_bytes,
+        "repeat": len(durations),
+        "min_seconds": min(durations),
+        "median_seconds": median,
+        "mean_seconds": statistics.fmean(durations),
+        "max_seconds": max(durations),
+    }
+    if size_bytes and median > 0:
+        result["throughput_mb_per_s"] = size_bytes / median / (1024 ** 2)
+    result.update(extra)
+    print(f"  {name:<45} median {median * 1000:10.2f} ms" + (
+        f"  {result['throughput_mb_per_s']:8.1f} MB/s" if "throughput_mb_per_s" in result else ""
+    ), file=sys.stderr)
+    return result
+
+class CorpusCache:
+    """Large corpora are generated once per (kind, size, seed) into the cache directory and reused."""
+    def __init__(self, directory: str, max_in_memory: int, seed: int):
+        self.directory = directory
+        self.max_in_memory = max_in_memory
+        self.seed = seed
+        os.makedirs(directory, exist_ok=True)
+
+    def in_memory(self, size: int) -> bool:
+        return size <= self.max_in_memory
+
+    def text(self, kind: str, size: int) -> str:
+        return generate_corpus(kind, size, self.seed)
+
+    def path(self, kind: str, size: int) -> str:
+        return write_corpus(kind, size, os.path.join(self.directory, f"{kind}-{format_size(size)}-seed{self.seed}.log"), self.seed)
+
+def bench_parser(corpora: CorpusCache, sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    from app.utils.log_parser import LogParser
+
+    parser = LogParser()
+    results = []
+    for kind in GENERATORS:
+        for size in sizes:
+            if corpora.in_memory(size):
+                logs = corpora.text(kind, size)
+                durations = _measure(lambda: parser.parse(logs), repeat)
+                results.append(_result(f"parser.parse[{kind}-{format_size(size)}]", "parser", durations, len(logs.encode("utf-8"))))
+            path = corpora.path(kind, size)
+
+            def parse_file():
+                with open(path, "rb") as log_file:
+                    parser.parse_stream(log_file)
+
+            durations = _measure(parse_file, repeat)
+            results.append(_result(f"parser.parse_stream[{kind}-{format_size(size)}]", "parser", durations, os.path.getsize(path)))
+    return results
+
+def _orchestrator_logs(corpora: CorpusCache, kind: str, size: int):
+    """A string for in-memory sizes, otherwise a LogUpload spooled from the corpus file, as the upload endpoint would."""
+    if corpora.in_memory(size):
+        return corpora.text(kind, size)
+    from app.utils.log_upload import LogUpload
+
+    upload = LogUpload(max_bytes=size * 2, spool_max_memory_bytes=1024 * 1024)
+    with open(corpora.path(kind, size), "rb") as log_file:
+        for block in iter(lambda: log_file.read(1024 * 1024), b""):
+            upload.write(block)
+    return upload
+
+async def _run_orchestrator(orchestrator, corpora: CorpusCache, kind: str, size: int, with_code: bool, repeat: int) -> List[float]:
+    language = LANGUAGES[kind]
+    code_snippet = CODE_SNIPPETS[language] if with_code else None
+    durations = []
+    for _ in range(repeat):
+        logs = _orchestrator_logs(corpora, kind, size)
+        started = time.perf_counter()
+        analysis_id = orchestrator.start_analysis_background(logs, code_snippet, PLATFORMS[kind], language)
+        async for payload in orchestrator.stream_analysis_updates(analysis_id, heartbeat_seconds=60):
+            if payload is not None and json.loads(payload)["status"] in ("COMPLETED", "FAILED"):
+                break
+        durations.append(time.perf_counter() - started)
+        status = orchestrator.get_analysis_results(analysis_id).status
+        if status != "COMPLETED":
+            raise RuntimeError(f"Benchmark analysis {analysis_id} finished with status {status}")
+    return durations
+
+def bench_orchestrator(corpora: CorpusCache, sizes: List[int], repeat: int, llm_latency: float, with_code: bool) -> List[Dict[str, Any]]:
+    from app.core.config import settings
+    from app.services.analysis_orchestrator import AnalysisOrchestrator
+
+    # Every repetition must run the whole pipeline rather than reuse an earlier result.
+    settings.ANALYSIS_COALESCING_ENABLED = False
+    settings.CRASH_SIMILARITY_ENABLED = False
+
+    async def run_all() -> List[Dict[str, Any]]:
+        orchestrator = AnalysisOrchestrator(llm_service=FakeLLMService(latency_seconds=llm_latency))
+        await orchestrator.start()
+        results = []
+        try:
+            for kind in GENERATORS:
+                for size in sizes:
+                    durations = await _run_orchestrator(orchestrator, corpora, kind, size, with_code, repeat)
+                    results.append(_result(
+                        f"orchestrator.analysis[{kind}-{format_size(size)}]", "orchestrator", durations, size,
+                        with_code=with_code, llm_latency_seconds=llm_latency,
+                    ))
+        finally:
+            await orchestrator.shutdown()
+        return results
+
+    return asyncio.run(run_all())
+
+def bench_static_analysis(repeat: int) -> List[Dict[str, Any]]:
+    import shutil
+
+    from app.services.static_analysis_service import StaticAnalysisService
+
+    tools = {"Python": "pylint", "Swift": "swiftlint", "Kotlin": "detekt"}
+
+    async def run_all() -> List[Dict[str, Any]]:
+        service = StaticAnalysisService()
+        # The linters themselves are measured with the findings cache off; cache hits are reported separately.
+        findings_cache, service.findings_cache = service.findings_cache, None
+        results = []
+        try:
+            for language, tool in tools.items():
+                available = language == "Python" and service._pylint_pool is not None or shutil.which(tool) is not None
+                durations = []
+                findings: List[Dict[str, Any]] = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    findings = await service.run_analysis(CODE_SNIPPETS[language], language)
+                    durations.append(time.perf_counter() - started)
+                results.append(_result(
+                    f"static_analysis.run_analysis[{language.lower()}]", "static_analysis", durations,
+                    tool=tool, tool_available=available, findings=len(findings),
+                ))
+                # The first run pays for worker start-up; report warm runs separately from it.
+                if repeat > 1:
+                    results.append(_result(
+                        f"static_analysis.run_analysis_warm[{language.lower()}]", "static_analysis", durations[1:],
+                        tool=tool, tool_available=available, findings=len(findings),
+                    ))
+            if findings_cache is not None:
+                service.findings_cache = findings_cache
+                for language, tool in tools.items():
+                    if service._tool_location(tool) is None:
+                        continue  # nothing is cached for a missing tool
+                    await service.run_analysis(CODE_SNIPPETS[language], language)
+                    durations = []
+                    for _ in range(repeat):
+                        started = time.perf_counter()
+                        await service.run_analysis(CODE_SNIPPETS[language], language)
+                        durations.append(time.perf_counter() - started)
+                    results.append(_result(f"static_analysis.run_analysis_cached[{language.lower()}]", "static_analysis", durations, tool=tool))
+        finally:
+            await service.aclose()
+        return results
+
+    return asyncio.run(run_all())
+
+def bench_startup(repeat: int) -> List[Dict[str, Any]]:
+    """Cold-start timings from startup_probe.py, each sample in a fresh interpreter."""
+    results = []
+    for variant, probe_args in (("cold", []), ("warm_up", ["--warm-up"])):
+        samples = []
+        for _ in range(repeat):
+            completed = subprocess.run(
+                [sys.executable, os.path.join(BENCHMARKS_DIR, "startup_probe.py"), *probe_args],
+                capture_output=True, text=True, check=True,
+            )
+            # The app logs its startup to stdout; the timings are the last line.
+            samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+        for phase in ("import", "startup", "first_request"):
+            results.append(_result(
+                f"startup.{phase}[{variant}]", "startup", [sample[f"{phase}_seconds"] for sample in samples]
+            ))
+    return results
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BENCHMARKS_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args: argparse.Namespace) -> int:
+    sizes = [parse_size(size) for size in args.sizes.split(",") if size.strip()]
+    suites = [suite.strip() for suite in args.suites.split(",") if suite.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        print(f"Unknown suites: {', '.join(sorted(unknown))}; choose from {', '.join(SUITES)}", file=sys.stderr)
+        return 2
+    corpora = CorpusCache(args.corpus_dir, parse_size(args.max_in_memory), args.seed)
+    orchestrator_sizes = [size for size in sizes if size <= parse_size(args.orchestrator_max_size)]
+
+    results: List[Dict[str, Any]] = []
+    if "parser" in suites:
+        print("parser:", file=sys.stderr)
+        results.extend(bench_parser(corpora, sizes, args.repeat))
+    if "orchestrator" in suites:
+        print("orchestrator:", file=sys.stderr)
+        results.extend(bench_orchestrator(corpora, orchestrator_sizes, args.repeat, args.llm_latency, not args.no_code))
+    if "static_analysis" in suites:
+        print("static_analysis:", file=sys.stderr)
+        results.extend(bench_static_analysis(args.repeat))
+    if "startup" in suites:
+        print("startup:", file=sys.stderr)
+        results.extend(bench_startup(args.repeat))
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Pairs benchmarks by name; a regression is a median more than `threshold` (a fraction) above the baseline's."""
+    baseline_results = {result["name"]: result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        previous = baseline_results.get(result["name"])
+        if previous is None or not previous["median_seconds"]:
+            continue
+        change = result["median_seconds"] / previous["median_seconds"] - 1
+        rows.append({
+            "name": result["name"],
+            "baseline_median_seconds": previous["median_seconds"],
+            "current_median_seconds": result["median_seconds"],
+            "change": change,
+            "regression": change > threshold,
+        })
+    return rows
+
+def compare(args: argparse.Namespace) -> int:
+    with open(args.baseline, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    with open(args.current, encoding="utf-8") as current_file:
+        current = json.load(current_file)
+    rows = compare_reports(baseline, current, args.threshold)
+    if args.json:
+        print(json.dumps({
+            "baseline_commit": baseline["meta"].get("commit"),
+            "current_commit": current["meta"].get("commit"),
+            "threshold": args.threshold,
+            "comparisons": rows,
+        }, indent=2))
+    else:
+        print(f"baseline {baseline['meta'].get('commit')} -> current {current['meta'].get('commit')} (threshold {args.threshold:.0%})")
+        for row in rows:
+            flag = "REGRESSION" if row["regression"] else ""
+            print(
+                f"{row['name']:<50} {row['baseline_median_seconds'] * 1000:10.2f} ms -> "
+                f"{row['current_median_seconds'] * 1000:10.2f} ms  {row['change']:+7.1%}  {flag}"
+            )
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run benchmarks and write a JSON report.")
+    run_parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Corpus sizes from 1KB to 1GB (default {DEFAULT_SIZES}).")
+    run_parser.add_argument("--suites", default=",".join(SUITES), help="Comma-separated suites to run.")
+    run_parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark.")
+    run_parser.add_argument("--seed", type=int, default=0, help="Corpus generator seed.")
+    run_parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    run_parser.add_argument("--corpus-dir", default=os.path.join(tempfile.gettempdir(), "bughawk-benchmark-corpora"),
+                            help="Where generated corpus files are cached between runs.")
+    run_parser.add_argument("--max-in-memory", default=DEFAULT_MAX_IN_MEMORY,
+                            help="Larger corpora are only benchmarked from files (default %(default)s).")
+    run_parser.add_argument("--orchestrator-max-size", default="100MB",
+                            help="Skip end-to-end runs for larger corpora (default %(default)s).")
+    run_parser.add_argument("--llm-latency", type=float, default=0.0, help="Delay of each fake LLM call, in seconds.")
+    run_parser.add_argument("--no-code", action="store_true", help="Run end-to-end analyses without a code snippet.")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare two reports and flag regressions.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="Allowed slowdown as a fraction (default 0.1 = 10%%).")
+    compare_parser.add_argument("--json", action="store_true", help="Print the comparison as JSON.")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    # Per-run service logs (e.g. "pylint is not installed") would drown the timings.
+    logging.basicConfig(level=logging.ERROR)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
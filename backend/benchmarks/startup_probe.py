@@ -0,0 +1,60 @@
+# backend/benchmarks/startup_probe.py
+"""
+Measures the cold start of the backend in this (fresh) interpreter and
+prints the timings as JSON:
+
+- import_seconds: `import app.main`;
+- startup_seconds: the application lifespan up to the point it serves;
+- first_request_seconds: the first GET /api/v1/stats after startup.
+
+    python benchmarks/startup_probe.py [--warm-up]
+
+Run it in a new process for every sample: a second run in the same
+interpreter would find everything already imported. run_benchmarks.py's
+`startup` suite does that and reports the medians.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+# Settings require a key, but nothing here calls the LLM.
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--warm-up", action="store_true", help="Run the optional startup warm-up (STARTUP_WARMUP_ENABLED).")
+    args = parser.parse_args()
+    os.environ["STARTUP_WARMUP_ENABLED"] = "true" if args.warm_up else "false"
+
+    started = time.perf_counter()
+    from app.main import app
+    import_seconds = time.perf_counter() - started
+
+    # Not timed: the client is only needed by the probe itself.
+    import httpx
+
+    async def start_and_serve():
+        started = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            startup_seconds = time.perf_counter() - started
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://probe") as client:
+                started = time.perf_counter()
+                response = await client.get("/api/v1/stats")
+                first_request_seconds = time.perf_counter() - started
+                response.raise_for_status()
+        return startup_seconds, first_request_seconds
+
+    startup_seconds, first_request_seconds = asyncio.run(start_and_serve())
+    print(json.dumps({
+        "import_seconds": import_seconds,
+        "startup_seconds": startup_seconds,
+        "first_request_seconds": first_request_seconds,
+    }))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+# backend/loadtest/run_loadtest.py
+"""
+Offline load test: submits analyses to POST /api/v1/analyze-logs at a fixed
+rate, polls GET /api/v1/status/{id} until each finishes, and reports
+throughput, end-to-end latency percentiles and error rates.
+
+By default it starts everything it needs on localhost: the OpenAI stub
+server (stub_openai_server.py) and the backend, pointed at the stub through
+OPENAI_BASE_URL. Use --target to drive an already running backend instead.
+
+    python loadtest/run_loadtest.py --rps 20 --duration 60 --stub-latency 0.8 --stub-rate-limit-rate 0.05
+    python loadtest/run_loadtest.py --target http://127.0.0.1:8000 --rps 5 --duration 30 --output report.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+
+LOADTEST_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.abspath(os.path.join(LOADTEST_DIR, '..'))
+sys.path.insert(0, LOADTEST_DIR)
+
+from stub_openai_server import add_stub_arguments, stub_command_arguments, stub_config_from_args
+
+TERMINAL_STATUSES = ("COMPLETED", "FAILED")
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile; None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _wait_until_up(url: str, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Process for {url} exited with status {process.returncode}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+@contextmanager
+def _process(command: List[str], url: str, env: Optional[Dict[str, str]] = None) -> Iterator[subprocess.Popen]:
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+    try:
+        _wait_until_up(url, process)
+        yield process
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def _log_sample(index: int, log_bytes: int) -> str:
+    """A distinct Android crash log per request, so neither the LLM cache nor crash reuse can answer it."""
+    lines = [
+        f"03-14 10:00:{index % 60:02d}.000  4242  4242 E AndroidRuntime: FATAL EXCEPTION: main (request {index})",
+        f"03-14 10:00:{index % 60:02d}.001  4242  4242 E AndroidRuntime: java.lang.NullPointerException: user{index} was null",
+        f"03-14 10:00:{index % 60:02d}.002  4242  4242 E AndroidRuntime: \tat com.example.shop.ui.Screen{index}Fragment.onViewCreated(Screen{index}Fragment.kt:42)",
+    ]
+    filler = 0
+    while sum(len(line) + 1 for line in lines) < log_bytes:
+        filler += 1
+        lines.append(f"03-14 10:00:{filler % 60:02d}.{filler % 1000:03d}  4242  4250 I OkHttp: <-- 200 https://api.example.com/v2/items/{filler} ({filler % 900}ms)")
+    return "\n".join(lines)
+
+class RequestRecord:
+    __slots__ = ("outcome", "submit_latency", "end_to_end_latency", "polls", "http_status")
+
+    def __init__(self):
+        self.outcome = "pending"
+        self.submit_latency: Optional[float] = None
+        self.end_to_end_latency: Optional[float] = None
+        self.polls = 0
+        self.http_status: Optional[int] = None
+
+async def _run_one(client: httpx.AsyncClient, index: int, args: argparse.Namespace) -> RequestRecord:
+    record = RequestRecord()
+    payload = {"logs": _log_sample(index, args.log_bytes), "platform": "Android", "language": "Kotlin"}
+    if args.code:
+        payload["code_snippet"] = f"fun onViewCreated() {{ val user = repository.user{index}!! }}"
+    started = time.perf_counter()
+    try:
+        response = await client.post("/api/v1/analyze-logs", json=payload)
+    except httpx.HTTPError:
+        record.outcome = "connection_error"
+        return record
+    record.submit_latency = time.perf_counter() - started
+    record.http_status = response.status_code
+    if response.status_code == 429:
+        record.outcome = "rejected"
+        return record
+    if response.status_code >= 400:
+        record.outcome = "http_error"
+        return record
+    analysis_id = response.json()["analysis_id"]
+
+    deadline = started + args.request_timeout
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(args.poll_interval)
+        try:
+            response = await client.get(f"/api/v1/status/{analysis_id}")
+        except httpx.HTTPError:
+            continue
+        record.polls += 1
+        if response.status_code != 200:
+            record.http_status = response.status_code
+            record.outcome = "http_error"
+            return record
+        status = response.json()["status"]
+        if status in TERMINAL_STATUSES:
+            record.end_to_end_latency = time.perf_counter() - started
+            record.outcome = "completed" if status == "COMPLETED" else "failed"
+            return record
+    record.outcome = "timeout"
+    return record
+
+async def drive(base_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Open-loop load: request i starts at i / rps seconds regardless of how earlier ones are doing."""
+    total = int(args.rps * args.duration)
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.request_timeout) as client:
+        started = time.perf_counter()
+        tasks = []
+        for index in range(total):
+            delay = started + index / args.rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(_run_one(client, index, args)))
+        submitting = time.perf_counter() - started
+        records: List[RequestRecord] = await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+        try:
+            server_stats = (await client.get("/api/v1/stats")).json()
+        except (httpx.HTTPError, ValueError):
+            server_stats = None
+    return build_report(records, submitting, elapsed, args, server_stats)
+
+def build_report(
+    records: List[RequestRecord], submitting: float, elapsed: float, args: argparse.Namespace, server_stats: Optional[Dict]
+) -> Dict[str, Any]:
+    outcomes: Dict[str, int] = {}
+    for record in records:
+        outcomes[record.outcome] = outcomes.get(record.outcome, 0) + 1
+    latencies = [record.end_to_end_latency for record in records if record.outcome == "completed"]
+    submit_latencies = [record.submit_latency for record in records if record.submit_latency is not None]
+    total = len(records)
+
+    def summary(values: List[float]) -> Dict[str, Optional[float]]:
+        return {
+            "p50": percentile(values, 0.50),
+            "p95": percentile(values, 0.95),
+            "p99": percentile(values, 0.99),
+            "max": max(values) if values else None,
+        }
+
+    return {
+        "config": {
+            "target_rps": args.rps,
+            "duration_seconds": args.duration,
+            "log_bytes": args.log_bytes,
+            "poll_interval_seconds": args.poll_interval,
+        },
+        "requests": total,
+        "elapsed_seconds": elapsed,
+        "offered_rps": total / submitting if submitting else None,
+        "throughput_rps": outcomes.get("completed", 0) / elapsed if elapsed else None,
+        "outcomes": outcomes,
+        "error_rate": (total - outcomes.get("completed", 0)) / total if total else 0.0,
+        "rejection_rate": outcomes.get("rejected", 0) / total if total else 0.0,
+        "end_to_end_latency_seconds": summary(latencies),
+        "submit_latency_seconds": summary(submit_latencies),
+        "mean_polls": sum(record.polls for record in records) / total if total else 0.0,
+        "server_stats": server_stats,
+    }
+
+def _print_report(report: Dict[str, Any]):
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value * 1000:.0f} ms"
+
+    latency = report["end_to_end_latency_seconds"]
+    submit = report["submit_latency_seconds"]
+    print(f"requests {report['requests']} in {report['elapsed_seconds']:.1f}s "
+          f"(offered {report['offered_rps']:.1f} rps, completed {report['throughput_rps']:.1f} rps)", file=sys.stderr)
+    print(f"outcomes {report['outcomes']}  error rate {report['error_rate']:.1%}  rejected {report['rejection_rate']:.1%}", file=sys.stderr)
+    print(f"end-to-end p50 {ms(latency['p50'])}  p95 {ms(latency['p95'])}  p99 {ms(latency['p99'])}  max {ms(latency['max'])}", file=sys.stderr)
+    print(f"submit     p50 {ms(submit['p50'])}  p95 {ms(submit['p95'])}  p99 {ms(submit['p99'])}  max {ms(submit['max'])}", file=sys.stderr)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", help="Base URL of a running backend; by default one is started against the stub.")
+    parser.add_argument("--rps", type=float, default=10.0, help="Submissions per second.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to keep submitting.")
+    parser.add_argument("--log-bytes", type=int, default=4096, help="Approximate size of each submitted log.")
+    parser.add_argument("--code", action="store_true", help="Include a code snippet (runs static analysis and patch suggestion).")
+    parser.add_argument("--poll-interval", type=float, default=0.25, help="Seconds between /status polls.")
+    parser.add_argument("--request-timeout", type=float, default=120.0, help="Give up on an analysis after this many seconds.")
+    parser.add_argument("--max-connections", type=int, default=200, help="Connection pool size of the load generator.")
+    parser.add_argument("--output", help="Write the JSON report here as well as printing a summary.")
+    parser.add_argument("--backend-env", action="append", default=[], metavar="NAME=VALUE",
+                        help="Extra settings for the started backend, e.g. ANALYSIS_WORKERS=16 (repeatable).")
+    stub_options = parser.add_argument_group("stub server (ignored with --target)")
+    add_stub_arguments(stub_options, prefix="stub-")
+    args = parser.parse_args(argv)
+
+    if args.target:
+        report = asyncio.run(drive(args.target, args))
+    else:
+        stub_port, backend_port = _free_port(), _free_port()
+        stub_command = [
+            sys.executable, os.path.join(LOADTEST_DIR, "stub_openai_server.py"), "--port", str(stub_port),
+            *stub_command_arguments(stub_config_from_args(args, prefix="stub-")),
+        ]
+        env = dict(os.environ)
+        env.update({
+            "OPENAI_API_KEY": "sk-loadtest",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{stub_port}/v1",
+            # Every submission should reach the (stub) LLM rather than be answered from a cache.
+            "LLM_CACHE_ENABLED": "false",
+            "CRASH_SIMILARITY_ENABLED": "false",
+        })
+        env.update(setting.split("=", 1) for setting in args.backend_env)
+        backend_command = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(backend_port), "--log-level", "warning"]
+        with _process(stub_command, f"http://127.0.0.1:{stub_port}/stats"):
+            with _process(backend_command, f"http://127.0.0.1:{backend_port}/", env=env):
+                report = asyncio.run(drive(f"http://127.0.0.1:{backend_port}", args))
+                report["stub_stats"] = httpx.get(f"http://127.0.0.1:{stub_port}/stats").json()
+
+    _print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+            output_file.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+# backend/loadtest/stub_openai_server.py
+"""
+A local stand-in for the OpenAI chat completions API, for load tests that
+must not reach the network. It answers the prompts LLMService sends (bug
+prediction, batch prediction, patch suggestion) with well-formed JSON,
+streamed or not, after a configurable delay, and injects 5xx errors and
+429 rate limits (with Retry-After) at configurable rates.
+
+    python loadtest/stub_openai_server.py --port 8001 --latency 0.8 --jitter 0.3 --rate-limit-rate 0.05
+
+Then point the backend at it with OPENAI_BASE_URL=http://127.0.0.1:8001/v1.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_BATCH_SIZE = re.compile(r"Below are (\d+) independent submissions")
+
+class StubConfig:
+    """Behaviour of the stub. Latencies are in seconds, rates are probabilities per request."""
+    def __init__(
+        self,
+        latency: float = 0.5,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1.0,
+        bugs: int = 2,
+        description_chars: int = 80,
+        stream_chunk_chars: int = 16,
+        stream_chunk_delay: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.bugs = bugs
+        self.description_chars = description_chars
+        self.stream_chunk_chars = stream_chunk_chars
+        self.stream_chunk_delay = stream_chunk_delay
+        self.seed = seed
+
+def _description(prefix: str, chars: int) -> str:
+    text = prefix
+    while len(text) < chars:
+        text += " The failure repeats under load when the cached value is missing."
+    return text[:max(chars, len(prefix))]
+
+def _bugs(config: StubConfig, rng: random.Random) -> List[Dict[str, Any]]:
+    severities = ["Low", "Medium", "High", "Critical"]
+    return [
+        {
+            "type": rng.choice(["Crash", "LogicError", "Performance", "Concurrency"]),
+            "description": _description(f"Stub bug {index + 1}.", config.description_chars),
+            "severity": rng.choice(severities),
+            "confidence": round(0.95 - index * 0.1, 2),
+        }
+        for index in range(config.bugs)
+    ]
+
+def build_content(messages: List[Dict[str, Any]], config: StubConfig, rng: random.Random) -> str:
+    """The JSON document LLMService expects for the kind of prompt it sent."""
+    system = " ".join(str(message.get("content", "")) for message in messages if message.get("role") == "system")
+    user = " ".join(str(message.get("content", "")) for message in messages if message.get("role") == "user")
+    if "code patching" in system:
+        return json.dumps({"patches": [{
+            "description": _description("Stub patch.", config.description_chars),
+            "code_diff": "```diff\n--- a/file\n+++ b/file\n@@ -1 +1 @@\n-value = cache[key]\n+value = cache.get(key)\n```",
+        }]})
+    batch = _BATCH_SIZE.search(user)
+    if batch:
+        return json.dumps({"results": [{"item": item, "bugs": _bugs(config, rng)} for item in range(int(batch.group(1)))]})
+    return json.dumps({"bugs": _bugs(config, rng)})
+
+def _error(status_code: int, message: str, error_type: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"message": message, "type": error_type, "param": None, "code": None}},
+        headers=headers,
+    )
+
+def create_stub_app(config: StubConfig) -> FastAPI:
+    app = FastAPI(title="OpenAI stub")
+    rng = random.Random(config.seed)
+    app.state.counters = counters = {"requests": 0, "errors": 0, "rate_limited": 0, "completed": 0}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        counters["requests"] += 1
+        roll = rng.random()
+        if roll < config.rate_limit_rate:
+            counters["rate_limited"] += 1
+            return _error(429, "Rate limit reached (stub).", "rate_limit_error", headers={
+                "retry-after": str(max(1, round(config.retry_after))),
+                "retry-after-ms": str(int(config.retry_after * 1000)),
+            })
+        await asyncio.sleep(max(0.0, config.latency + rng.uniform(-config.jitter, config.jitter)))
+        if roll < config.rate_limit_rate + config.error_rate:
+            counters["errors"] += 1
+            return _error(500, "Internal server error (stub).", "server_error")
+
+        model = body.get("model", "stub")
+        content = build_content(body.get("messages", []), config, rng)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        counters["completed"] += 1
+        if not body.get("stream"):
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(content) // 4, "total_tokens": len(content) // 4},
+            }
+
+        async def events():
+            def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+                payload = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                }
+                return f"data: {json.dumps(payload)}\n\n"
+
+            yield chunk({"role": "assistant", "content": ""})
+            for start in range(0, len(content), config.stream_chunk_chars):
+                if config.stream_chunk_delay:
+                    await asyncio.sleep(config.stream_chunk_delay)
+                yield chunk({"content": content[start:start + config.stream_chunk_chars]})
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def stats():
+        return counters
+
+    return app
+
+def add_stub_arguments(parser: argparse.ArgumentParser, prefix: str = ""):
+    """Stub options, shared with run_loadtest.py (which prefixes them with "stub-")."""
+    parser.add_argument(f"--{prefix}latency", type=float, default=0.5, help="Seconds before each response.")
+    parser.add_argument(f"--{prefix}jitter", type=float, default=0.0, help="Uniform +/- jitter on the latency, in seconds.")
+    parser.add_argument(f"--{prefix}error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500.")
+    parser.add_argument(f"--{prefix}rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 429.")
+    parser.add_argument(f"--{prefix}retry-after", type=float, default=1.0, help="Retry-After sent with 429s, in seconds.")
+    parser.add_argument(f"--{prefix}bugs", type=int, default=2, help="Bugs per prediction.")
+    parser.add_argument(f"--{prefix}description-chars", type=int, default=80, help="Length of each bug/patch description.")
+    parser.add_argument(f"--{prefix}stream-chunk-delay", type=float, default=0.0, help="Delay between streamed chunks.")
+    parser.add_argument(f"--{prefix}seed", type=int, default=None)
+
+def stub_config_from_args(args: argparse.Namespace, prefix: str = "") -> StubConfig:
+    prefix = prefix.replace("-", "_")
+    return StubConfig(**{
+        name: getattr(args, prefix + name)
+        for name in ("latency", "jitter", "error_rate", "rate_limit_rate", "retry_after", "bugs",
+                     "description_chars", "stream_chunk_delay", "seed")
+    })
+
+def stub_command_arguments(config: StubConfig) -> List[str]:
+    """Command-line arguments that reproduce `config` when starting this script as a subprocess."""
+    arguments = []
+    for name in ("latency", "jitter", "error_rate", "rate_limit_rate", "retry_after", "bugs",
+                 "description_chars", "stream_chunk_delay", "seed"):
+        value = getattr(config, name)
+        if value is not None:
+            arguments += [f"--{name.replace('_', '-')}", str(value)]
+    return arguments
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_stub_app(stub_config_from_args(args)), host=args.host, port=args.port, log_level="warning")
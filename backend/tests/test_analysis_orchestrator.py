@@ -4,10 +4,14 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 import pytest
 import asyncio
+import uuid
 from unittest.mock import AsyncMock
 
+from app.core import metrics
+from app.core.config import settings
+from app.services import analysis_orchestrator
 from app.services.analysis_orchestrator import AnalysisOrchestrator
-from app.models.schemas import BugPrediction, SuggestedPatch
+from app.models.schemas import AnalysisResult, BugPrediction, LogSubmissionRequest, SuggestedPatch
 
 class MockLLMService:
     async def mock_predict_bug_from_logs(self, logs, code_snippet):
@@ -59,3 +63,292 @@ async def test_analysis_orchestrator_with_mocks():
     # Check that mock patch suggestion is included
     mock_patch_found = any(patch.description == "This is a mock patch suggestion." for patch in result.suggested_patches)
     assert mock_patch_found
+
+@pytest.mark.asyncio
+async def test_large_repetitive_logs_are_sent_as_template_summary():
+    class RecordingLLMService(MockLLMService):
+        received_logs = None
+
+        async def mock_predict_bug_from_logs(self, logs, code_snippet):
+            RecordingLLMService.received_logs = logs
+            return await super().mock_predict_bug_from_logs(logs, code_snippet)
+
+    orchestrator = AnalysisOrchestrator(llm_service=RecordingLLMService())
+    logs = "\n".join(f"I/Sync: uploaded batch {i} in {i * 3}ms" for i in range(500)) + "\nFATAL: out of memory"
+
+    orchestrator.start_analysis_background(logs, None, "Android", "Kotlin")
+    await asyncio.sleep(1)
+
+    received = RecordingLLMService.received_logs
+    assert received.startswith("Log template summary: 501 lines")
+    assert "FATAL: out of memory" in received
+    assert len(received) < len(logs)
+
+@pytest.mark.asyncio
+async def test_template_summary_does_not_depend_on_earlier_submissions():
+    orchestrator = AnalysisOrchestrator(llm_service=MockLLMService())
+    log_a = "\n".join(f"I/ActivityManager: Start proc com.example/.Main user alice pid {i}" for i in range(100))
+    log_b = "\n".join(f"I/ActivityManager: Start proc com.example/.Main user u{i} pid {i}" for i in range(100))
+
+    first = await orchestrator._prepare_logs_for_llm(log_a)
+    await orchestrator._prepare_logs_for_llm(log_b)
+    assert await orchestrator._prepare_logs_for_llm(log_a) == first
+    assert "user alice" in first
+
+@pytest.mark.asyncio
+async def test_static_analysis_and_llm_prediction_run_concurrently():
+    class SlowStaticAnalysisService:
+        async def run_analysis(self, code_snippet, language):
+            await asyncio.sleep(0.4)
+            return [{"rule": "unused-variable", "message": "Unused variable 'x'", "file": "snippet.py", "line": 1}]
+
+        async def aclose(self):
+            pass
+
+    class SlowLLMService(MockLLMService):
+        async def mock_predict_bug_from_logs(self, logs, code_snippet):
+            await asyncio.sleep(0.4)
+            return await super().mock_predict_bug_from_logs(logs, code_snippet)
+
+    orchestrator = AnalysisOrchestrator(llm_service=SlowLLMService())
+    orchestrator.static_analysis_service = SlowStaticAnalysisService()
+
+    analysis_id = orchestrator.start_analysis_background("ERROR: boom", "x = 1", "Backend", "python")
+    await asyncio.sleep(0.65)  # well under the 0.8s the two stages would take in sequence
+
+    result = orchestrator.get_analysis_results(analysis_id)
+    assert result.status == "COMPLETED"
+    assert {"static_analysis", "llm_prediction", "patch_suggestion"} <= set(result.stage_timings)
+    assert [bug.type for bug in result.predicted_bugs] == ["StaticAnalysis_unused-variable", "MockBug"]
+    assert len(result.suggested_patches) == 1
+
+@pytest.mark.asyncio
+async def test_status_stream_pushes_partial_findings_until_completed():
+    class SlowPatchLLMService(MockLLMService):
+        async def mock_suggest_patch_for_bug(self, bug_description, code_snippet, language):
+            await asyncio.sleep(0.2)
+            return await super().mock_suggest_patch_for_bug(bug_description, code_snippet, language)
+
+    orchestrator = AnalysisOrchestrator(llm_service=SlowPatchLLMService())
+    analysis_id = orchestrator.start_analysis_background("Example log data", "x = 1", "test_platform", "text")
+
+    snapshots = []
+    async for payload in orchestrator.stream_analysis_updates(analysis_id, heartbeat_seconds=5):
+        assert payload is not None
+        snapshots.append(AnalysisResult.model_validate_json(payload))
+
+    statuses = [snapshot.status for snapshot in snapshots]
+    assert statuses[0] == "QUEUED"
+    assert statuses[-1] == "COMPLETED"
+    # The LLM findings are pushed before the analysis completes.
+    assert any(snapshot.status == "IN_PROGRESS" and snapshot.predicted_bugs for snapshot in snapshots)
+    assert orchestrator.status_broadcaster.subscriber_count == 0
+
+@pytest.mark.asyncio
+async def test_confident_streamed_bug_starts_patching_before_prediction_finishes():
+    events = []
+
+    class StreamingLLMService:
+        async def predict_bug_from_logs(self, logs, code_snippet=None, on_bug=None):
+            bug = {"type": "Crash", "description": "NPE in login", "severity": "High", "confidence": 0.95}
+            on_bug(bug)
+            await asyncio.sleep(0.2)  # the rest of the completion is still streaming
+            events.append("prediction finished")
+            return [bug]
+
+        async def suggest_patch_for_bug(self, bug_description, code_snippet, language):
+            events.append("patch started")
+            return [{"code_diff": "diff", "description": f"Fix {bug_description}"}]
+
+    orchestrator = AnalysisOrchestrator(llm_service=StreamingLLMService())
+    analysis_id = str(uuid.uuid4())
+    orchestrator._queue_report(analysis_id)
+    await orchestrator._perform_analysis(analysis_id, "NullPointerException", "x = 1", "Android", "text")
+
+    result = orchestrator.get_analysis_results(analysis_id)
+    assert result.status == "COMPLETED"
+    assert events == ["patch started", "prediction finished"]
+    assert result.suggested_patches[0].description == "Fix NPE in login"
+
+@pytest.mark.asyncio
+async def test_malformed_streamed_bugs_are_skipped():
+    class MalformedLLMService:
+        async def predict_bug_from_logs(self, logs, code_snippet=None, on_bug=None):
+            bugs = [[4, 5], "Crash", {"type": "Crash", "description": "NPE in login", "severity": "High", "confidence": 0.5}]
+            for bug in bugs:
+                on_bug(bug)
+            return bugs
+
+    orchestrator = AnalysisOrchestrator(llm_service=MalformedLLMService())
+    analysis_id = str(uuid.uuid4())
+    orchestrator._queue_report(analysis_id)
+    await orchestrator._perform_analysis(analysis_id, "NullPointerException", None, "Android", "Kotlin")
+
+    result = orchestrator.get_analysis_results(analysis_id)
+    assert result.status == "COMPLETED"
+    assert [bug.description for bug in result.predicted_bugs] == ["NPE in login"]
+
+@pytest.mark.asyncio
+async def test_uploaded_log_is_streamed_and_closed():
+    from app.utils.log_upload import LogUpload
+
+    class RecordingLLMService(MockLLMService):
+        async def mock_predict_bug_from_logs(self, logs, code_snippet):
+            self.prompt_logs = logs
+            return await super().mock_predict_bug_from_logs(logs, code_snippet)
+
+    upload = LogUpload(max_bytes=10 ** 7, spool_max_memory_bytes=1024)
+    for i in range(500):
+        upload.write(f"10:00:{i % 60:02d} INFO heartbeat {i}\n".encode())
+    upload.write(b"ERROR: java.lang.NullPointerException at Login.java:45\n")
+
+    llm_service = RecordingLLMService()
+    orchestrator = AnalysisOrchestrator(llm_service=llm_service)
+    analysis_id = str(uuid.uuid4())
+    orchestrator._queue_report(analysis_id)
+    await orchestrator._perform_analysis(analysis_id, upload, None, "Android", "Kotlin")
+
+    assert orchestrator.get_analysis_results(analysis_id).status == "COMPLETED"
+    assert llm_service.prompt_logs.startswith("Log template summary: 501 lines")
+    assert upload._file.closed
+
+@pytest.mark.asyncio
+async def test_identical_submissions_share_one_analysis():
+    class CountingLLMService(MockLLMService):
+        calls = 0
+
+        async def mock_predict_bug_from_logs(self, logs, code_snippet):
+            CountingLLMService.calls += 1
+            await asyncio.sleep(0.1)
+            return await super().mock_predict_bug_from_logs(logs, code_snippet)
+
+    orchestrator = AnalysisOrchestrator(llm_service=CountingLLMService())
+    first = orchestrator.start_analysis_background("Crash at Login.java:45\n", None, "Android", "Kotlin")
+    second = orchestrator.start_analysis_background("Crash at Login.java:45\r\n", None, "android", "kotlin")
+    batch = orchestrator.start_batch_analysis([
+        LogSubmissionRequest(logs="Crash at Login.java:45", platform="Android", language="Kotlin"),
+        LogSubmissionRequest(logs="Another crash", platform="Android", language="Kotlin"),
+        LogSubmissionRequest(logs="Another crash", platform="Android", language="Kotlin"),
+    ])
+    assert len({first, second, *batch}) == 5
+
+    await asyncio.sleep(0.5)
+    assert CountingLLMService.calls == 2
+    assert orchestrator.get_stats()["coalesced_submissions"] == 3
+    for analysis_id in (first, second, *batch):
+        result = orchestrator.get_analysis_results(analysis_id)
+        assert result.analysis_id == analysis_id
+        assert result.status == "COMPLETED"
+        assert result.predicted_bugs[0].type == "MockBug"
+
+    # Once finished, the same submission is analysed again rather than attached.
+    third = orchestrator.start_analysis_background("Crash at Login.java:45", None, "Android", "Kotlin")
+    assert orchestrator.get_analysis_results(third).status == "QUEUED"
+
+@pytest.mark.asyncio
+async def test_batch_items_are_in_progress_during_shared_prediction():
+    release = asyncio.Event()
+
+    class BatchingLLMService(MockLLMService):
+        def plan_batches(self, items):
+            return [list(range(len(items)))]
+
+        async def predict_bugs_batch(self, items):
+            await release.wait()
+            return [[] for _ in items]
+
+    orchestrator = AnalysisOrchestrator(llm_service=BatchingLLMService())
+    batch = orchestrator.start_batch_analysis([
+        LogSubmissionRequest(logs="Crash at Cart.kt:7", platform="Android", language="Kotlin"),
+        LogSubmissionRequest(logs="Crash at Login.kt:3", platform="Android", language="Kotlin"),
+    ])
+    await asyncio.sleep(0.1)
+    assert [orchestrator.get_analysis_results(analysis_id).status for analysis_id in batch] == ["IN_PROGRESS"] * 2
+
+    release.set()
+    await asyncio.sleep(0.5)
+    assert [orchestrator.get_analysis_results(analysis_id).status for analysis_id in batch] == ["COMPLETED"] * 2
+
+@pytest.mark.asyncio
+async def test_similar_crash_reuses_previous_results():
+    class CountingLLMService(MockLLMService):
+        calls = 0
+
+        async def mock_predict_bug_from_logs(self, logs, code_snippet):
+            CountingLLMService.calls += 1
+            return await super().mock_predict_bug_from_logs(logs, code_snippet)
+
+    orchestrator = AnalysisOrchestrator(llm_service=CountingLLMService())
+    first, second = str(uuid.uuid4()), str(uuid.uuid4())
+    for analysis_id in (first, second):
+        orchestrator._queue_report(analysis_id)
+    await orchestrator._perform_analysis(
+        first, "FATAL EXCEPTION: main\n    at com.example.Login.onClick(Login.java:45)", "x = 1", "Android", "text"
+    )
+    await orchestrator._perform_analysis(
+        second, "FATAL EXCEPTION: main\n    at com.example.Login.onClick(Login.java:51)", "x = 1", "Android", "text"
+    )
+
+    assert CountingLLMService.calls == 1
+    reused = orchestrator.get_analysis_results(second)
+    assert reused.status == "COMPLETED"
+    assert reused.reused_from == first
+    assert reused.similarity_score == 1.0
+    assert reused.predicted_bugs == orchestrator.get_analysis_results(first).predicted_bugs
+    assert reused.suggested_patches
+
+@pytest.mark.asyncio
+async def test_crash_without_llm_findings_is_not_reused():
+    class EmptyLLMService(MockLLMService):
+        async def mock_predict_bug_from_logs(self, logs, code_snippet):
+            return []
+
+    async def static_findings(code_snippet, language):
+        return [BugPrediction(type="StaticAnalysis_W0612", description="Unused variable", severity="Medium", confidence=0.6)]
+
+    orchestrator = AnalysisOrchestrator(llm_service=EmptyLLMService())
+    orchestrator._static_analysis_stage = static_findings
+    analysis_id = str(uuid.uuid4())
+    orchestrator._queue_report(analysis_id)
+    await orchestrator._perform_analysis(
+        analysis_id, "FATAL EXCEPTION: main\n    at com.example.Login.onClick(Login.java:45)", "x = 1", "Android", "python"
+    )
+
+    assert orchestrator.get_analysis_results(analysis_id).predicted_bugs
+    assert len(orchestrator.similarity_index) == 0
+
+@pytest.mark.asyncio
+async def test_status_stream_follows_analysis_run_by_another_worker(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "RESULT_STORE_BACKEND", "sqlite")
+    monkeypatch.setattr(settings, "RESULT_STORE_SQLITE_PATH", str(tmp_path / "results.db"))
+    monkeypatch.setattr(analysis_orchestrator, "SHARED_STORE_POLL_SECONDS", 0.05)
+    worker = AnalysisOrchestrator(llm_service=MockLLMService())
+    other_worker = AnalysisOrchestrator(llm_service=MockLLMService())
+
+    analysis_id = worker.start_analysis_background("Example log data", "x = 1", "test_platform", "text")
+    worker._results.flush()  # without yielding, so the stream starts while the analysis is still queued
+    snapshots = []
+    async for payload in other_worker.stream_analysis_updates(analysis_id, heartbeat_seconds=5):
+        assert payload is not None
+        snapshots.append(AnalysisResult.model_validate_json(payload))
+
+    assert snapshots[0].status == "QUEUED"
+    assert snapshots[-1].status == "COMPLETED"
+    assert snapshots[-1].predicted_bugs[0].type == "MockBug"
+    assert other_worker.get_analysis_results(analysis_id).status == "COMPLETED"
+    await worker.shutdown()
+    await other_worker.shutdown()
+
+@pytest.mark.asyncio
+async def test_metrics_render_after_sqlite_store_shutdown(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "RESULT_STORE_BACKEND", "sqlite")
+    monkeypatch.setattr(settings, "RESULT_STORE_SQLITE_PATH", str(tmp_path / "results.db"))
+    orchestrator = AnalysisOrchestrator(llm_service=MockLLMService())
+    await orchestrator.start()
+    orchestrator.bind_metrics()
+    orchestrator.start_analysis_background("Example log data", None, "test_platform", "text")
+    await asyncio.to_thread(orchestrator._results.flush)
+    assert "bughawk_result_store_entries 1" in metrics.REGISTRY.render()
+
+    await orchestrator.shutdown()
+    assert "bughawk_result_store_entries 0" in metrics.REGISTRY.render()
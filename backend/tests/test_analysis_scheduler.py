@@ -0,0 +1,58 @@
+import sys
+import os
+import asyncio
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.analysis_scheduler import AnalysisScheduler, QueueFullError
+
+@pytest.mark.asyncio
+async def test_workers_bound_concurrency():
+    running = 0
+    peak = 0
+
+    async def handler(job_id):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    scheduler = AnalysisScheduler(max_queue_size=100, num_workers=3)
+    for i in range(12):
+        scheduler.submit(handler, i)
+    await asyncio.sleep(0.3)
+    assert peak == 3
+    assert scheduler.stats()["completed"] == 12
+    await scheduler.stop()
+
+def test_full_queue_rejects_submissions():
+    async def handler(job_id):
+        pass
+
+    scheduler = AnalysisScheduler(max_queue_size=2, num_workers=1, retry_after_seconds=9)
+    scheduler.submit(handler, 1)  # no running loop: jobs wait in the queue
+    scheduler.submit(handler, 2)
+    with pytest.raises(QueueFullError) as excinfo:
+        scheduler.submit(handler, 3)
+    assert excinfo.value.retry_after_seconds == 9
+    assert scheduler.stats()["queue_depth"] == 2
+    assert scheduler.stats()["rejected"] == 1
+
+def test_jobs_queued_outside_a_loop_run_once_started():
+    processed = []
+
+    async def handler(job_id):
+        processed.append(job_id)
+
+    scheduler = AnalysisScheduler(max_queue_size=10, num_workers=2)
+    scheduler.submit(handler, 1)
+
+    async def run_workers():
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+
+    asyncio.run(run_workers())
+    assert processed == [1]
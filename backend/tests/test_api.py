@@ -1,10 +1,13 @@
 import sys
 import os
+import subprocess
 import pytest
 from fastapi.testclient import TestClient
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from app.api.dependencies import get_app_orchestrator
+from app.core.config import settings
 from app.main import app
 
 client = TestClient(app)
@@ -51,9 +54,115 @@ def test_get_analysis_status_success():
         time.sleep(0.5)
     assert get_response is not None
     assert get_response.status_code == 200
+    assert get_response.headers["content-type"] == "application/json"
+    assert get_response.headers["x-content-type-options"] == "nosniff"
     status_data = get_response.json()
+    assert status_data["analysis_id"] == analysis_id
     assert status_data["status"] in ["QUEUED", "IN_PROGRESS", "COMPLETED", "FAILED"]
 
     if status_data["status"] == "COMPLETED":
         assert "predicted_bugs" in status_data
         assert "suggested_patches" in status_data
+
+def test_analyze_logs_queue_full_returns_429(monkeypatch):
+    from app.services.analysis_scheduler import QueueFullError
+
+    def reject(*job):
+        raise QueueFullError(retry_after_seconds=7)
+
+    monkeypatch.setattr(get_app_orchestrator(app).scheduler, "submit", reject)
+    response = client.post("/api/v1/analyze-logs", json={
+        "logs": "Sample log data",
+        "platform": "iOS",
+        "language": "Swift"
+    })
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
+
+def test_analyze_logs_batch():
+    response = client.post("/api/v1/analyze-logs/batch", json=[
+        {"logs": "Sample log data", "platform": "iOS", "language": "Swift"},
+        {"code_snippet": "print('hello')", "platform": "Backend", "language": "Python"},
+    ])
+    assert response.status_code == 202
+    analysis_ids = response.json()["analysis_ids"]
+    assert len(analysis_ids) == 2
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+    for analysis_id in analysis_ids:
+        assert client.get(f"/api/v1/status/{analysis_id}").status_code == 200
+
+def test_analyze_logs_batch_rejects_empty_item():
+    response = client.post("/api/v1/analyze-logs/batch", json=[
+        {"logs": "Sample log data", "platform": "iOS", "language": "Swift"},
+        {"platform": "iOS", "language": "Swift"},
+    ])
+    assert response.status_code == 400
+    assert "Submission 1" in response.json()["detail"]
+
+def test_stream_analysis_status_for_finished_analysis():
+    from app.models.schemas import AnalysisResult
+
+    get_app_orchestrator(app)._store_report(AnalysisResult(analysis_id="streamed-id", status="COMPLETED"))
+    with client.stream("GET", "/api/v1/status/streamed-id/stream") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+        body = "".join(response.iter_text())
+    assert body.startswith("event: status\ndata: ")
+    assert '"status":"COMPLETED"' in body
+
+def test_stream_analysis_status_not_found():
+    response = client.get("/api/v1/status/non-existent-id/stream")
+    assert response.status_code == 404
+
+def test_analyze_logs_upload_gzip_body():
+    import gzip
+    response = client.post(
+        "/api/v1/analyze-logs/upload?platform=Android&language=Kotlin",
+        content=gzip.compress(b"ERROR: java.lang.NullPointerException\n" * 100),
+        headers={"Content-Encoding": "gzip", "Content-Type": "text/plain"},
+    )
+    assert response.status_code == 202
+    assert client.get(f"/api/v1/status/{response.json()['analysis_id']}").status_code == 200
+
+def test_analyze_logs_upload_multipart():
+    import gzip
+    response = client.post(
+        "/api/v1/analyze-logs/upload",
+        data={"platform": "iOS", "language": "Swift", "code_snippet": "let x = 1"},
+        files={"logs": ("app.log.gz", gzip.compress(b"Fatal error: Index out of range\n"), "application/octet-stream")},
+    )
+    assert response.status_code == 202
+
+def test_analyze_logs_upload_rejects_oversized_and_unknown_encoding(monkeypatch):
+    import gzip
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "UPLOAD_MAX_BYTES", 1000)
+    response = client.post(
+        "/api/v1/analyze-logs/upload?platform=iOS&language=Swift",
+        content=gzip.compress(b"x" * 5000),
+        headers={"Content-Encoding": "gzip"},
+    )
+    assert response.status_code == 413
+
+    response = client.post(
+        "/api/v1/analyze-logs/upload?platform=iOS&language=Swift",
+        content=b"logs",
+        headers={"Content-Encoding": "br"},
+    )
+    assert response.status_code == 415
+
+def test_importing_the_app_does_not_create_services():
+    code = "import sys, app.main; assert 'app.services.analysis_orchestrator' not in sys.modules"
+    backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    subprocess.run([sys.executable, "-c", code], cwd=backend_dir, env={**os.environ, "OPENAI_API_KEY": "sk-test"}, check=True)
+
+def test_lifespan_creates_and_warms_up_services(monkeypatch):
+    monkeypatch.setattr(settings, "STARTUP_WARMUP_ENABLED", True)
+    monkeypatch.setattr(app.state, "analysis_orchestrator", None, raising=False)  # this test gets its own
+    with TestClient(app) as lifespan_client:
+        orchestrator = app.state.analysis_orchestrator
+        assert orchestrator is not None
+        assert lifespan_client.get("/api/v1/stats").status_code == 200
+        assert get_app_orchestrator(app) is orchestrator
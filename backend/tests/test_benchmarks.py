@@ -0,0 +1,53 @@
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from run_benchmarks import compare_reports, main
+
+def report(commit, **medians):
+    return {
+        "meta": {"commit": commit},
+        "results": [{"name": name, "suite": name.split("_")[0], "median_seconds": median} for name, median in medians.items()],
+    }
+
+def write_reports(tmp_path, baseline, current):
+    paths = []
+    for name, data in (("baseline.json", baseline), ("current.json", current)):
+        path = tmp_path / name
+        path.write_text(json.dumps(data), encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+def test_slowdown_above_threshold_is_a_regression():
+    rows = compare_reports(report("a", parser_1MB=1.0), report("b", parser_1MB=1.25), threshold=0.1)
+    assert len(rows) == 1
+    assert rows[0]["regression"]
+    assert abs(rows[0]["change"] - 0.25) < 1e-9
+
+    # Within the threshold is noise, not a regression.
+    assert not compare_reports(report("a", parser_1MB=1.0), report("b", parser_1MB=1.05), threshold=0.1)[0]["regression"]
+
+def test_improvement_is_not_a_regression():
+    rows = compare_reports(report("a", parser_1MB=1.0), report("b", parser_1MB=0.5), threshold=0.1)
+    assert not rows[0]["regression"]
+    assert rows[0]["change"] == -0.5
+
+def test_benchmarks_in_only_one_report_are_skipped():
+    baseline = report("a", parser_1MB=1.0, startup_cold=2.0)
+    current = report("b", parser_1MB=1.0, orchestrator_1MB=9.0)
+    rows = compare_reports(baseline, current, threshold=0.1)
+    assert [row["name"] for row in rows] == ["parser_1MB"]
+    assert not rows[0]["regression"]
+
+def test_compare_command_exit_status(tmp_path, capsys):
+    baseline, current = write_reports(tmp_path, report("a", parser_1MB=1.0), report("b", parser_1MB=2.0))
+    assert main(["compare", baseline, current, "--threshold", "0.1"]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
+    assert main(["compare", baseline, current, "--threshold", "1.5"]) == 0
+    assert "REGRESSION" not in capsys.readouterr().out
+
+    baseline, current = write_reports(tmp_path, report("a", parser_1MB=1.0), report("b", startup_cold=5.0))
+    assert main(["compare", baseline, current, "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)["comparisons"] == []
@@ -0,0 +1,66 @@
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.crash_signature import CrashSignatureBuilder, CrashSimilarityIndex, extract_crash_lines
+
+CRASH = """2024-03-01 10:00:01.123 E/AndroidRuntime( 1234): FATAL EXCEPTION: main
+2024-03-01 10:00:01.124 I/ActivityManager( 1234): Displayed com.example/.LoginActivity
+java.lang.NullPointerException: Attempt to read field on a null object reference at 0x7f3a2b1c
+    at com.example.Login.onClick(Login.java:45)
+    at android.view.View.performClick(View.java:7448)
+    at android.os.Handler.dispatchMessage(Handler.java:106)
+    at android.os.Looper.loop(Looper.java:223)
+"""
+
+def variant(text):
+    return (text.replace("1234", "5678").replace("10:00:01", "23:59:59")
+            .replace("0x7f3a2b1c", "0x00ff00ff").replace("Login.java:45", "Login.java:52"))
+
+def test_volatile_tokens_do_not_change_the_signature():
+    builder = CrashSignatureBuilder()
+    lines = extract_crash_lines(CRASH)
+    assert not any("Displayed" in line for line in lines)
+    assert builder.build(CRASH).signature == builder.build(variant(CRASH)).signature
+    assert builder.build("INFO all good\nINFO still good") is None
+
+def test_index_finds_near_duplicates_within_the_same_context():
+    builder = CrashSignatureBuilder()
+    index = CrashSimilarityIndex(threshold=0.7)
+    index.add(builder.build(CRASH, context="code-a"), "stored result")
+
+    near_duplicate = builder.build(CRASH.replace("Looper.loop", "Looper.loopOnce"), context="code-a")
+    payload, score = index.find(near_duplicate)
+    assert payload == "stored result"
+    assert 0.7 <= score < 1.0
+    assert index.find(builder.build(variant(CRASH), context="code-a")) == ("stored result", 1.0)
+
+    assert index.find(builder.build(CRASH, context="code-b")) is None
+    unrelated = builder.build("Fatal error: Index out of range\n0 MyApp 0x0000000104f1c2a8 main + 52", context="code-a")
+    assert index.find(unrelated) is None
+
+def test_index_evicts_least_recently_used():
+    builder = CrashSignatureBuilder()
+    index = CrashSimilarityIndex(max_entries=2)
+    crashes = [builder.build(f"ERROR: failure number {word}") for word in ("alpha", "beta", "gamma")]
+    index.add(crashes[0], 0)
+    index.add(crashes[1], 1)
+    index.find(crashes[0])
+    index.add(crashes[2], 2)
+    assert len(index) == 2
+    assert index.find(crashes[1]) is None
+    assert index.find(crashes[0]) == (0, 1.0)
+
+def test_index_entries_expire_after_ttl(monkeypatch):
+    builder = CrashSignatureBuilder()
+    index = CrashSimilarityIndex(ttl_seconds=60)
+    crash = builder.build("ERROR: failure number alpha")
+    index.add(crash, 0)
+    assert index.find(crash) == (0, 1.0)
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert index.find(crash) is None
+    assert len(index) == 0
@@ -0,0 +1,33 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.findings_cache import FindingsCache
+
+def test_key_covers_language_tool_rules_and_snippet():
+    key = FindingsCache.make_key("python", "pylint|3.2.0", "--enable=all", "x = 1")
+    assert key == FindingsCache.make_key("python", "pylint|3.2.0", "--enable=all", "x = 1")
+    assert key != FindingsCache.make_key("python", "pylint|3.3.0", "--enable=all", "x = 1")
+    assert key != FindingsCache.make_key("python", "pylint|3.2.0", "--disable=C", "x = 1")
+    assert key != FindingsCache.make_key("python", "pylint|3.2.0", "--enable=all", "x = 2")
+
+def test_least_recently_used_entry_is_evicted():
+    cache = FindingsCache(max_entries=2)
+    cache.put("a", "pylint", [{"line": 1}])
+    cache.put("b", "pylint", [])
+    assert cache.get("a") == [{"line": 1}]  # "b" is now the least recently used
+    cache.put("c", "detekt", [])
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["misses"] == 1
+
+def test_returned_findings_are_copies_and_tools_can_be_invalidated():
+    cache = FindingsCache()
+    cache.put("a", "pylint", [{"line": 1}])
+    cache.put("b", "swiftlint", [])
+    cache.get("a")[0]["line"] = 99
+    assert cache.get("a") == [{"line": 1}]
+    assert cache.invalidate_tool("pylint") == 1
+    assert cache.get("a") is None
+    assert cache.get("b") == []
@@ -0,0 +1,37 @@
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.json_stream import JSONArrayStreamParser
+
+def feed_in_chunks(text, size):
+    parser = JSONArrayStreamParser()
+    elements = []
+    for start in range(0, len(text), size):
+        elements.extend(parser.feed(text[start:start + size]))
+    return parser, elements
+
+def test_elements_are_emitted_as_they_close():
+    parser = JSONArrayStreamParser()
+    assert parser.feed('{"bugs": [{"type": "Crash", "confidence": 0.9}, {"type": ') == [{"type": "Crash", "confidence": 0.9}]
+    assert parser.feed('"Performance"}') == [{"type": "Performance"}]
+    assert parser.feed('], "other": [{"ignored": true}]}') == []
+    assert parser.finished
+
+def test_brackets_and_quotes_inside_strings_are_ignored_for_any_chunking():
+    document = {"bugs": [
+        {"description": "Unbalanced ] and } and \"quoted [text]\" \\", "nested": [1, {"a": "]"}]},
+        "scalar elements are skipped",
+        {"type": "Last"},
+    ]}
+    text = json.dumps(document)
+    for size in (1, 2, 3, 7, len(text)):
+        parser, elements = feed_in_chunks(text, size)
+        assert elements == [document["bugs"][0], document["bugs"][2]]
+        assert parser.finished
+
+def test_malformed_element_is_skipped():
+    parser, elements = feed_in_chunks('[{"a": 1,}, {"b": 2}]', 4)
+    assert elements == [{"b": 2}]
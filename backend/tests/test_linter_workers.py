@@ -0,0 +1,50 @@
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.linter_workers import LinterWorkerPool
+
+# A minimal worker speaking the same JSON-lines protocol as pylint_worker.py.
+# It echoes its PID so tests can tell when a worker was restarted, and exits
+# when asked to simulate a crash.
+FAKE_WORKER = """
+import json, os, sys
+print(json.dumps({"ready": True}), flush=True)
+for line in sys.stdin:
+    request = json.loads(line)
+    if request.get("crash"):
+        sys.exit(1)
+    print(json.dumps({"messages": [], "pid": os.getpid()}), flush=True)
+"""
+
+def make_pool(**kwargs):
+    options = {"size": 1, "max_jobs": 100, "timeout": 5}
+    options.update(kwargs)
+    return LinterWorkerPool(command=[sys.executable, "-c", FAKE_WORKER], **options)
+
+@pytest.mark.asyncio
+async def test_worker_is_reused_between_jobs():
+    pool = make_pool()
+    first = await pool.run({"code": "x = 1"})
+    second = await pool.run({"code": "y = 2"})
+    assert first["pid"] == second["pid"]
+    await pool.close()
+
+@pytest.mark.asyncio
+async def test_worker_is_recycled_after_max_jobs():
+    pool = make_pool(max_jobs=2)
+    pids = [(await pool.run({"code": ""}))["pid"] for _ in range(3)]
+    assert pids[0] == pids[1] != pids[2]
+    assert pool.stats()["restarts"] == 1
+    await pool.close()
+
+@pytest.mark.asyncio
+async def test_crashed_worker_is_restarted():
+    pool = make_pool()
+    before = await pool.run({"code": ""})
+    assert await pool.run({"crash": True}) is None
+    after = await pool.run({"code": ""})
+    assert after is not None and after["pid"] != before["pid"]
+    await pool.close()
@@ -0,0 +1,80 @@
+import sys
+import os
+import json
+import threading
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.llm_cache import LLMResponseCache
+from app.services.llm_service import LLMService
+
+def test_key_ignores_whitespace_and_line_endings():
+    key_a = LLMResponseCache.make_key("predict", "gpt-4o", "1", "ERROR: boom\r\nline 2  \n", None)
+    key_b = LLMResponseCache.make_key("predict", "gpt-4o", "1", "  ERROR: boom\nline 2", "")
+    assert key_a == key_b
+    assert key_a != LLMResponseCache.make_key("predict", "gpt-4o-mini", "1", "ERROR: boom\nline 2", None)
+    assert key_a != LLMResponseCache.make_key("predict", "gpt-4o", "2", "ERROR: boom\nline 2", None)
+
+def test_memory_tier_lru_and_ttl():
+    cache = LLMResponseCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", [{"type": "A"}])
+    cache.set("b", [{"type": "B"}])
+    assert cache.get("a") == [{"type": "A"}]
+    cache.set("c", [{"type": "C"}])  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+    expired = LLMResponseCache(ttl_seconds=-1)
+    expired.set("a", [])
+    assert expired.get("a") is None
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    db_path = str(tmp_path / "llm_cache.db")
+    cache = LLMResponseCache(sqlite_path=db_path)
+    cache.set("key", [{"type": "Crash"}])
+    cache.close()
+
+    reopened = LLMResponseCache(sqlite_path=db_path)
+    assert reopened.get("key") == [{"type": "Crash"}]
+    assert reopened.stats()["disk_hits"] == 1
+    reopened.close()
+
+@pytest.mark.asyncio
+async def test_async_disk_tier_runs_off_the_event_loop(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "llm_cache.db")
+    cache = LLMResponseCache(sqlite_path=db_path)
+    loop_thread = threading.get_ident()
+    disk_threads = set()
+    read_disk, set_disk = cache._read_disk, cache._set_disk
+    monkeypatch.setattr(cache, "_read_disk", lambda *args: disk_threads.add(threading.get_ident()) or read_disk(*args))
+    monkeypatch.setattr(cache, "_set_disk", lambda *args: disk_threads.add(threading.get_ident()) or set_disk(*args))
+
+    await cache.aset("key", [{"type": "Crash"}])
+    cache._memory.clear()
+    assert await cache.aget("key") == [{"type": "Crash"}]
+    assert await cache.aget("missing") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "disk_hits": 1, "memory_entries": 1}
+    assert disk_threads and loop_thread not in disk_threads
+    cache.close()
+
+@pytest.mark.asyncio
+@patch('app.services.llm_service.AsyncOpenAI')
+async def test_repeated_prediction_is_served_from_cache(mock_openai):
+    mock_create = AsyncMock(return_value=MagicMock(
+        choices=[MagicMock(message=MagicMock(content=json.dumps(
+            {"bugs": [{"type": "Crash", "description": "NPE", "severity": "High", "confidence": 0.9}]}
+        )))]
+    ))
+    mock_client = MagicMock()
+    mock_client.chat.completions.create = mock_create
+    mock_openai.return_value = mock_client
+
+    llm_service = LLMService(cache=LLMResponseCache())
+    first = await llm_service.predict_bug_from_logs(logs="FATAL: NullPointerException", code_snippet="x = None")
+    second = await llm_service.predict_bug_from_logs(logs="FATAL: NullPointerException\n", code_snippet="x = None")
+    assert first == second
+    assert mock_create.call_count == 1
+    assert llm_service.cache.stats()["hits"] == 1
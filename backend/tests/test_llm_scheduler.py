@@ -0,0 +1,96 @@
+import sys
+import os
+import asyncio
+import time
+import pytest
+import httpx
+from openai import BadRequestError, InternalServerError, RateLimitError
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core import metrics
+from app.services.llm_scheduler import LLMRequestScheduler, TokenBucket, _retry_after_seconds
+
+def _error(error_class, status_code, headers=None):
+    response = httpx.Response(status_code, headers=headers or {}, request=httpx.Request("POST", "http://llm.test/v1/chat/completions"))
+    return error_class("error", response=response, body=None)
+
+def _flaky(*errors, result="ok"):
+    """A request that raises each of `errors` in turn and then returns `result`."""
+    calls = []
+
+    async def request():
+        calls.append(time.monotonic())
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return request, calls
+
+def test_token_bucket_goes_into_debt_and_reports_the_wait():
+    bucket = TokenBucket(rate_per_second=100, capacity=100)
+    assert bucket.take(100) == 0
+    assert bucket.take(50) == pytest.approx(0.5, abs=0.05)
+    bucket.give(50)
+    assert bucket.take(10) == pytest.approx(0.1, abs=0.05)
+
+def test_retry_after_headers():
+    assert _retry_after_seconds(_error(RateLimitError, 429, {"retry-after-ms": "250", "retry-after": "3"})) == 0.25
+    assert _retry_after_seconds(_error(RateLimitError, 429, {"retry-after": "3"})) == 3
+    assert _retry_after_seconds(_error(RateLimitError, 429, {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0
+    assert _retry_after_seconds(_error(RateLimitError, 429)) is None
+
+async def test_rate_limit_waits_for_retry_after_and_retries():
+    scheduler = LLMRequestScheduler(max_attempts=3)
+    request, calls = _flaky(_error(RateLimitError, 429, {"retry-after-ms": "200"}))
+    retries_before = metrics.LLM_RETRIES.value()
+
+    assert await scheduler.call(request, tokens=10) == "ok"
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.2
+    assert metrics.LLM_RETRIES.value() == retries_before + 1
+    assert scheduler.stats()["rate_limited"] == 1
+
+async def test_rate_limit_pauses_requests_queued_behind_it():
+    scheduler = LLMRequestScheduler(max_attempts=3)
+    limited, _ = _flaky(_error(RateLimitError, 429, {"retry-after-ms": "300"}))
+    other, other_calls = _flaky()
+
+    started = time.monotonic()
+    first = asyncio.create_task(scheduler.call(limited, tokens=10))
+    await asyncio.sleep(0.05)
+    await scheduler.call(other, tokens=10)
+    # The second request was not sent into the rate limit the first one hit.
+    assert other_calls[0] - started >= 0.3
+    await first
+
+async def test_requests_are_paced_by_the_request_budget():
+    scheduler = LLMRequestScheduler(requests_per_minute=600, burst_seconds=0.1)  # 10/s, no burst
+    request, calls = _flaky()
+    await asyncio.gather(*(scheduler.call(request, tokens=1) for _ in range(5)))
+    assert calls[-1] - calls[0] == pytest.approx(0.4, abs=0.1)
+
+async def test_token_budget_is_corrected_by_reported_usage():
+    scheduler = LLMRequestScheduler(tokens_per_minute=6000, burst_seconds=1)  # 100 tokens/s, burst of 100
+    request, calls = _flaky()
+    await scheduler.call(request, tokens=100)
+    scheduler.record_usage(reserved_tokens=100, used_tokens=20)
+    started = time.monotonic()
+    await scheduler.call(request, tokens=100)
+    # Only the 20 tokens really used had to be refilled.
+    assert time.monotonic() - started == pytest.approx(0.2, abs=0.1)
+
+async def test_transient_errors_back_off_until_max_attempts():
+    scheduler = LLMRequestScheduler(max_attempts=3, base_delay_seconds=0.01)
+    request, calls = _flaky(*[_error(InternalServerError, 500)] * 5)
+    with pytest.raises(InternalServerError):
+        await scheduler.call(request, tokens=10)
+    assert len(calls) == 3
+    assert scheduler.stats()["failures"] == 1
+
+async def test_client_errors_are_not_retried():
+    scheduler = LLMRequestScheduler(max_attempts=5)
+    request, calls = _flaky(_error(BadRequestError, 400))
+    with pytest.raises(BadRequestError):
+        await scheduler.call(request, tokens=10)
+    assert len(calls) == 1
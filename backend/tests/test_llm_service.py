@@ -83,7 +83,7 @@ async def test_suggest_patch_for_bug_live():
 
 # --- Mocked Tests (Good for CI/CD or when you don't want to hit the API) ---
 @pytest.mark.asyncio
-@patch('app.services.llm_service.OpenAI')
+@patch('app.services.llm_service.AsyncOpenAI')
 async def test_predict_bug_from_logs_mocked(mock_openai):
     """Tests predict_bug_from_logs with a mocked OpenAI API response."""
     from unittest.mock import MagicMock, AsyncMock
@@ -112,7 +112,7 @@ async def test_predict_bug_from_logs_mocked(mock_openai):
     assert bugs[0]["type"] == "MockedError"
 
 @pytest.mark.asyncio
-@patch('app.services.llm_service.OpenAI')
+@patch('app.services.llm_service.AsyncOpenAI')
 async def test_suggest_patch_for_bug_mocked(mock_openai):
     """Tests suggest_patch_for_bug with a mocked OpenAI API response."""
     from unittest.mock import MagicMock, AsyncMock
@@ -142,3 +142,247 @@ async def test_suggest_patch_for_bug_mocked(mock_openai):
     assert len(patches) == 1
     assert patches[0]["description"] == "Mocked patch."
     assert "```diff" in patches[0]["code_diff"]
+
+@pytest.mark.asyncio
+@patch('app.services.llm_service.AsyncOpenAI')
+async def test_concurrent_requests_are_capped(mock_openai):
+    """Only max_concurrent_requests completions may be in flight at once."""
+    import asyncio
+    from unittest.mock import MagicMock
+
+    in_flight = 0
+    peak_in_flight = 0
+
+    async def slow_create(**kwargs):
+        nonlocal in_flight, peak_in_flight
+        in_flight += 1
+        peak_in_flight = max(peak_in_flight, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return MagicMock(choices=[MagicMock(message=MagicMock(content=json.dumps([])))])
+
+    mock_client = MagicMock()
+    mock_client.chat.completions.create = slow_create
+    mock_openai.return_value = mock_client
+
+    llm_service = LLMService(max_concurrent_requests=2)
+    await asyncio.gather(*[
+        llm_service.predict_bug_from_logs(logs=f"log {i}") for i in range(6)
+    ])
+    assert peak_in_flight == 2
+
+@pytest.mark.asyncio
+@patch('app.services.llm_service.AsyncOpenAI')
+async def test_predict_bugs_batch_uses_one_request(mock_openai, monkeypatch):
+    """Small submissions share one completion; items the model skips are retried individually."""
+    from unittest.mock import MagicMock
+    from app.services.llm_cache import LLMResponseCache
+    monkeypatch.setattr(settings, "LLM_CASCADE_ENABLED", False)
+
+    batch_reply = {"results": [
+        {"item": 0, "bugs": [{"type": "Crash", "description": "NPE in login.", "severity": "High", "confidence": 0.9}]},
+        {"item": 1, "bugs": []},
+    ]}
+    single_reply = [{"type": "Performance", "description": "Slow query.", "severity": "Low", "confidence": 0.5}]
+    mock_create = AsyncMock(side_effect=[
+        MagicMock(choices=[MagicMock(message=MagicMock(content=json.dumps(batch_reply)))]),
+        MagicMock(choices=[MagicMock(message=MagicMock(content=json.dumps(single_reply)))]),
+    ])
+    mock_openai.return_value.chat.completions.create = mock_create
+
+    llm_service = LLMService(cache=LLMResponseCache())
+    items = [("NullPointerException at Login.java:45", None), ("All good", "x = 1"), ("Query took 9s", None)]
+    assert llm_service.plan_batches(items) == [[0, 1, 2]]
+
+    results = await llm_service.predict_bugs_batch(items)
+    assert mock_create.await_count == 2
+    assert results[0][0]["type"] == "Crash"
+    assert results[1] == []
+    assert results[2] == [dict(single_reply[0], model_tier="large")]
+
+@pytest.mark.asyncio
+@patch('app.services.llm_service.AsyncOpenAI')
+async def test_predict_bug_from_logs_streams_bugs(mock_openai, monkeypatch):
+    """With on_bug, each bug is reported as soon as its JSON object is complete."""
+    from unittest.mock import MagicMock
+    from app.services.llm_cache import LLMResponseCache
+    monkeypatch.setattr(settings, "LLM_CASCADE_ENABLED", False)
+
+    response = json.dumps({"bugs": [
+        {"type": "Crash", "description": "NPE.", "severity": "High", "confidence": 0.9},
+        {"type": "Performance", "description": "Slow.", "severity": "Low", "confidence": 0.4},
+    ]})
+    chunks_sent = 0
+
+    async def stream():
+        nonlocal chunks_sent
+        for start in range(0, len(response), 10):
+            chunks_sent += 1
+            yield MagicMock(choices=[MagicMock(delta=MagicMock(content=response[start:start + 10]))])
+
+    mock_create = AsyncMock(return_value=stream())
+    mock_openai.return_value.chat.completions.create = mock_create
+
+    reported = []
+    llm_service = LLMService(cache=LLMResponseCache())
+    bugs = await llm_service.predict_bug_from_logs(
+        "NullPointerException", on_bug=lambda bug: reported.append((bug["type"], chunks_sent))
+    )
+    assert mock_create.call_args.kwargs["stream"] is True
+    assert [bug["type"] for bug in bugs] == ["Crash", "Performance"]
+    assert reported[0][0] == "Crash"
+    # The first bug was reported well before the last chunk arrived.
+    assert reported[0][1] < len(response) // 10
+
+@pytest.mark.asyncio
+@patch('app.services.llm_service.AsyncOpenAI')
+async def test_stream_broken_by_transport_error_keeps_streamed_bugs(mock_openai, monkeypatch):
+    """A raw httpx error mid-stream keeps the bugs already out; the stream is closed and timed either way."""
+    import httpx
+    from unittest.mock import MagicMock
+    from app.core import metrics
+    from app.services.llm_cache import LLMResponseCache
+    monkeypatch.setattr(settings, "LLM_CASCADE_ENABLED", False)
+
+    first_bug = json.dumps({"type": "Crash", "description": "NPE.", "severity": "High", "confidence": 0.9})
+    closed = []
+
+    async def stream():
+        try:
+            yield MagicMock(choices=[MagicMock(delta=MagicMock(content='{"bugs": [' + first_bug + ","))])
+            raise httpx.ReadError("connection reset")
+        finally:
+            closed.append(True)
+
+    mock_openai.return_value.chat.completions.create = AsyncMock(return_value=stream())
+    requests_before = metrics.LLM_REQUEST_DURATION.count(purpose="bug prediction")
+
+    reported = []
+    llm_service = LLMService(cache=LLMResponseCache())
+    bugs = await llm_service.predict_bug_from_logs("NullPointerException", on_bug=reported.append)
+    assert [bug["type"] for bug in bugs] == [bug["type"] for bug in reported] == ["Crash"]
+    assert closed == [True]
+    assert metrics.LLM_REQUEST_DURATION.count(purpose="bug prediction") == requests_before + 1
+
+    # A failing callback is no worse than a broken stream.
+    def failing_callback(bug):
+        raise TypeError("unexpected bug shape")
+
+    mock_openai.return_value.chat.completions.create = AsyncMock(return_value=stream())
+    bugs = await llm_service.predict_bug_from_logs("IllegalStateException", on_bug=failing_callback)
+    assert [bug["type"] for bug in bugs] == ["Crash"]
+
+async def test_client_uses_configured_base_url(monkeypatch):
+    """OPENAI_BASE_URL points the client at an OpenAI-compatible server such as the load-test stub."""
+    monkeypatch.setattr(settings, "OPENAI_BASE_URL", "http://127.0.0.1:8001/v1")
+    llm_service = LLMService()
+    try:
+        assert str(llm_service.client.base_url).rstrip("/") == "http://127.0.0.1:8001/v1"
+    finally:
+        await llm_service.aclose()
+
+@patch('app.services.llm_service.AsyncOpenAI')
+async def test_rate_limited_request_is_retried_after_retry_after(mock_openai):
+    """A 429 is retried once its Retry-After has passed instead of failing the prediction."""
+    import time
+    import httpx
+    from unittest.mock import MagicMock
+    from openai import RateLimitError
+    from app.services.llm_scheduler import LLMRequestScheduler
+
+    rate_limited = RateLimitError("slow down", body=None, response=httpx.Response(
+        429, headers={"retry-after-ms": "100"}, request=httpx.Request("POST", "http://llm.test/v1/chat/completions")
+    ))
+    mock_create = AsyncMock(side_effect=[
+        rate_limited,
+        MagicMock(choices=[MagicMock(message=MagicMock(content=json.dumps({"bugs": [
+            {"type": "Crash", "description": "NPE.", "severity": "High", "confidence": 0.9}
+        ]})))], usage=MagicMock(total_tokens=50)),
+    ])
+    mock_openai.return_value.chat.completions.create = mock_create
+
+    llm_service = LLMService(cache_enabled=False, scheduler=LLMRequestScheduler(max_attempts=3))
+    started = time.monotonic()
+    bugs = await llm_service.predict_bug_from_logs("NullPointerException")
+    assert [bug["type"] for bug in bugs] == ["Crash"]
+    assert mock_create.call_count == 2
+    assert time.monotonic() - started >= 0.1
+    assert mock_openai.call_args.kwargs["max_retries"] == 0
+
+def _completion(payload):
+    from unittest.mock import MagicMock
+    return MagicMock(choices=[MagicMock(message=MagicMock(content=json.dumps(payload)))], usage=MagicMock(total_tokens=50))
+
+@patch('app.services.llm_service.AsyncOpenAI')
+async def test_cascade_keeps_confident_fast_answer(mock_openai):
+    """A simple crash answered confidently by the fast model never reaches the large model."""
+    mock_create = AsyncMock(return_value=_completion({"bugs": [
+        {"type": "Crash", "description": "NPE in login.", "severity": "High", "confidence": 0.9}
+    ]}))
+    mock_openai.return_value.chat.completions.create = mock_create
+
+    reported = []
+    llm_service = LLMService(cache_enabled=False)
+    bugs = await llm_service.predict_bug_from_logs("java.lang.NullPointerException at Login.java:45", on_bug=reported.append)
+    assert mock_create.await_count == 1
+    assert mock_create.call_args.kwargs["model"] == settings.LLM_FAST_MODEL
+    assert bugs[0]["model_tier"] == "fast"
+    assert reported == bugs
+
+@patch('app.services.llm_service.AsyncOpenAI')
+async def test_cascade_escalates_low_confidence_and_invalid_answers(mock_openai, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_STREAMING_ENABLED", False)
+    large_answer = _completion({"bugs": [{"type": "Concurrency", "description": "Race.", "severity": "High", "confidence": 0.8}]})
+    mock_create = AsyncMock(side_effect=[
+        _completion({"bugs": [{"type": "Crash", "description": "Maybe.", "severity": "Low", "confidence": 0.3}]}),
+        large_answer,
+        _completion({"bugs": "not a list of bugs"}),
+        large_answer,
+    ])
+    mock_openai.return_value.chat.completions.create = mock_create
+
+    llm_service = LLMService(cache_enabled=False)
+    for logs in ("ERROR: request failed", "ERROR: job failed"):
+        bugs = await llm_service.predict_bug_from_logs(logs)
+        assert [bug["model_tier"] for bug in bugs] == ["large"]
+    assert [call.kwargs["model"] for call in mock_create.call_args_list] == [
+        settings.LLM_FAST_MODEL, settings.LLM_MODEL, settings.LLM_FAST_MODEL, settings.LLM_MODEL
+    ]
+
+@patch('app.services.llm_service.AsyncOpenAI')
+async def test_non_list_bugs_are_rejected_on_both_tiers(mock_openai, monkeypatch):
+    """`{"bugs": "..."}` is an invalid answer: the fast tier escalates, the large tier yields no bugs, nothing is cached."""
+    from app.core import metrics
+    from app.services.llm_cache import LLMResponseCache
+    monkeypatch.setattr(settings, "LLM_STREAMING_ENABLED", False)
+    mock_create = AsyncMock(side_effect=[
+        _completion({"bugs": "none"}),
+        _completion({"bugs": "none"}),
+        _completion({"bugs": {"type": "Crash", "description": "NPE.", "severity": "High", "confidence": 0.9}}),
+        _completion({"bugs": {"type": "Crash", "description": "NPE.", "severity": "High", "confidence": 0.9}}),
+    ])
+    mock_openai.return_value.chat.completions.create = mock_create
+    escalations_before = metrics.LLM_ESCALATIONS.value(reason="invalid_json")
+
+    llm_service = LLMService(cache=LLMResponseCache())
+    for logs in ("ERROR: request failed", "ERROR: job failed"):
+        assert await llm_service.predict_bug_from_logs(logs) == []
+    assert [call.kwargs["model"] for call in mock_create.call_args_list] == [
+        settings.LLM_FAST_MODEL, settings.LLM_MODEL, settings.LLM_FAST_MODEL, settings.LLM_MODEL
+    ]
+    assert metrics.LLM_ESCALATIONS.value(reason="invalid_json") == escalations_before + 2
+    assert llm_service.cache.stats()["memory_entries"] == 0
+
+@patch('app.services.llm_service.AsyncOpenAI')
+async def test_cascade_sends_complex_input_straight_to_large_model(mock_openai, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_STREAMING_ENABLED", False)
+    mock_create = AsyncMock(return_value=_completion({"bugs": [
+        {"type": "MemoryLeak", "description": "Use after free.", "severity": "Critical", "confidence": 0.6}
+    ]}))
+    mock_openai.return_value.chat.completions.create = mock_create
+
+    llm_service = LLMService(cache_enabled=False)
+    bugs = await llm_service.predict_bug_from_logs("Exception Type: EXC_BAD_ACCESS (SIGSEGV)")
+    assert mock_create.await_count == 1
+    assert mock_create.call_args.kwargs["model"] == settings.LLM_MODEL
+    assert bugs[0]["model_tier"] == "large"
@@ -0,0 +1,64 @@
+import sys
+import os
+import io
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.log_parser import LogParser, iter_log_lines
+
+SAMPLE_LOG = (
+    "I/ActivityManager: Start proc com.example.app\r\n"
+    "W/System: WARN low memory, trimming caches\n"
+    "E/AndroidRuntime: FATAL EXCEPTION: main\r"
+    "ERROR: Login failed for user 42\n"
+    "D/Debug: done"
+)
+
+def test_parse_stream_matches_parse_for_all_source_types():
+    parser = LogParser()
+    expected = parser.parse(SAMPLE_LOG)
+    assert expected["error_count"] == 2
+    assert len(expected["warnings"]) == 1
+
+    sources = [
+        io.StringIO(SAMPLE_LOG),
+        io.BytesIO(SAMPLE_LOG.encode("utf-8")),
+        SAMPLE_LOG.splitlines(keepends=True),
+    ]
+    for source in sources:
+        assert parser.parse_stream(source, chunk_size=5, max_collected_lines=None) == expected
+
+def test_chunk_boundaries_do_not_split_crlf():
+    text = "a\r\nb\r\nc"
+    for chunk_size in range(1, len(text) + 1):
+        assert list(iter_log_lines(io.StringIO(text), chunk_size)) == ["a", "b", "c"]
+
+def test_parse_stream_memory_is_bounded():
+    def big_log():
+        for i in range(200_000):
+            yield f"2024-01-01 12:00:00 ERROR: request {i} failed with code 500\n".encode()
+
+    class GeneratorFile(io.RawIOBase):
+        def __init__(self):
+            self._lines = big_log()
+            self._pending = b""
+        def readable(self):
+            return True
+        def read(self, size=-1):
+            while len(self._pending) < size:
+                line = next(self._lines, None)
+                if line is None:
+                    break
+                self._pending += line
+            chunk, self._pending = self._pending[:size], self._pending[size:]
+            return chunk
+
+    tracemalloc.start()
+    result = LogParser().parse_stream(GeneratorFile(), max_collected_lines=100)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert result["error_count"] == 200_000
+    assert len(result["error_lines"]) == 100
+    assert peak < 5 * 1024 * 1024  # the input itself is ~12 MB
@@ -0,0 +1,48 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.log_template_miner import LogTemplateMiner
+
+def make_log(start: int, count: int) -> str:
+    lines = []
+    for i in range(start, start + count):
+        lines.append(f"2024-05-01 12:00:{i % 60:02d}.120 I/NetworkClient: request {i} to 10.0.0.{i % 200}:443 took {i * 7}ms")
+        lines.append(f"2024-05-01 12:00:{i % 60:02d}.121 D/Cache: hit for key session_{i} size={i * 3}")
+    lines.append("2024-05-01 12:01:00.000 E/AndroidRuntime: java.lang.NullPointerException at com.example.Login.auth(Login.java:45)")
+    return "\n".join(lines)
+
+def test_repetitive_lines_collapse_into_templates():
+    miner = LogTemplateMiner()
+    summary = miner.summarize(make_log(0, 500))
+    assert summary.line_count == 1001
+    assert summary.template_count == 3
+
+    rendered = summary.render()
+    assert "[500x, lines 1-999]" in rendered
+    assert "[1x, line 1001]" in rendered
+    assert "first occurrence: 2024-05-01 12:01:00.000 E/AndroidRuntime" in rendered
+    assert len(rendered) < len(make_log(0, 500)) / 20
+
+def test_templates_are_reused_across_requests():
+    miner = LogTemplateMiner()
+    miner.summarize(make_log(0, 100))
+    learned = miner.cluster_count
+    second = miner.summarize(make_log(1000, 100))
+    assert miner.cluster_count == learned
+    assert second.template_count == learned
+
+def test_cluster_count_is_bounded():
+    miner = LogTemplateMiner(max_clusters=10)
+    for i in range(1, 51):
+        miner.add_line(" ".join(["event"] * i))  # distinct token counts never share a cluster
+    assert miner.cluster_count == 10
+
+def test_render_keeps_error_templates_when_truncating():
+    miner = LogTemplateMiner()
+    lines = [" ".join(["step"] * i) for i in range(1, 21)] + ["FATAL: database unreachable"]
+    summary = miner.summarize("\n".join(lines), max_templates=3)
+    rendered = summary.render()
+    assert "FATAL: database unreachable" in rendered
+    assert "18 less frequent templates omitted" in rendered
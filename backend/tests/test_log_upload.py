@@ -0,0 +1,94 @@
+import sys
+import os
+import asyncio
+import gzip
+import zlib
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.log_parser import LogParser
+from app.utils.log_upload import (
+    InvalidUploadError,
+    UnsupportedEncodingError,
+    UploadTooLargeError,
+    _DECOMPRESS_STEP,
+    get_decompressor,
+    spool_upload,
+)
+
+LOG = "".join(f"2024-01-01 10:00:{i % 60:02d} INFO request {i} ok\n" for i in range(2000)) + "ERROR: java.lang.NullPointerException\n"
+
+async def chunked(data, size=1000):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+@pytest.mark.asyncio
+async def test_gzip_upload_is_decompressed_and_spooled_to_disk():
+    upload = await spool_upload(chunked(gzip.compress(LOG.encode())), "gzip", max_bytes=10 ** 7, spool_max_memory_bytes=1024)
+    assert upload.size == len(LOG)
+    assert upload._file._rolled  # larger than the in-memory threshold
+    assert upload.read_text() == LOG
+    upload.close()
+
+@pytest.mark.asyncio
+async def test_concatenated_gzip_members_and_deflate():
+    data = gzip.compress(b"first\n") + gzip.compress(b"second\n")
+    upload = await spool_upload(chunked(data, 7), "gzip", max_bytes=1000, spool_max_memory_bytes=1000)
+    assert upload.read_text() == "first\nsecond\n"
+
+    upload = await spool_upload(chunked(zlib.compress(b"deflated\n")), "deflate", max_bytes=1000, spool_max_memory_bytes=1000)
+    assert upload.read_text() == "deflated\n"
+
+@pytest.mark.asyncio
+async def test_independent_readers_can_stream_concurrently():
+    upload = await spool_upload(chunked(LOG.encode()), None, max_bytes=10 ** 7, spool_max_memory_bytes=1024)
+    parser = LogParser()
+    first, second = await asyncio.gather(
+        asyncio.to_thread(parser.parse, upload.open()),
+        asyncio.to_thread(parser.parse, upload.open()),
+    )
+    assert first == second == parser.parse(LOG)
+
+@pytest.mark.asyncio
+async def test_decompressed_size_limit_and_bad_input():
+    bomb = gzip.compress(b"A" * 1_000_000)
+    with pytest.raises(UploadTooLargeError):
+        await spool_upload(chunked(bomb), "gzip", max_bytes=100_000, spool_max_memory_bytes=1000)
+    with pytest.raises(InvalidUploadError):
+        await spool_upload(chunked(gzip.compress(b"abc")[:-10]), "gzip", max_bytes=1000, spool_max_memory_bytes=1000)
+    with pytest.raises(UnsupportedEncodingError):
+        await spool_upload(chunked(b"abc"), "br", max_bytes=1000, spool_max_memory_bytes=1000)
+
+def zstd_module():
+    try:
+        from compression import zstd
+    except ImportError:
+        zstd = pytest.importorskip("backports.zstd")
+    return zstd
+
+@pytest.mark.asyncio
+async def test_zstd_frames_are_decompressed_in_bounded_steps():
+    zstd = zstd_module()
+    data = zstd.compress(b"A" * 10_000_000) + zstd.compress(b"second frame\n")
+    decompressor = get_decompressor("zstd")
+    pieces = [piece for chunk in (data[:20], data[20:]) for piece in decompressor.decompress(chunk)]
+    decompressor.finish()
+    assert max(len(piece) for piece in pieces) <= _DECOMPRESS_STEP
+    assert b"".join(pieces) == b"A" * 10_000_000 + b"second frame\n"
+
+    with pytest.raises(UploadTooLargeError):
+        await spool_upload(chunked(data), "zstd", max_bytes=100_000, spool_max_memory_bytes=1000)
+    with pytest.raises(InvalidUploadError):
+        await spool_upload(chunked(zstd.compress(LOG.encode())[:-10]), "zstd", max_bytes=10 ** 7, spool_max_memory_bytes=1000)
+
+@pytest.mark.asyncio
+async def test_read_text_can_keep_only_head_and_tail():
+    upload = await spool_upload(chunked(LOG.encode()), None, max_bytes=10 ** 7, spool_max_memory_bytes=1024)
+    text = upload.read_text(max_bytes=2000)
+    lines = text.splitlines()
+    assert len(text) < 2100
+    assert lines[0] == LOG.splitlines()[0]
+    assert lines[-1] == "ERROR: java.lang.NullPointerException"
+    assert "bytes omitted" in text
+    assert upload.read_text(max_bytes=len(LOG)) == LOG
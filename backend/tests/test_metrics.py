@@ -0,0 +1,65 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.core.metrics import Counter, Gauge, Histogram, MetricsRegistry, language_label
+from app.main import app
+
+def test_registry_renders_prometheus_text_format():
+    registry = MetricsRegistry()
+    requests = registry.register(Counter("test_requests_total", "Requests.", ("cache",)))
+    depth = registry.register(Gauge("test_depth", "Depth."))
+    latency = registry.register(Histogram("test_latency_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0)))
+
+    requests.inc(cache="llm")
+    requests.inc(2, cache="llm")
+    depth.set_function(lambda: 7)
+    latency.observe(0.05, stage="parse")
+    latency.observe(0.5, stage="parse")
+    latency.observe(5, stage="parse")
+
+    text = registry.render()
+    assert "# TYPE test_requests_total counter" in text
+    assert 'test_requests_total{cache="llm"} 3' in text
+    assert "test_depth 7" in text
+    assert 'test_latency_seconds_bucket{stage="parse",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{stage="parse",le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{stage="parse",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count{stage="parse"} 3' in text
+    assert 'test_latency_seconds_sum{stage="parse"} 5.55' in text
+
+def test_language_label_bounds_cardinality():
+    assert language_label(" Python ") == "python"
+    assert language_label("brainfuck") == "other"
+    assert language_label(None) == "other"
+
+def test_metrics_endpoint():
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE bughawk_stage_duration_seconds histogram" in response.text
+    assert "bughawk_queue_depth " in response.text
+
+def test_failing_gauge_is_left_out_of_the_scrape():
+    registry = MetricsRegistry()
+    broken = registry.register(Gauge("test_broken", "Broken."))
+    registry.register(Gauge("test_depth", "Depth.")).set(3)
+    broken.set_function(lambda: 1 / 0)
+
+    text = registry.render()
+    assert "test_depth 3" in text
+    assert "\ntest_broken " not in text
+
+def test_lifespan_binds_gauges_to_the_app_orchestrator():
+    with TestClient(app) as client:
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        entries = len(client.app.state.analysis_orchestrator._results)
+        assert f"bughawk_result_store_entries {entries}" in response.text
+    # Unbound on shutdown: the gauges no longer reach into the stopped orchestrator.
+    assert metrics.QUEUE_DEPTH.value() == 0
+    assert TestClient(app).get("/metrics").status_code == 200
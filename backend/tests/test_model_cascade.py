@@ -0,0 +1,29 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.model_cascade import ComplexityClassifier, fast_answer_problem
+
+def _count_tokens(text):
+    return len(text.split())
+
+def test_classifier_flags_large_multi_exception_and_hard_crash_inputs():
+    classifier = ComplexityClassifier(max_simple_tokens=50, max_simple_exception_types=3)
+    assert classifier.classify("java.lang.NullPointerException at Login.java:45", None, _count_tokens) is None
+    assert classifier.classify("word " * 40, "code " * 20, _count_tokens) == "large_input"
+    assert classifier.classify(
+        "IllegalStateException\nCaused by: IOException\nCaused by: SQLiteException", None, _count_tokens
+    ) == "multiple_exceptions"
+    assert classifier.classify("Exception Type: EXC_BAD_ACCESS (SIGSEGV)", None, _count_tokens) == "hard_crash"
+    assert classifier.classify("Found one Java-level deadlock:", None, _count_tokens) == "hard_crash"
+
+def test_fast_answer_problems():
+    confident = {"type": "Crash", "description": "NPE.", "severity": "High", "confidence": 0.9}
+    unsure = dict(confident, confidence=0.4)
+    assert fast_answer_problem([unsure, confident], 0.7) is None
+    assert fast_answer_problem([unsure], 0.7) == "low_confidence"
+    assert fast_answer_problem([], 0.7) == "no_findings"
+    assert fast_answer_problem(None, 0.7) == "invalid_json"
+    assert fast_answer_problem([dict(confident, confidence="high")], 0.7) == "invalid_json"
+    assert fast_answer_problem(["Crash"], 0.7) == "invalid_json"
@@ -0,0 +1,58 @@
+import sys
+import os
+import asyncio
+import time
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.pipeline import StagePipeline
+
+def sleeper(seconds, value):
+    async def stage(pipeline):
+        await asyncio.sleep(seconds)
+        return value
+    return stage
+
+@pytest.mark.asyncio
+async def test_independent_stages_overlap_and_dependencies_are_respected():
+    pipeline = StagePipeline()
+    pipeline.add("a", sleeper(0.2, 1))
+    pipeline.add("b", sleeper(0.2, 2))
+
+    async def combine(p):
+        return p.results["a"] + p.results["b"]
+    pipeline.add("c", combine, depends_on=["a", "b"])
+
+    started = time.monotonic()
+    results = await pipeline.run()
+    assert results["c"] == 3
+    assert time.monotonic() - started < 0.35
+    assert set(pipeline.timings) == {"a", "b", "c"}
+    assert pipeline.timings["a"] >= 190
+
+@pytest.mark.asyncio
+async def test_failure_cancels_remaining_stages():
+    cancelled = asyncio.Event()
+
+    async def slow(p):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def boom(p):
+        raise RuntimeError("stage failed")
+
+    pipeline = StagePipeline()
+    pipeline.add("slow", slow)
+    pipeline.add("boom", boom)
+    with pytest.raises(RuntimeError):
+        await pipeline.run()
+    assert cancelled.is_set()
+
+def test_unknown_dependency_is_rejected():
+    pipeline = StagePipeline()
+    with pytest.raises(ValueError):
+        pipeline.add("a", sleeper(0, None), depends_on=["missing"])
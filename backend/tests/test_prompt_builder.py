@@ -0,0 +1,57 @@
+import sys
+import os
+import logging
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.prompt_builder import PromptBuilder, _tiktoken_cache_dir
+
+def test_small_inputs_are_unchanged():
+    builder = PromptBuilder(token_budget=1000)
+    logs = "INFO: started\nERROR: boom"
+    code = "val x = 1"
+    assert builder.fit_logs_and_code(logs, code) == (logs, code)
+
+def test_large_logs_keep_windows_around_errors():
+    builder = PromptBuilder(token_budget=400, log_context_lines=2)
+    lines = [f"INFO: heartbeat number {i} all systems nominal" for i in range(2000)]
+    lines[1500] = "E/AndroidRuntime: java.lang.IllegalStateException at com.example.Cart.checkout(Cart.kt:7)"
+    logs, _ = builder.fit_logs_and_code("\n".join(lines))
+
+    assert builder.count_tokens(logs) <= 400
+    assert "IllegalStateException" in logs
+    assert "heartbeat number 1499" in logs
+    assert "heartbeat number 10 " not in logs
+    assert "lines omitted" in logs
+
+def test_code_windows_follow_referenced_lines():
+    builder = PromptBuilder(token_budget=300, code_context_lines=1)
+    code_lines = [f"    val filler{i} = computeSomethingExpensive({i})" for i in range(1, 301)]
+    code_lines[149] = "    val total = cart!!.items.sum()"
+    logs = "FATAL EXCEPTION: main\njava.lang.NullPointerException at Cart.checkout(Cart.kt:150)"
+    fitted_logs, fitted_code = builder.fit_logs_and_code(logs, "\n".join(code_lines))
+
+    assert fitted_logs == logs
+    assert "cart!!.items.sum()" in fitted_code
+    assert "filler149" in fitted_code and "filler151" in fitted_code
+    assert "filler10 " not in fitted_code
+    assert builder.count_tokens(fitted_logs) + builder.count_tokens(fitted_code) <= 300
+
+def test_active_token_counter_is_logged(caplog):
+    with caplog.at_level(logging.INFO, logger="app.services.prompt_builder"):
+        builder = PromptBuilder(token_budget=1000)
+    assert builder.tokenizer_name in ("tiktoken:o200k_base", "approximate")
+    assert any("prompt tokens" in record.getMessage() for record in caplog.records)
+
+def test_tokenizer_cache_dir_is_only_set_while_loading(tmp_path, monkeypatch):
+    monkeypatch.delenv("TIKTOKEN_CACHE_DIR", raising=False)
+    with _tiktoken_cache_dir(str(tmp_path)) as cache_dir:
+        assert os.environ["TIKTOKEN_CACHE_DIR"] == cache_dir == str(tmp_path)
+    assert "TIKTOKEN_CACHE_DIR" not in os.environ
+    PromptBuilder(token_budget=1000, tokenizer_cache_dir=str(tmp_path))
+    assert "TIKTOKEN_CACHE_DIR" not in os.environ
+
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", "/operator/choice")
+    with _tiktoken_cache_dir(str(tmp_path)) as cache_dir:
+        assert cache_dir == os.environ["TIKTOKEN_CACHE_DIR"] == "/operator/choice"
+    assert os.environ["TIKTOKEN_CACHE_DIR"] == "/operator/choice"
@@ -0,0 +1,237 @@
+import sys
+import os
+import asyncio
+import time
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models.schemas import AnalysisResult
+from app.services.result_store import InMemoryResultStore, SQLiteResultStore
+
+def result(analysis_id: str, status: str = "COMPLETED") -> AnalysisResult:
+    return AnalysisResult(analysis_id=analysis_id, status=status)
+
+def test_finished_results_expire_but_active_ones_do_not():
+    store = InMemoryResultStore(ttl_seconds=0.05, max_entries=10)
+    store.put(result("done"))
+    store.put(result("running", "IN_PROGRESS"))
+    time.sleep(0.1)
+    assert store.get("done") is None
+    assert store.get("running") is not None
+    assert store.stats()["expired_evictions"] == 1
+
+def test_capacity_evicts_least_recently_used_finished_result():
+    store = InMemoryResultStore(ttl_seconds=60, max_entries=3)
+    store.put(result("queued", "QUEUED"))
+    store.put(result("a"))
+    store.put(result("b"))
+    store.get("a")  # "b" is now the least recently used finished result
+    store.put(result("c"))
+    assert store.get("b") is None
+    assert store.get("queued") is not None
+    assert store.get("a") is not None
+    assert store.stats()["capacity_evictions"] == 1
+
+def test_result_finished_by_update_is_evicted_before_active_ones():
+    store = InMemoryResultStore(ttl_seconds=60, max_entries=3)
+    store.put(result("older", "IN_PROGRESS"))
+    store.put(result("job", "IN_PROGRESS"))
+    store.put(result("newer", "QUEUED"))
+    store.update("job", status="COMPLETED")
+    store.put(result("latest", "QUEUED"))
+    assert store.get("job") is None
+    assert all(store.get(key) is not None for key in ("older", "newer", "latest"))
+
+def test_byte_budget_is_enforced():
+    store = InMemoryResultStore(ttl_seconds=60, max_entries=1000, max_bytes=1000)
+    for i in range(50):
+        store.put(AnalysisResult(analysis_id=f"id-{i}", status="FAILED", error_message="x" * 100))
+    assert store.stats()["bytes"] <= 1000
+    assert len(store) < 50
+
+@pytest.mark.asyncio
+async def test_background_sweeper_removes_expired_entries():
+    store = InMemoryResultStore(ttl_seconds=0.01, max_entries=10, sweep_interval_seconds=0.02)
+    store.put(result("done"))
+    store.start_sweeper()
+    await asyncio.sleep(0.1)
+    await store.stop_sweeper()
+    assert len(store) == 0
+
+def test_alias_resolves_to_target_and_follows_its_updates():
+    store = InMemoryResultStore(ttl_seconds=60, max_entries=1)
+    store.put(result("primary", "IN_PROGRESS"))
+    assert store.add_alias("alias", "primary")
+    assert not store.add_alias("other", "missing")
+
+    store.put(result("primary", "COMPLETED"))
+    aliased = store.get("alias")
+    assert aliased.analysis_id == "alias"
+    assert aliased.status == "COMPLETED"
+    assert store.resolve("alias") == "primary"
+
+    store.put(result("newer"))  # over capacity: "primary" and its alias go together
+    assert store.get("alias") is None
+    assert store.stats()["aliases"] == 0
+
+def test_update_changes_the_record_in_place_and_caches_its_json():
+    store = InMemoryResultStore(ttl_seconds=60, max_entries=10)
+    record = store.put(result("job", "QUEUED"))
+    first = store.get_json("job")
+    assert store.get_json("job") is first  # encoded once per version
+
+    assert store.update("job", status="IN_PROGRESS", error_message="Performing analysis...") is record
+    assert record.version == 1
+    updated = AnalysisResult.model_validate_json(store.get_json("job"))
+    assert updated.status == "IN_PROGRESS"
+    assert updated.error_message == "Performing analysis..."
+    assert store.update("missing", status="FAILED") is None
+
+def test_finishing_an_update_starts_expiry_and_counts_bytes():
+    store = InMemoryResultStore(ttl_seconds=0.05, max_entries=10, max_bytes=10_000)
+    store.put(result("job", "IN_PROGRESS"))
+    assert store.stats()["bytes"] == 0
+    store.update("job", status="COMPLETED")
+    assert store.stats()["bytes"] == len(store.get_json("job"))
+    time.sleep(0.1)
+    assert store.get_json("job") is None
+
+def test_alias_json_carries_the_alias_id():
+    store = InMemoryResultStore(ttl_seconds=60, max_entries=10)
+    store.put(result("primary"))
+    store.add_alias("alias", "primary")
+    aliased = AnalysisResult.model_validate_json(store.get_json("alias"))
+    assert aliased.analysis_id == "alias"
+    assert aliased.status == "COMPLETED"
+
+def test_sqlite_store_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "results.db")
+    # Two stores on one file stand in for two worker processes.
+    writer = SQLiteResultStore(path, ttl_seconds=60, max_entries=10)
+    reader = SQLiteResultStore(path, ttl_seconds=60, max_entries=10)
+
+    writer.put(result("job", "QUEUED"))
+    writer.flush()
+    assert AnalysisResult.model_validate_json(reader.get_json("job")).status == "QUEUED"
+    writer.update("job", status="IN_PROGRESS")
+    assert writer.add_alias("alias", "job")
+    writer.flush()
+    assert reader.get("job").status == "IN_PROGRESS"
+    assert reader.resolve("alias") == "job"
+
+    writer.update("job", status="COMPLETED", error_message=None)
+    writer.flush()
+    aliased = AnalysisResult.model_validate_json(reader.get_json("alias"))
+    assert aliased.analysis_id == "alias"
+    assert aliased.status == "COMPLETED"
+    assert reader.get_json("missing") is None
+    assert not reader.add_alias("other", "missing")
+    writer.close()
+    reader.close()
+
+def test_closed_sqlite_store_reports_no_entries(tmp_path):
+    store = SQLiteResultStore(str(tmp_path / "results.db"), ttl_seconds=60, max_entries=10)
+    store.put(result("job"))
+    store.flush()
+    assert len(store) == 1
+    store.close()
+    assert len(store) == 0
+    assert store.stats()["entries"] == store.stats()["bytes"] == 0
+
+def test_sqlite_store_expires_and_evicts_finished_results_first(tmp_path):
+    store = SQLiteResultStore(str(tmp_path / "results.db"), ttl_seconds=0.05, max_entries=2)
+    store.put(result("running", "IN_PROGRESS"))
+    store.put(result("done"))
+    store.add_alias("done-alias", "done")
+    store.flush()
+    time.sleep(0.1)
+    assert store.get_json("done") is None
+    assert store.get_json("running") is not None
+    assert store.sweep() == 1
+    assert store.stats()["aliases"] == 0
+
+    store.ttl_seconds = 60
+    store.put(result("a"))
+    store.put(result("b"))  # over capacity: "a" finished first and goes, the active one stays
+    store.flush()
+    assert store.get_json("a") is None
+    assert store.get_json("b") is not None
+    assert store.get_json("running") is not None
+    assert store.stats()["capacity_evictions"] == 1
+    store.close()
+
+def test_sqlite_store_never_evicts_running_results(tmp_path):
+    path = str(tmp_path / "results.db")
+    first = SQLiteResultStore(path, ttl_seconds=60, max_entries=1)
+    second = SQLiteResultStore(path, ttl_seconds=60, max_entries=1)
+    first.put(result("mine", "IN_PROGRESS"))
+    second.put(result("theirs", "IN_PROGRESS"))  # over capacity, but both are still running
+    second.put(result("done"))
+    first.flush()
+    second.flush()
+    assert second.get_json("done") is None
+    assert first.get_json("theirs") is not None
+    assert second.get_json("mine") is not None
+    assert len(first) == 2
+
+    first.update("mine", status="COMPLETED")
+    first.flush()
+    assert len(first) == 1
+    assert second.get("mine") is None
+    assert AnalysisResult.model_validate_json(first.get_json("theirs")).status == "IN_PROGRESS"
+    first.close()
+    second.close()
+
+@pytest.mark.asyncio
+async def test_sqlite_store_writes_do_not_wait_for_another_process_lock(tmp_path):
+    path = str(tmp_path / "results.db")
+    store = SQLiteResultStore(path, ttl_seconds=60, max_entries=10)
+    other = SQLiteResultStore(path, ttl_seconds=60, max_entries=10)
+    other._db.execute("BEGIN IMMEDIATE")  # the other process is in the middle of a write
+
+    started = time.monotonic()
+    store.put(result("job", "IN_PROGRESS"))
+    store.add_alias("alias", "job")
+    store.update("job", status="COMPLETED")
+    assert time.monotonic() - started < 0.5
+    # Served from memory until stored.
+    assert store.get("alias").status == "COMPLETED"
+    assert other.get_json("job") is None
+
+    other._db.execute("COMMIT")
+    await asyncio.to_thread(store.flush)
+    await asyncio.sleep(0)
+    assert other.get("alias").status == "COMPLETED"
+    assert store.get("job").status == "COMPLETED"
+    await asyncio.to_thread(store.close)
+    await asyncio.to_thread(other.close)
+
+@pytest.mark.asyncio
+async def test_sqlite_store_fails_analysis_it_cannot_store(tmp_path):
+    path = str(tmp_path / "results.db")
+    failed = []
+    store = SQLiteResultStore(path, ttl_seconds=60, max_entries=10, lock_timeout_seconds=0.05, on_write_failed=failed.append)
+    other = SQLiteResultStore(path, ttl_seconds=60, max_entries=10)
+    store.put(result("job", "QUEUED"))
+    await asyncio.to_thread(store.flush)
+
+    other._db.execute("BEGIN IMMEDIATE")  # held longer than the store waits for it
+    store.update("job", status="IN_PROGRESS")
+    for _ in range(100):
+        if failed:
+            break
+        await asyncio.sleep(0.01)
+    other._db.execute("COMMIT")
+    assert [record.analysis_id for record in failed] == ["job"]
+    assert store.get("job").status == "FAILED"
+
+    # The retried write reaches the other processes, which would otherwise see the analysis running forever.
+    for _ in range(100):
+        if other.get("job").status == "FAILED":
+            break
+        await asyncio.sleep(0.01)
+    assert other.get("job").status == "FAILED"
+    assert "could not be saved" in other.get("job").error_message
+    await asyncio.to_thread(store.close)
+    await asyncio.to_thread(other.close)
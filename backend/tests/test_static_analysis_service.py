@@ -1,3 +1,6 @@
+import os
+import sys
+import time
 import pytest
 import asyncio
 from app.services.static_analysis_service import StaticAnalysisService
@@ -25,3 +28,71 @@ async def test_run_analysis_with_unknown_language():
     code_snippet = "some code"
     results = await service.run_analysis(code_snippet, "unknownlang")
     assert results == []
+
+@pytest.mark.asyncio
+async def test_tool_timeout_kills_process_and_reports_no_findings():
+    service = StaticAnalysisService()
+    service.timeouts["pylint"] = 0.2
+    started = time.monotonic()
+    result = await service._run_tool("pylint", [sys.executable, "-c", "import time; time.sleep(10)"])
+    assert result is None
+    assert time.monotonic() - started < 5
+
+@pytest.mark.asyncio
+async def test_missing_tool_reports_no_findings():
+    service = StaticAnalysisService()
+    result = await service._run_tool("detekt", ["definitely-not-a-real-linter-binary"])
+    assert result is None
+
+@pytest.mark.asyncio
+async def test_linters_run_concurrently_up_to_limit():
+    service = StaticAnalysisService(max_concurrent_processes=4)
+    started = time.monotonic()
+    results = await asyncio.gather(*[
+        service._run_tool("pylint", [sys.executable, "-c", "import time; time.sleep(0.5)"]) for _ in range(4)
+    ])
+    assert all(result is not None and result[0] == 0 for result in results)
+    assert time.monotonic() - started < 1.5
+
+def _install_fake_swiftlint(directory, version):
+    """A swiftlint stand-in that reports one violation and logs every lint run next to itself."""
+    script = directory / "swiftlint"
+    script.write_text(f"""#!{sys.executable}
+import json, pathlib, sys
+if sys.argv[1] == "version":
+    print("{version}")
+    sys.exit(0)
+with open(pathlib.Path(__file__).with_name("runs.log"), "a") as log:
+    log.write("lint\\n")
+print(json.dumps([{{"rule_id": "force_cast", "reason": "Avoid force casts", "file": "a.swift", "line": 1, "severity": "warning"}}]))
+""")
+    script.chmod(0o755)
+    return directory / "runs.log"
+
+@pytest.mark.asyncio
+async def test_repeat_snippet_is_served_from_findings_cache(tmp_path, monkeypatch):
+    runs = _install_fake_swiftlint(tmp_path, "0.50.0")
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    service = StaticAnalysisService()
+
+    first = await service.run_analysis("let x = y as! Int", "swift")
+    again = await service.run_analysis("let x = y as! Int", "iOS")
+    assert first == again
+    assert first[0]["rule"] == "force_cast"
+    assert runs.read_text().count("lint") == 1
+    assert service.findings_cache.stats()["hits"] == 1
+
+    await service.run_analysis("let z = 1", "swift")  # a different snippet is linted
+    assert runs.read_text().count("lint") == 2
+
+@pytest.mark.asyncio
+async def test_tool_upgrade_invalidates_cached_findings(tmp_path, monkeypatch):
+    runs = _install_fake_swiftlint(tmp_path, "0.50.0")
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    service = StaticAnalysisService()
+    await service.run_analysis("let x = y as! Int", "swift")
+
+    _install_fake_swiftlint(tmp_path, "0.51.0-with-a-longer-version")
+    await service.run_analysis("let x = y as! Int", "swift")
+    assert runs.read_text().count("lint") == 2
+    assert service.findings_cache.stats()["invalidations"] == 1
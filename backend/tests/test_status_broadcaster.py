@@ -0,0 +1,46 @@
+import sys
+import os
+import asyncio
+import threading
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.status_broadcaster import StatusBroadcaster
+
+@pytest.mark.asyncio
+async def test_every_subscriber_receives_the_same_snapshot():
+    broadcaster = StatusBroadcaster()
+    first = broadcaster.subscribe("a1")
+    second = broadcaster.subscribe("a1")
+    other = broadcaster.subscribe("a2")
+
+    broadcaster.publish("a1", '{"status": "IN_PROGRESS"}')
+    assert await first.next(timeout=1) == '{"status": "IN_PROGRESS"}'
+    assert await second.next(timeout=1) == '{"status": "IN_PROGRESS"}'
+    assert await other.next(timeout=0.05) is None
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_only_sees_latest_snapshot():
+    broadcaster = StatusBroadcaster()
+    subscription = broadcaster.subscribe("a1")
+    broadcaster.publish("a1", "one")
+    broadcaster.publish("a1", "two")
+    broadcaster.publish("a1", "three", final=True)
+
+    assert not subscription.finished
+    assert await subscription.next(timeout=1) == "three"
+    assert subscription.finished
+
+@pytest.mark.asyncio
+async def test_publish_from_another_thread_and_unsubscribe():
+    broadcaster = StatusBroadcaster()
+    subscription = broadcaster.subscribe("a1")
+    thread = threading.Thread(target=broadcaster.publish, args=("a1", "from thread"))
+    thread.start()
+    thread.join()
+    assert await subscription.next(timeout=1) == "from thread"
+
+    broadcaster.unsubscribe(subscription)
+    assert not broadcaster.has_subscribers("a1")
+    assert broadcaster.subscriber_count == 0